@@ -12,11 +12,12 @@ from src.tools.clans import register_clans_tools
 from src.tools.rankings import register_ranking_tools
 from src.tools.leaderboards import register_leaderboards_tools
 from src.tools.analytics import register_analytics_tools
+from src.tools.diagnostics import register_diagnostics_tools
 
 # Initialize FastMCP server
 mcp = FastMCP(
     "Clash Royale MCP Server",
-    dependencies=["requests", "python-dotenv"]
+    dependencies=["httpx", "numpy", "python-dotenv"]
 )
 
 # Register tools
@@ -26,6 +27,7 @@ register_clans_tools(mcp)
 register_ranking_tools(mcp)
 register_leaderboards_tools(mcp)
 register_analytics_tools(mcp)
+register_diagnostics_tools(mcp)
 
 # Debug: Check what's registered
 print("=" * 50)
@@ -1,5 +1,6 @@
 import sys
 import os
+from contextlib import asynccontextmanager
 
 # Add project root to sys.path to allow imports from src
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -10,12 +11,24 @@ from src.tools.cards import register_cards_tools
 from src.tools.clans import register_clans_tools
 from src.tools.rankings import register_ranking_tools
 from src.tools.leaderboards import register_leaderboards_tools
-from src.tools.analytics import register_analytics_tools
+from src.tools.analytics import register_analytics_tools, get_meta_refresher
+from src.tools.diagnostics import register_diagnostics_tools
+
+@asynccontextmanager
+async def lifespan(server):
+    # Keep get_meta_snapshot's precomputed snapshot fresh for the server's lifetime
+    refresher = get_meta_refresher()
+    refresher.start()
+    try:
+        yield
+    finally:
+        await refresher.stop()
 
 # Initialize FastMCP server
 mcp = FastMCP(
     "Clash Royale MCP Server",
-    dependencies=["requests", "python-dotenv"]
+    dependencies=["httpx", "numpy", "python-dotenv"],
+    lifespan=lifespan
 )
 
 # Register tools
@@ -25,6 +38,7 @@ register_clans_tools(mcp)
 register_ranking_tools(mcp)
 register_leaderboards_tools(mcp)
 register_analytics_tools(mcp)
+register_diagnostics_tools(mcp)
 
 def main():
     mcp.run(transport="stdio")
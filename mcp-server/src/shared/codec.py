@@ -0,0 +1,149 @@
+import os
+import re
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Format of response bodies written to the ResponseStore: "json" (compact,
+# written and parsed by orjson) or "msgpack". msgpack bodies are ~18% smaller
+# but decode slower than orjson parses JSON, and the store is read far more
+# often than it is written. Readers accept either, whatever this is set to.
+STORE_CODEC = os.getenv("CR_STORE_CODEC", "json")
+
+# orjson writes floats below 1e-4 or from 1e16 up differently from repr()
+# ("0.00001" and "1e16" vs "1e-05" and "1e+16"); such values go through the
+# stdlib encoder. Candidates are found with cheap searches and then checked
+# to be number tokens rather than text inside a string (e.g. a hex digest).
+_EXPONENT = re.compile(rb"e[-0-9]")
+_SMALL_FLOAT = b"0.0000"
+_NUMBER_CHARS = frozenset(b"0123456789.-")
+
+# Characters the stdlib escapes under ensure_ascii but orjson writes as is
+_NON_ASCII = re.compile(r"[^\x00-\x7e]")
+
+
+def loads(data):
+    """
+    Parse JSON from bytes or str.
+
+    Raises ValueError (json.JSONDecodeError) on malformed input, like json.loads.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _is_number_token(data, start) -> bool:
+    while start > 0 and data[start - 1] in _NUMBER_CHARS:
+        start -= 1
+    # A number follows ":", "[", "," or indentation; inside a string the run
+    # of digits starts after a quote or some other character
+    return start == 0 or data[start - 1] in b":[, \n"
+
+
+def _has_orjson_only_float(data) -> bool:
+    for match in _EXPONENT.finditer(data):
+        start = match.start()
+        if start > 0 and data[start - 1] in _NUMBER_CHARS and _is_number_token(data, start):
+            return True
+    start = data.find(_SMALL_FLOAT)
+    while start != -1:
+        if _is_number_token(data, start):
+            return True
+        start = data.find(_SMALL_FLOAT, start + 1)
+    return False
+
+
+def _escape_non_ascii(match):
+    code = ord(match.group())
+    if code < 0x10000:
+        return f"\\u{code:04x}"
+    code -= 0x10000
+    return f"\\u{0xd800 | (code >> 10):04x}\\u{0xdc00 | (code & 0x3ff):04x}"
+
+
+def dumps(obj, indent=None, sort_keys=False, ensure_ascii=True) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes, byte-for-byte the same as the stdlib.
+
+    The output equals json.dumps(obj, indent=indent, sort_keys=sort_keys,
+    ensure_ascii=ensure_ascii).encode("utf-8") with the compact separators
+    (",", ":") when indent is None, so files the dashboard reads (and the
+    hashes derived from them) do not change with the encoder. orjson does
+    the work when it can reproduce that output; anything else falls back to
+    the stdlib. The one difference is NaN and Infinity, which come out as
+    null instead of the stdlib's non-standard (and JSON.parse-breaking)
+    NaN/Infinity tokens.
+
+    Args:
+        obj: Value to serialize
+        indent: None for compact output, or an indent width
+        sort_keys: Sort object keys
+        ensure_ascii: Escape non-ASCII characters as \\uXXXX
+    """
+    if orjson is not None and indent in (None, 2):
+        option = 0
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            data = orjson.dumps(obj, option=option)
+        except TypeError:
+            # Non-str keys, ints past 64 bits, float subclasses such as numpy.float64
+            data = None
+        if data is not None and not _has_orjson_only_float(data):
+            if ensure_ascii and (not data.isascii() or b"\x7f" in data):
+                data = _NON_ASCII.sub(_escape_non_ascii, data.decode("utf-8")).encode("ascii")
+            return data
+
+    separators = (",", ":") if indent is None else None
+    return json.dumps(
+        obj, indent=indent, sort_keys=sort_keys, ensure_ascii=ensure_ascii, separators=separators
+    ).encode("utf-8")
+
+
+def _is_msgpack(body) -> bool:
+    # Stored bodies are always a JSON object or array. As msgpack those start
+    # with a fixmap/fixarray (0x80-0x9f) or array/map 16/32 (0xdc-0xdf) byte,
+    # none of which can begin a JSON document.
+    return bool(body) and (0x80 <= body[0] <= 0x9f or 0xdc <= body[0] <= 0xdf)
+
+
+def can_decode_body(body) -> bool:
+    """
+    False for msgpack bodies when this process has no msgpack module.
+    """
+    return msgpack is not None or not _is_msgpack(body)
+
+
+def encode_body(obj) -> bytes:
+    """
+    Encode a parsed API response for the ResponseStore in STORE_CODEC.
+    """
+    if STORE_CODEC == "msgpack" and msgpack is not None and isinstance(obj, (dict, list)):
+        try:
+            return msgpack.packb(obj, use_bin_type=True)
+        except (TypeError, OverflowError):
+            pass  # not representable in msgpack, store it as JSON
+    return dumps(obj, ensure_ascii=False)
+
+
+def decode_body(body):
+    """
+    Decode a ResponseStore body written by encode_body, or a raw JSON body
+    stored before the store was encoded.
+    """
+    if _is_msgpack(body):
+        if msgpack is None:
+            raise ValueError("Stored body is msgpack but the msgpack module is not installed")
+        return msgpack.unpackb(body, raw=False)
+    return loads(body)
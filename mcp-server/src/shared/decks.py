@@ -0,0 +1,159 @@
+import threading
+
+# Define Win Conditions for Archetype Classification.
+# This is the single source of truth for both the MCP server and the
+# viz-dashboard pipeline; rules are checked in order and the first match wins.
+WIN_CONDITIONS = {
+    "Beatdown": [
+        "Golem", "Lava Hound", "Giant", "Electro Giant", "Goblin Giant", "Royal Giant", "Elixir Golem"
+    ],
+    "Siege": [
+        "X-Bow", "Mortar"
+    ],
+    "Control": [
+        "Miner", "Graveyard", "Goblin Barrel", "Wall Breakers", "Skeleton Barrel"
+    ],
+    "Cycle": [
+        "Hog Rider", "Royal Hogs", "Ram Rider", "Battle Ram"
+    ],
+    "Bridge Spam": [
+        "P.E.K.K.A", "Mega Knight", "Elite Barbarians", "Royal Recruits"
+    ],
+    "Air": [
+        "Balloon"
+    ],
+    "Three Musketeers": [
+        "Three Musketeers"
+    ]
+}
+
+
+class CardIndex:
+    """
+    Assigns every card name a fixed bit position for deck bitmasks.
+
+    Positions are handed out on first sight and never change for the life of
+    the process. Anything that leaves the process (JSON state, pickles) goes
+    through card names, so two processes never need to agree on positions.
+    """
+
+    def __init__(self, names=()):
+        self._bits = {}
+        self._names = []
+        self._lock = threading.Lock()
+        for name in names:
+            self.bit(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def bit(self, name):
+        pos = self._bits.get(name)
+        if pos is None:
+            with self._lock:
+                pos = self._bits.get(name)
+                if pos is None:
+                    pos = len(self._names)
+                    self._names.append(name)
+                    self._bits[name] = pos
+        return pos
+
+    def find(self, name):
+        """
+        Bit position of a card, or None if it has never been seen.
+        """
+        return self._bits.get(name)
+
+    def mask(self, names):
+        mask = 0
+        for name in names:
+            mask |= 1 << self.bit(name)
+        return mask
+
+    def names(self, mask):
+        """
+        Card names for every bit set in a mask, sorted alphabetically.
+        """
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self._names[low.bit_length() - 1])
+            mask ^= low
+        return sorted(names)
+
+
+# Win-condition cards are registered first so their bits are the same in every process
+CARD_INDEX = CardIndex(name for win_cons in WIN_CONDITIONS.values() for name in win_cons)
+
+
+class Deck:
+    """
+    A deck stored as an integer bitmask over CARD_INDEX.
+
+    Hashing and equality are a single integer operation, so Decks can be used
+    directly as Counter/dict keys for deck dedup. Iterating yields the card
+    names in sorted order, matching the sorted name tuples used before.
+    """
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    @classmethod
+    def from_names(cls, names):
+        return cls(CARD_INDEX.mask(names))
+
+    def names(self):
+        return tuple(CARD_INDEX.names(self.mask))
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return bin(self.mask).count("1")
+
+    def __contains__(self, name):
+        pos = CARD_INDEX.find(name)
+        return pos is not None and bool(self.mask & (1 << pos))
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __eq__(self, other):
+        return isinstance(other, Deck) and self.mask == other.mask
+
+    def __reduce__(self):
+        # Bit positions are process-local, so pickle by card names
+        return (Deck.from_names, (self.names(),))
+
+    def __repr__(self):
+        return f"Deck({', '.join(self.names())})"
+
+
+class ArchetypeClassifier:
+    """
+    Archetype rules compiled into bitmasks.
+
+    Each rule becomes one mask of its win-condition cards, so classifying a
+    deck is at most one AND per archetype instead of a list scan per card.
+    """
+
+    def __init__(self, rules=WIN_CONDITIONS):
+        self.rules = [(archetype, CARD_INDEX.mask(win_cons)) for archetype, win_cons in rules.items()]
+
+    def classify(self, deck):
+        """
+        Return the first archetype whose win conditions appear in the deck, or "Unknown".
+
+        Args:
+            deck: A Deck, or an iterable of card names
+        """
+        mask = deck.mask if isinstance(deck, Deck) else CARD_INDEX.mask(deck)
+        for archetype, rule_mask in self.rules:
+            if mask & rule_mask:
+                return archetype
+        return "Unknown"
+
+
+CLASSIFIER = ArchetypeClassifier()
@@ -0,0 +1,89 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# Items per request for the ranking endpoints
+DEFAULT_PAGE_SIZE = 50
+
+
+def cursor_page(data):
+    """
+    Split a Clash Royale list response into (items, next "after" cursor).
+
+    Error responses and empty bodies count as a last, empty page.
+    """
+    if not isinstance(data, dict) or data.get("error"):
+        return [], None
+    return data.get("items", []), data.get("paging", {}).get("cursors", {}).get("after")
+
+
+def _page_limit(page_size, max_items, seen):
+    if max_items is None:
+        return page_size
+    return min(page_size, max_items - seen)
+
+
+def iter_items(fetch_page, max_items=None, page_size=DEFAULT_PAGE_SIZE, cursor=None):
+    """
+    Lazily yield the items of a cursor-paginated listing.
+
+    The next page is requested on a background thread as soon as the
+    current page's cursor is known, so it downloads while the caller
+    consumes the current page. The walk stops after max_items items, at the
+    last page, or when the caller stops iterating.
+
+    Args:
+        fetch_page: fetch_page(cursor, limit) -> (items, next_cursor);
+            cursor is None for the first page
+        max_items: Upper bound on items yielded (unbounded if None)
+        page_size: Largest limit requested per page
+        cursor: Cursor to start from
+    """
+    if max_items is not None and max_items <= 0:
+        return
+    seen = 0
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        pending = executor.submit(fetch_page, cursor, _page_limit(page_size, max_items, seen))
+        while pending is not None:
+            items, next_cursor = pending.result()
+            if not items:
+                return
+            if max_items is not None:
+                items = items[:max_items - seen]
+            seen += len(items)
+
+            pending = None
+            if next_cursor and (max_items is None or seen < max_items):
+                pending = executor.submit(fetch_page, next_cursor, _page_limit(page_size, max_items, seen))
+            yield from items
+    finally:
+        # A caller that stops early does not wait for a page it will never read
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_items(fetch_page, max_items=None, page_size=DEFAULT_PAGE_SIZE, cursor=None):
+    """
+    asyncio counterpart of iter_items; fetch_page is a coroutine function
+    and the next page is prefetched as a task.
+    """
+    if max_items is not None and max_items <= 0:
+        return
+    seen = 0
+    pending = asyncio.ensure_future(fetch_page(cursor, _page_limit(page_size, max_items, seen)))
+    try:
+        while pending is not None:
+            items, next_cursor = await pending
+            if not items:
+                return
+            if max_items is not None:
+                items = items[:max_items - seen]
+            seen += len(items)
+
+            pending = None
+            if next_cursor and (max_items is None or seen < max_items):
+                pending = asyncio.ensure_future(fetch_page(next_cursor, _page_limit(page_size, max_items, seen)))
+            for item in items:
+                yield item
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,200 @@
+import os
+import time
+import sqlite3
+import threading
+import logging
+from dataclasses import dataclass
+from .codec import can_decode_body
+
+logger = logging.getLogger(__name__)
+
+# Both the MCP server and viz-dashboard/scripts/fetch_meta.py open the same
+# file by default, so whichever ran last leaves the store warm for the other.
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+DEFAULT_STORE_PATH = os.path.join(REPO_ROOT, ".cache", "responses.sqlite3")
+
+DAY = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at);
+"""
+
+
+@dataclass
+class StoredResponse:
+    key: str
+    body: bytes
+    fetched_at: float
+    etag: str = None
+    last_modified: str = None
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return self.age() < ttl
+
+    def conditional_headers(self) -> dict:
+        """
+        Validator headers for revalidating this entry upstream.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseStore:
+    """
+    On-disk store of API response bodies backed by SQLite.
+
+    Each entry keeps the body, when it was fetched and the upstream
+    validators (ETag / Last-Modified). Callers decide freshness from the
+    entry's age; stale entries can be revalidated with a conditional request
+    and refreshed in place with touch() on a 304.
+
+    Bodies are stored as written by codec.encode_body (compact JSON unless
+    CR_STORE_CODEC=msgpack) and read back with codec.decode_body.
+    """
+
+    def __init__(self, path: str = None, max_age: float = None, max_bytes: int = None):
+        if path is None:
+            path = os.getenv("CR_RESPONSE_STORE", DEFAULT_STORE_PATH)
+        if max_age is None:
+            max_age = float(os.getenv("CR_RESPONSE_STORE_MAX_AGE", str(7 * DAY)))
+        if max_bytes is None:
+            max_bytes = int(os.getenv("CR_RESPONSE_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.revalidated = 0
+        self.writes = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> StoredResponse:
+        """
+        Return the stored entry for a key, or None if there is none.
+        """
+        row = self._conn().execute(
+            "SELECT body, fetched_at, etag, last_modified FROM responses WHERE key = ?",
+            (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if not can_decode_body(row[0]):
+            # msgpack body written by the other process; this one lacks msgpack
+            return None
+        return StoredResponse(key, row[0], row[1], row[2], row[3])
+
+    def lookup(self, key: str, ttl: float):
+        """
+        Fetch an entry and report whether it can be served without contacting upstream.
+
+        Returns:
+            (entry, is_fresh) - entry is None when the key has never been stored
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None, False
+        fresh = entry.is_fresh(ttl)
+        if fresh:
+            self.hits += 1
+        return entry, fresh
+
+    def put(self, key: str, body: bytes, etag: str = None, last_modified: str = None):
+        """
+        Insert or replace the entry for a key with a freshly fetched body.
+        """
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, fetched_at, etag, last_modified, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, body, time.time(), etag, last_modified, len(body))
+            )
+        self.writes += 1
+
+    def touch(self, key: str):
+        """
+        Mark an entry as fetched now, after upstream confirmed it is unchanged (304).
+        """
+        with self._conn() as conn:
+            conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
+        self.revalidated += 1
+
+    def gc(self, max_age: float = None, max_bytes: int = None) -> int:
+        """
+        Drop entries older than max_age, then the oldest entries until the
+        store fits in max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        max_age = self.max_age if max_age is None else max_age
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+
+        with self._conn() as conn:
+            removed = conn.execute(
+                "DELETE FROM responses WHERE fetched_at < ?",
+                (time.time() - max_age,)
+            ).rowcount
+
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > max_bytes:
+                # Walk entries oldest first and cut once the remainder fits
+                cutoff = None
+                for fetched_at, size in conn.execute("SELECT fetched_at, size FROM responses ORDER BY fetched_at"):
+                    total -= size
+                    cutoff = fetched_at
+                    if total <= max_bytes:
+                        break
+                removed += conn.execute("DELETE FROM responses WHERE fetched_at <= ?", (cutoff,)).rowcount
+
+        if removed:
+            logger.info(f"Response store GC removed {removed} entries from {self.path}")
+        return removed
+
+    def stats(self) -> dict:
+        entries, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "writes": self.writes
+        }
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,160 @@
+import numpy as np
+
+# Decks are buffered and folded into the matrix in batches of this size. Each
+# batch is multiplied in float32 (BLAS), which is exact for counts below 2**24.
+FLUSH_SIZE = 4096
+
+
+class SynergyMatrix:
+    """
+    Card co-occurrence counts over a set of decks.
+
+    Decks are encoded as 0/1 indicator rows over card indices and the whole
+    co-occurrence matrix is updated with one product per batch (X^T X)
+    instead of enumerating the 28 pairs of every deck in Python. The
+    diagonal holds how many decks contain each card, which makes lift and
+    PMI scores available for every pair at once.
+    """
+
+    def __init__(self):
+        self.cards = []
+        self._index = {}
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.total_decks = 0
+        self._pending = []
+
+    def _card_index(self, name):
+        idx = self._index.get(name)
+        if idx is None:
+            idx = len(self.cards)
+            self._index[name] = idx
+            self.cards.append(name)
+        return idx
+
+    def _grow(self):
+        n = len(self.cards)
+        if self.counts.shape[0] < n:
+            pad = n - self.counts.shape[0]
+            self.counts = np.pad(self.counts, ((0, pad), (0, pad)))
+
+    def add_deck(self, card_names):
+        self._pending.append([self._card_index(name) for name in set(card_names)])
+        if len(self._pending) >= FLUSH_SIZE:
+            self.flush()
+
+    def add_decks(self, decks):
+        for card_names in decks:
+            self.add_deck(card_names)
+
+    def flush(self):
+        """
+        Fold buffered decks into the co-occurrence matrix.
+        """
+        if not self._pending:
+            return
+        self._grow()
+
+        rows = len(self._pending)
+        lengths = [len(deck) for deck in self._pending]
+        indicator = np.zeros((rows, len(self.cards)), dtype=np.float32)
+        indicator[np.repeat(np.arange(rows), lengths), np.concatenate(self._pending).astype(np.intp)] = 1
+
+        self.counts += (indicator.T @ indicator).astype(np.int64)
+        self.total_decks += rows
+        self._pending = []
+
+    def merge(self, other):
+        """
+        Add another matrix's counts into this one, aligning card indices by name.
+        """
+        self.flush()
+        other.flush()
+        idx = np.array([self._card_index(name) for name in other.cards], dtype=np.intp)
+        self._grow()
+        if len(idx):
+            self.counts[np.ix_(idx, idx)] += other.counts
+        self.total_decks += other.total_decks
+        return self
+
+    def pair_scores(self):
+        """
+        Vectorized pair statistics over the upper triangle of the matrix.
+
+        Returns:
+            (rows, cols, counts, lift, npmi) arrays, one entry per card pair
+        """
+        self.flush()
+        n = len(self.cards)
+        rows, cols = np.triu_indices(n, 1)
+        pair_counts = self.counts[rows, cols]
+        if not self.total_decks:
+            zeros = np.zeros(len(pair_counts))
+            return rows, cols, pair_counts, zeros, zeros
+
+        deck_counts = self.counts.diagonal().astype(np.float64)
+        total = float(self.total_decks)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            p_pair = pair_counts / total
+            lift = p_pair / ((deck_counts[rows] / total) * (deck_counts[cols] / total))
+            pmi = np.log(lift)
+            # Normalized PMI lies in [-1, 1]; 1 means the cards only ever appear together
+            npmi = pmi / -np.log(p_pair)
+        lift = np.nan_to_num(lift, nan=0.0, posinf=0.0)
+        npmi = np.where(pair_counts > 0, np.nan_to_num(npmi, nan=0.0, posinf=1.0, neginf=-1.0), -1.0)
+        npmi = np.where(p_pair >= 1.0, 1.0, npmi)
+        return rows, cols, pair_counts, lift, npmi
+
+    def top_pairs(self, k=10, by="count", min_count=1):
+        """
+        Top-K card pairs.
+
+        Args:
+            k: Number of pairs to return
+            by: Ranking key - "count", "lift" or "npmi"
+            min_count: Ignore pairs seen in fewer decks than this (lift/PMI are noisy on rare pairs)
+
+        Returns:
+            List of {"cards": (a, b), "count", "lift", "npmi"} sorted by the ranking key
+        """
+        rows, cols, pair_counts, lift, npmi = self.pair_scores()
+        keep = pair_counts >= max(min_count, 1)
+        if not keep.any():
+            return []
+        rows, cols, pair_counts, lift, npmi = rows[keep], cols[keep], pair_counts[keep], lift[keep], npmi[keep]
+
+        key = {"count": pair_counts, "lift": lift, "npmi": npmi}[by]
+        # Ranking key desc, then count desc, then card names, so ties come out
+        # the same however the matrix was built (e.g. merged from shards)
+        name_rank = np.argsort(np.argsort(self.cards)) if self.cards else np.zeros(0, dtype=np.intp)
+        first = np.minimum(name_rank[rows], name_rank[cols])
+        second = np.maximum(name_rank[rows], name_rank[cols])
+        top = np.lexsort((second, first, -pair_counts, -key))[:k]
+
+        return [
+            {
+                "cards": tuple(sorted((self.cards[rows[i]], self.cards[cols[i]]))),
+                "count": int(pair_counts[i]),
+                "lift": round(float(lift[i]), 3),
+                "npmi": round(float(npmi[i]), 3)
+            }
+            for i in top
+        ]
+
+    def to_state(self):
+        self.flush()
+        return {
+            "cards": list(self.cards),
+            "total_decks": self.total_decks,
+            "counts": self.counts.tolist()
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        matrix = cls()
+        if not state:
+            return matrix
+        for name in state["cards"]:
+            matrix._card_index(name)
+        matrix.counts = np.array(state["counts"], dtype=np.int64).reshape(len(matrix.cards), len(matrix.cards))
+        matrix.total_decks = state["total_decks"]
+        return matrix
@@ -1,33 +1,178 @@
+import os
+import time
+import asyncio
 import logging
 from collections import Counter
-from .utils import make_api_request, encode_tag
+from .utils import make_async_api_request, encode_tag
+from ..shared.synergy import SynergyMatrix
+from ..shared.decks import Deck, CLASSIFIER
+from .meta_refresher import MetaSnapshotRefresher
 
 logger = logging.getLogger(__name__)
 
-# Define Win Conditions for Archetype Classification
-WIN_CONDITIONS = {
-    "Beatdown": [
-        "Golem", "Lava Hound", "Giant", "Electro Giant", "Goblin Giant", "Royal Giant", "Elixir Golem"
-    ],
-    "Siege": [
-        "X-Bow", "Mortar"
-    ],
-    "Control": [
-        "Miner", "Graveyard", "Goblin Barrel", "Wall Breakers", "Skeleton Barrel"
-    ],
-    "Cycle": [
-        "Hog Rider", "Royal Hogs", "Ram Rider", "Battle Ram"
-    ],
-    "Bridge Spam": [
-        "P.E.K.K.A", "Mega Knight", "Elite Barbarians", "Royal Recruits"
-    ],
-    "Air": [
-        "Balloon"
-    ],
-    "Three Musketeers": [
-        "Three Musketeers"
+# Bounded parallelism for the battlelog fan-out in get_meta_snapshot
+META_FANOUT_CONCURRENCY = int(os.getenv("CR_META_FANOUT_CONCURRENCY", "10"))
+
+# Sample size of the background-refreshed snapshot served by get_meta_snapshot
+REFRESH_PLAYER_LIMIT = int(os.getenv("CR_META_REFRESH_PLAYERS", "50"))
+REFRESH_BATTLE_LIMIT = int(os.getenv("CR_META_REFRESH_BATTLES", "25"))
+REFRESH_DEADLINE_SECONDS = float(os.getenv("CR_META_REFRESH_DEADLINE", "60"))
+
+async def compute_meta_snapshot(player_limit: int, battle_limit: int, deadline_seconds: float) -> dict:
+    """
+    Crawl the top Path of Legends players' battle logs and aggregate the meta.
+
+    Battle logs are fetched concurrently. If the deadline passes before every
+    player has been fetched, the players that did finish are analyzed and the
+    result is marked as partial in meta_summary.
+
+    Returns:
+        meta_summary, top_cards, top_synergies and archetypes
+    """
+    started = time.monotonic()
+
+    # 1. Fetch Top Players
+    # Use global location (57000000) for Path of Legends
+    endpoint = f"locations/global/pathoflegend/players?limit={player_limit}"
+    try:
+        top_players_data = await make_async_api_request(endpoint)
+        if top_players_data.get("error"):
+            # Pass the upstream error on instead of analyzing an empty ranking
+            logger.error(f"Failed to fetch top players: {top_players_data.get('details')}")
+            return top_players_data
+        top_players = top_players_data.get("items", [])
+    except Exception as e:
+        logger.error(f"Failed to fetch top players: {e}")
+        return {"error": "Failed to fetch top players", "details": str(e)}
+
+    logger.info(f"Fetched {len(top_players)} top players. Starting analysis...")
+
+    # 2. Fetch battle logs for all players concurrently
+    semaphore = asyncio.Semaphore(META_FANOUT_CONCURRENCY)
+
+    async def fetch_battles(tag):
+        async with semaphore:
+            encoded_tag = encode_tag(tag)
+            return await make_async_api_request(f"players/{encoded_tag}/battlelog")
+
+    tasks = [
+        asyncio.create_task(fetch_battles(player["tag"]))
+        for player in top_players if player.get("tag")
     ]
-}
+
+    timed_out = 0
+    if tasks:
+        remaining = max(deadline_seconds - (time.monotonic() - started), 0)
+        _, pending = await asyncio.wait(tasks, timeout=remaining)
+        timed_out = len(pending)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Deadline reached with {timed_out} battle logs still pending, returning partial results")
+
+    # Data structures for aggregation
+    card_counts = Counter()
+    synergies = SynergyMatrix()
+    archetype_counts = Counter()
+    total_decks_analyzed = 0
+    players_analyzed = 0
+
+    # 3. Analyze Battles for each player that finished in time
+    for task in tasks:
+        if not task.done() or task.cancelled():
+            continue
+
+        try:
+            battles = task.result()
+            if not isinstance(battles, list):
+                # make_async_api_request returns an error dict on failure
+                logger.warning(f"Failed to fetch battles: {battles}")
+                continue
+            players_analyzed += 1
+
+            # Filter and analyze recent battles
+            count = 0
+            for battle in battles:
+                if count >= battle_limit:
+                    break
+
+                # Only analyze PvP or Path of Legends battles
+                game_type = battle.get("type")
+                if game_type not in ["PvP", "pathOfLegend"]:
+                    continue
+
+                # Get the player's deck (team[0] is always the player in battle log context)
+                # Note: In battle log, 'team' is a list. Usually index 0 is the player.
+                # We need to verify which side matches the player tag, but usually the API returns the requested player as team[0]
+                # Let's just assume team[0] for simplicity as per standard API behavior for player endpoints
+                if not battle.get("team"):
+                    continue
+
+                player_deck = battle["team"][0].get("cards", [])
+                if not player_deck:
+                    continue
+
+                # Extract card names
+                card_names = [card["name"] for card in player_deck]
+
+                # Update Card Counts
+                card_counts.update(card_names)
+
+                # Update Synergy Counts (co-occurrence matrix over all decks)
+                synergies.add_deck(card_names)
+
+                # Determine Archetype (first matching win condition, see shared/decks.py)
+                detected_archetype = CLASSIFIER.classify(Deck.from_names(card_names))
+
+                archetype_counts[detected_archetype] += 1
+                total_decks_analyzed += 1
+                count += 1
+
+        except Exception as e:
+            logger.warning(f"Failed to analyze battles: {e}")
+            continue
+
+    # 4. Format Results
+    return {
+        "meta_summary": {
+            "total_players_analyzed": players_analyzed,
+            "total_players_requested": len(top_players),
+            "total_decks_analyzed": total_decks_analyzed,
+            "partial": timed_out > 0,
+            "players_timed_out": timed_out,
+            "elapsed_seconds": round(time.monotonic() - started, 2),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+        },
+        "top_cards": [
+            {"card": card, "count": count, "usage_rate": f"{(count/total_decks_analyzed)*100:.1f}%"}
+            for card, count in card_counts.most_common(10)
+        ],
+        "top_synergies": [
+            {"pair": " + ".join(pair["cards"]), "count": pair["count"], "lift": pair["lift"]}
+            for pair in synergies.top_pairs(10)
+        ],
+        "archetypes": [
+            {"archetype": arch, "count": count, "share": f"{(count/total_decks_analyzed)*100:.1f}%"}
+            for arch, count in archetype_counts.most_common()
+        ]
+    }
+
+_refresher = None
+
+def get_meta_refresher() -> MetaSnapshotRefresher:
+    """
+    Return the process-wide meta snapshot refresher, creating it on first use.
+
+    Background refreshes crawl REFRESH_PLAYER_LIMIT players with a
+    REFRESH_DEADLINE_SECONDS budget, a larger sample than a tool call can
+    afford to wait for.
+    """
+    global _refresher
+    if _refresher is None:
+        _refresher = MetaSnapshotRefresher(
+            lambda: compute_meta_snapshot(REFRESH_PLAYER_LIMIT, REFRESH_BATTLE_LIMIT, REFRESH_DEADLINE_SECONDS)
+        )
+    return _refresher
 
 def register_analytics_tools(mcp):
     """
@@ -38,122 +183,36 @@ def register_analytics_tools(mcp):
     """
     
     @mcp.tool()
-    def get_meta_snapshot(player_limit: int = 5, battle_limit: int = 5) -> dict:
+    async def get_meta_snapshot(player_limit: int = 5, battle_limit: int = 5, deadline_seconds: float = 10.0, live: bool = False) -> dict:
         """
         Analyze the current meta by aggregating data from top Path of Legends players.
         
-        This tool fetches the top players, analyzes their recent battle logs, and returns:
+        Returns:
         1. Most used cards (card usage stats)
         2. Most common card synergies (pairs of cards played together)
         3. Archetype distribution based on win conditions
         
+        By default the answer comes immediately from a snapshot the server
+        refreshes in the background (seeded from the dashboard's snapshot at
+        startup); meta_summary reports its source and snapshot_age_seconds,
+        and the limit arguments are ignored. With live=True, or before any
+        snapshot exists, the top players' battle logs are crawled for this
+        call instead.
+        
         Args:
-            player_limit: Number of top players to analyze (default: 5, max recommended: 10 to avoid rate limits)
-            battle_limit: Number of recent battles per player to analyze (default: 5)
+            player_limit: Number of top players to analyze live (default: 5)
+            battle_limit: Number of recent battles per player to analyze live (default: 5)
+            deadline_seconds: Total time budget for a live crawl (default: 10)
+            live: Crawl now instead of answering from the precomputed snapshot (default: False)
             
         Returns:
             A dictionary containing meta insights: top_cards, top_synergies, and archetypes.
         """
-        logger.info(f"get_meta_snapshot called with player_limit={player_limit}, battle_limit={battle_limit}")
-        
-        # 1. Fetch Top Players
-        # Use global location (57000000) for Path of Legends
-        endpoint = f"locations/global/pathoflegend/players?limit={player_limit}"
-        try:
-            top_players_data = make_api_request(endpoint)
-            top_players = top_players_data.get("items", [])
-        except Exception as e:
-            logger.error(f"Failed to fetch top players: {e}")
-            return {"error": "Failed to fetch top players", "details": str(e)}
-            
-        logger.info(f"Fetched {len(top_players)} top players. Starting analysis...")
-        
-        # Data structures for aggregation
-        card_counts = Counter()
-        synergy_counts = Counter()
-        archetype_counts = Counter()
-        total_decks_analyzed = 0
-        
-        # 2. Analyze Battles for each player
-        for player in top_players:
-            tag = player.get("tag")
-            if not tag:
-                continue
-                
-            encoded_tag = encode_tag(tag)
-            battle_endpoint = f"players/{encoded_tag}/battlelog"
-            
-            try:
-                battles = make_api_request(battle_endpoint)
-                
-                # Filter and analyze recent battles
-                count = 0
-                for battle in battles:
-                    if count >= battle_limit:
-                        break
-                        
-                    # Only analyze PvP or Path of Legends battles
-                    game_type = battle.get("type")
-                    if game_type not in ["PvP", "pathOfLegend"]:
-                        continue
-                        
-                    # Get the player's deck (team[0] is always the player in battle log context)
-                    # Note: In battle log, 'team' is a list. Usually index 0 is the player.
-                    # We need to verify which side matches the player tag, but usually the API returns the requested player as team[0]
-                    # Let's just assume team[0] for simplicity as per standard API behavior for player endpoints
-                    if not battle.get("team"):
-                        continue
-                        
-                    player_deck = battle["team"][0].get("cards", [])
-                    if not player_deck:
-                        continue
-                        
-                    # Extract card names
-                    card_names = [card["name"] for card in player_deck]
-                    
-                    # Update Card Counts
-                    card_counts.update(card_names)
-                    
-                    # Update Synergy Counts (all unique pairs)
-                    # Sort pairs to ensure (Log, Hog) is same as (Hog, Log)
-                    sorted_cards = sorted(card_names)
-                    for i in range(len(sorted_cards)):
-                        for j in range(i + 1, len(sorted_cards)):
-                            pair = f"{sorted_cards[i]} + {sorted_cards[j]}"
-                            synergy_counts[pair] += 1
-                            
-                    # Determine Archetype
-                    detected_archetype = "Unknown"
-                    for archetype, win_cons in WIN_CONDITIONS.items():
-                        if any(wc in card_names for wc in win_cons):
-                            detected_archetype = archetype
-                            break # Assign first matching archetype (simple logic)
-                    
-                    archetype_counts[detected_archetype] += 1
-                    total_decks_analyzed += 1
-                    count += 1
-                    
-            except Exception as e:
-                logger.warning(f"Failed to fetch battles for player {tag}: {e}")
-                continue
-                
-        # 3. Format Results
-        return {
-            "meta_summary": {
-                "total_players_analyzed": len(top_players),
-                "total_decks_analyzed": total_decks_analyzed,
-                "timestamp": "Now"
-            },
-            "top_cards": [
-                {"card": card, "count": count, "usage_rate": f"{(count/total_decks_analyzed)*100:.1f}%"}
-                for card, count in card_counts.most_common(10)
-            ],
-            "top_synergies": [
-                {"pair": pair, "count": count}
-                for pair, count in synergy_counts.most_common(10)
-            ],
-            "archetypes": [
-                {"archetype": arch, "count": count, "share": f"{(count/total_decks_analyzed)*100:.1f}%"}
-                for arch, count in archetype_counts.most_common()
-            ]
-        }
+        logger.info(f"get_meta_snapshot called with player_limit={player_limit}, battle_limit={battle_limit}, deadline_seconds={deadline_seconds}, live={live}")
+
+        if not live:
+            snapshot = get_meta_refresher().get()
+            if snapshot is not None:
+                return snapshot
+
+        return await compute_meta_snapshot(player_limit, battle_limit, deadline_seconds)
@@ -0,0 +1,187 @@
+import os
+import re
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+HOUR = 60 * 60
+
+# TTL (seconds) per endpoint class. The first matching pattern wins and
+# endpoints that match nothing are never cached.
+CACHE_TTL_RULES = [
+    # Static game data
+    ("cards", r"^cards$", 6 * HOUR),
+    ("seasons", r"^locations/global/seasonsV2$", 6 * HOUR),
+    ("locations", r"^locations$", 6 * HOUR),
+    # Finished game modes can no longer change (see leaderboards.py)
+    ("inactive_leaderboards", r"^leaderboards/1700000(01|03|04|05|07)$", 24 * HOUR),
+    ("leaderboards", r"^leaderboards/", 5 * 60),
+    # Player and clan data
+    ("battlelog", r"^players/[^/]+/battlelog$", 60),
+    ("players", r"^players/[^/]+$", 5 * 60),
+    ("clans", r"^clans/", 10 * 60),
+    # Ladder rankings
+    ("rankings", r"^locations/.+/(rankings|pathoflegend)/", 10 * 60),
+]
+
+_COMPILED_RULES = [(name, re.compile(pattern), ttl) for name, pattern, ttl in CACHE_TTL_RULES]
+
+
+def cache_key(endpoint: str) -> str:
+    """
+    Normalize an endpoint into a cache key.
+
+    Query parameters are sorted so that "limit=5&after=x" and
+    "after=x&limit=5" share an entry.
+    """
+    path, _, query = endpoint.partition("?")
+    if not query:
+        return path
+    return path + "?" + "&".join(sorted(query.split("&")))
+
+
+def classify_endpoint(endpoint: str):
+    """
+    Return the (endpoint class, ttl) pair for an endpoint, or (None, 0) if it should not be cached.
+    """
+    path = endpoint.partition("?")[0]
+    for name, pattern, ttl in _COMPILED_RULES:
+        if pattern.search(path):
+            return name, ttl
+    return None, 0
+
+
+class ResponseCache:
+    """
+    In-process TTL cache for API responses with LRU eviction.
+
+    Entries are bounded both by count and by the approximate size of the
+    upstream payload. Cached values are returned as-is, so callers must treat
+    them as read-only.
+    """
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None):
+        if max_entries is None:
+            max_entries = int(os.getenv("CR_CACHE_MAX_ENTRIES", "1000"))
+        if max_bytes is None:
+            max_bytes = int(os.getenv("CR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._entries = OrderedDict()  # key -> (expires_at, size, value, endpoint_class)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._class_stats = {}  # endpoint_class -> {"hits": n, "misses": n}
+
+    def _record(self, endpoint_class: str, outcome: str):
+        stats = self._class_stats.setdefault(endpoint_class, {"hits": 0, "misses": 0})
+        stats[outcome] += 1
+
+    def _remove(self, key: str):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, endpoint: str):
+        """
+        Return the cached response for an endpoint, or None on a miss.
+        """
+        endpoint_class, ttl = classify_endpoint(endpoint)
+        if not ttl:
+            return None
+
+        key = cache_key(endpoint)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                self._record(endpoint_class, "misses")
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._record(endpoint_class, "hits")
+            return entry[2]
+
+    def set(self, endpoint: str, value, size: int, ttl: float = None):
+        """
+        Store a successful response.
+
+        Args:
+            endpoint: The API endpoint the response belongs to
+            value: The decoded JSON response
+            size: Size of the upstream payload in bytes, used for the byte budget
+            ttl: Override the endpoint class TTL (e.g. the remaining lifetime of a stored copy)
+        """
+        endpoint_class, class_ttl = classify_endpoint(endpoint)
+        if ttl is None:
+            ttl = class_ttl
+        if not class_ttl or ttl <= 0 or size > self.max_bytes:
+            return
+
+        key = cache_key(endpoint)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + ttl, size, value, endpoint_class)
+            self._bytes += size
+
+            # Evict least recently used entries until both budgets are met
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Report hit/miss counters and current occupancy.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "by_endpoint_class": {name: dict(stats) for name, stats in self._class_stats.items()}
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Return the process-wide ResponseCache, creating it on first use.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -1,5 +1,5 @@
 import logging
-from .utils import make_api_request
+from .utils import make_async_api_request
 
 logger = logging.getLogger(__name__)
 
@@ -9,10 +9,10 @@ def register_cards_tools(mcp):
     """
     
     @mcp.tool()
-    def get_cards(limit: int = None) -> dict:
+    async def get_cards(limit: int = None) -> dict:
         """
         Get a list of available cards from the Clash Royale API.
         Returns basic info like name, id, elixir cost, rarity, etc.
         """
         endpoint = f"cards?limit={limit}" if limit else "cards"
-        return make_api_request(endpoint)
+        return await make_async_api_request(endpoint)
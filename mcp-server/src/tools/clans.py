@@ -1,5 +1,6 @@
 import logging
-from .utils import make_api_request, encode_tag
+from .utils import make_async_api_request, encode_tag
+from .projection import shape, summarize_clan
 
 logger = logging.getLogger(__name__)
 
@@ -9,16 +10,20 @@ def register_clans_tools(mcp):
     """
     
     @mcp.tool()
-    def get_clan_info(clan_tag: str) -> dict:
+    async def get_clan_info(clan_tag: str, fields: list[str] = None, summary: bool = False) -> dict:
         """
         Fetch clan info from the Clash Royale API.
         
         Args:
             clan_tag: The clan tag to look up.
+            summary: Return headline stats and a compact member list (tag, name, role, trophies, donations). (optional)
+            fields: Only return these fields, as dotted paths (e.g. ["name", "memberList.name"]). Lists are
+                projected per element. Applied after summary. (optional)
         """
-        logger.info(f"get_clan_info called with clan_tag: {clan_tag}")
+        logger.info(f"get_clan_info called with clan_tag: {clan_tag}, fields={fields}, summary={summary}")
         
         encoded_tag = encode_tag(clan_tag)
         endpoint = f"clans/{encoded_tag}"
         
-        return make_api_request(endpoint)
+        result = await make_async_api_request(endpoint)
+        return shape(result, summarize_clan if summary else None, fields)
@@ -0,0 +1,112 @@
+import os
+import asyncio
+import logging
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncApiClient:
+    """
+    Shared HTTP client for the Clash Royale API.
+
+    A single httpx.AsyncClient keeps a keep-alive connection pool, and a
+    semaphore caps how many upstream requests may be in flight at once so a
+    burst of tool calls cannot overrun the proxy's rate limit.
+    """
+
+    def __init__(self, base_url: str, pool_size: int = None, timeout: float = None, max_concurrency: int = None):
+        if pool_size is None:
+            pool_size = int(os.getenv("CR_HTTP_POOL_SIZE", "10"))
+        if timeout is None:
+            timeout = float(os.getenv("CR_HTTP_TIMEOUT", "15"))
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("CR_MAX_CONCURRENT_REQUESTS", "10"))
+
+        self.base_url = base_url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            headers={
+                "Accept": "application/json",
+                "Accept-Encoding": "gzip, deflate"
+            }
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self._requests = 0
+        self._connections_opened = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+
+    async def _trace(self, event_name: str, info: dict):
+        # httpcore emits connect_tcp only when the pool has to open a new connection
+        if event_name == "connection.connect_tcp.complete":
+            self._connections_opened += 1
+
+    async def get(self, endpoint: str, headers: dict = None) -> httpx.Response:
+        """
+        Issue a GET request for an API endpoint, waiting for a concurrency slot first.
+
+        Args:
+            endpoint: The API endpoint to call (relative to the base URL)
+            headers: Extra per-request headers (e.g. Authorization)
+
+        Returns:
+            The raw httpx.Response
+        """
+        async with self._semaphore:
+            self._requests += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            try:
+                # The endpoint is already percent-encoded, so build the URL by hand
+                return await self.client.get(
+                    f"{self.base_url}/{endpoint}",
+                    headers=headers,
+                    extensions={"trace": self._trace}
+                )
+            finally:
+                self._in_flight -= 1
+
+    def stats(self) -> dict:
+        """
+        Report connection reuse and concurrency for this client.
+        """
+        reused = max(self._requests - self._connections_opened, 0)
+        return {
+            "pool_size": self.pool_size,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "requests": self._requests,
+            "connections_opened": self._connections_opened,
+            "connections_reused": reused,
+            "reuse_rate": round(reused / self._requests, 3) if self._requests else 0.0
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_async_client = None
+
+
+def get_async_client(base_url: str) -> AsyncApiClient:
+    """
+    Return the process-wide AsyncApiClient, creating it on first use.
+
+    Must be called from the event loop that serves the tools.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncApiClient(base_url)
+        logger.info(
+            f"Created async API client (pool_size={_async_client.pool_size}, "
+            f"max_concurrency={_async_client.max_concurrency})"
+        )
+    return _async_client
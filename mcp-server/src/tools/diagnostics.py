@@ -0,0 +1,34 @@
+import logging
+from .utils import get_async_api_client, get_response_store, get_request_flights
+from .cache import get_response_cache
+from .analytics import get_meta_refresher
+
+logger = logging.getLogger(__name__)
+
+def register_diagnostics_tools(mcp):
+    """
+    Register server diagnostics tools with the MCP server.
+
+    Args:
+        mcp: The FastMCP server instance
+    """
+
+    @mcp.tool()
+    def get_server_stats() -> dict:
+        """
+        Report runtime statistics for this MCP server, such as how often
+        upstream HTTP connections are reused and how often responses are
+        served from the cache.
+
+        Returns:
+            A dictionary of statistics grouped by component.
+        """
+        logger.info("get_server_stats called")
+
+        return {
+            "async_http": get_async_api_client().stats(),
+            "cache": get_response_cache().stats(),
+            "response_store": get_response_store().stats(),
+            "coalescing": get_request_flights().stats(),
+            "meta_snapshot": get_meta_refresher().stats()
+        }
@@ -1,5 +1,5 @@
 import logging
-from .utils import make_api_request
+from .utils import make_async_api_request
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +12,7 @@ def register_leaderboards_tools(mcp):
     """
     
     @mcp.tool()
-    def get_specific_leaderboard(
+    async def get_specific_leaderboard(
         leaderboard_id: int,
         limit: int = None,
         ) -> dict:
@@ -41,6 +41,6 @@ def register_leaderboards_tools(mcp):
 
         endpoint = f"leaderboards/{leaderboard_id}?limit={limit}" if limit else f"leaderboards/{leaderboard_id}"
         
-        result = make_api_request(endpoint)
+        result = await make_async_api_request(endpoint)
         logger.info(f"get_specific_leaderboard completed successfully. Found {len(result)} entries")
         return result
@@ -0,0 +1,188 @@
+import os
+import time
+import asyncio
+import logging
+from ..shared.codec import loads
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+DEFAULT_SEED_PATH = os.path.join(REPO_ROOT, "viz-dashboard", "src", "data", "meta_snapshot.json")
+
+
+def snapshot_from_dashboard(data: dict) -> dict:
+    """
+    Convert the dashboard's meta_snapshot.json into the get_meta_snapshot format.
+    """
+    total_decks = data.get("total_decks", 0)
+    return {
+        "meta_summary": {
+            "total_players_analyzed": data.get("total_players", 0),
+            "total_decks_analyzed": total_decks,
+            "partial": False,
+            "timestamp": data.get("timestamp")
+        },
+        "top_cards": [
+            {"card": card["name"], "count": card["count"], "usage_rate": f"{card['usage_rate']:.1f}%"}
+            for card in data.get("top_cards", [])[:10]
+        ],
+        "top_synergies": [
+            {
+                "pair": " + ".join(card["name"] for card in pair["cards"]),
+                "count": pair["count"],
+                "lift": pair.get("lift")
+            }
+            for pair in data.get("top_synergies", [])[:10]
+        ],
+        "archetypes": [
+            {"archetype": arch["name"], "count": arch["count"], "share": f"{arch['share']:.1f}%"}
+            for arch in data.get("archetypes", [])
+        ]
+    }
+
+
+class MetaSnapshotRefresher:
+    """
+    Keeps a precomputed meta snapshot in memory and refreshes it on a schedule.
+
+    get_meta_snapshot answers from this copy instead of crawling rankings and
+    battlelogs on every call. At startup the copy is seeded from the
+    dashboard's meta_snapshot.json, so the first answer is immediate even
+    before the first background crawl has finished.
+    """
+
+    def __init__(self, compute, interval: float = None, seed_path: str = None):
+        """
+        Args:
+            compute: Async callable returning a fresh snapshot dict
+            interval: Seconds between refreshes (CR_META_REFRESH_INTERVAL, default 1800);
+                0 disables background refreshes
+            seed_path: Dashboard snapshot to load at startup (CR_META_SEED_PATH)
+        """
+        if interval is None:
+            interval = float(os.getenv("CR_META_REFRESH_INTERVAL", "1800"))
+        if seed_path is None:
+            seed_path = os.getenv("CR_META_SEED_PATH", DEFAULT_SEED_PATH)
+        self.compute = compute
+        self.interval = interval
+        self.seed_path = seed_path
+        self.snapshot = None
+        self.computed_at = None
+        self.source = None
+        self.last_error = None
+        self.refreshes = 0
+        self._task = None
+        self._lock = asyncio.Lock()
+
+    def load_seed(self) -> bool:
+        """
+        Load the dashboard snapshot as the initial copy.
+
+        Its age comes from the snapshot's own timestamp rather than the file's
+        mtime, which a git checkout resets.
+        """
+        if not os.path.exists(self.seed_path):
+            return False
+        try:
+            with open(self.seed_path, "rb") as f:
+                data = loads(f.read())
+            snapshot = snapshot_from_dashboard(data)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not load meta snapshot seed {self.seed_path}: {e}")
+            return False
+
+        try:
+            computed_at = time.mktime(time.strptime(data.get("timestamp", ""), "%Y-%m-%d %H:%M:%S"))
+        except ValueError:
+            computed_at = os.path.getmtime(self.seed_path)
+        self.snapshot, self.computed_at, self.source = snapshot, computed_at, "seed"
+        logger.info(f"Seeded meta snapshot from {self.seed_path} ({self.age():.0f}s old)")
+        return True
+
+    def age(self):
+        return None if self.computed_at is None else max(time.time() - self.computed_at, 0)
+
+    async def refresh(self) -> bool:
+        """
+        Recompute the snapshot now. Concurrent calls share one crawl.
+
+        A failed crawl, or one that analyzed no players or no decks, leaves
+        the current snapshot in place and is reported in last_error.
+        """
+        async with self._lock:
+            started = time.time()
+            try:
+                snapshot = await self.compute()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Meta snapshot refresh failed: {e}")
+                return False
+            if "error" in snapshot:
+                self.last_error = snapshot.get("details") or snapshot["error"]
+                logger.warning(f"Meta snapshot refresh failed: {self.last_error}")
+                return False
+            summary = snapshot.get("meta_summary", {})
+            if not summary.get("total_players_analyzed") or not summary.get("total_decks_analyzed"):
+                # An empty crawl says nothing about the meta; keep serving the previous snapshot
+                self.last_error = (
+                    f"Refresh analyzed {summary.get('total_players_analyzed', 0)} players and "
+                    f"{summary.get('total_decks_analyzed', 0)} decks"
+                )
+                logger.warning(f"Meta snapshot refresh discarded: {self.last_error}")
+                return False
+
+            self.snapshot, self.computed_at, self.source = snapshot, started, "live"
+            self.last_error = None
+            self.refreshes += 1
+            logger.info(f"Meta snapshot refreshed in {time.time() - started:.1f}s")
+            return True
+
+    async def _run(self):
+        while True:
+            age = self.age()
+            if age is None or age >= self.interval:
+                await self.refresh()
+                age = 0
+            await asyncio.sleep(self.interval - age)
+
+    def start(self):
+        """
+        Seed the snapshot and start the background refresh task.
+        """
+        self.load_seed()
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get(self):
+        """
+        The current snapshot with its freshness, or None if there is none yet.
+        """
+        if self.snapshot is None:
+            return None
+        result = dict(self.snapshot)
+        result["meta_summary"] = {
+            **self.snapshot["meta_summary"],
+            "source": self.source,
+            "snapshot_age_seconds": round(self.age(), 1),
+            "refresh_interval_seconds": self.interval
+        }
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "source": self.source,
+            "age_seconds": None if self.computed_at is None else round(self.age(), 1),
+            "interval_seconds": self.interval,
+            "refreshes": self.refreshes,
+            "running": self._task is not None and not self._task.done(),
+            "last_error": self.last_error
+        }
@@ -1,5 +1,6 @@
 import logging
-from .utils import make_api_request, encode_tag
+from .utils import make_async_api_request, encode_tag
+from .projection import shape, summarize_player, summarize_battle
 
 logger = logging.getLogger(__name__)
 
@@ -9,31 +10,41 @@ def register_players_tools(mcp):
     """
     
     @mcp.tool()
-    def get_player_info(player_tag: str) -> dict:
+    async def get_player_info(player_tag: str, fields: list[str] = None, summary: bool = False) -> dict:
         """
         Fetch player info from the Clash Royale API.
         
         Args:
             player_tag: The player tag to look up (e.g. #ABCDEF or ABCDEF).
+            summary: Return only headline stats, clan, arena and the current deck as card names
+                instead of the full profile with every card and badge. (optional)
+            fields: Only return these fields, as dotted paths (e.g. ["name", "trophies", "clan.name"]). Lists are
+                projected per element. Applied after summary. (optional)
         """
-        logger.info(f"get_player_info called with player_tag: {player_tag}")
+        logger.info(f"get_player_info called with player_tag: {player_tag}, fields={fields}, summary={summary}")
         
         encoded_tag = encode_tag(player_tag)
         endpoint = f"players/{encoded_tag}"
         
-        return make_api_request(endpoint)
+        result = await make_async_api_request(endpoint)
+        return shape(result, summarize_player if summary else None, fields)
 
     @mcp.tool()
-    def get_player_battle_log(player_tag: str) -> dict:
+    async def get_player_battle_log(player_tag: str, fields: list[str] = None, summary: bool = False) -> dict:
         """
         Fetch battle log for a player from the Clash Royale API.
         
         Args:
             player_tag: The player tag to look up.
+            summary: Return each battle as result, crowns, trophy change and both decks as card names
+                instead of full card objects. (optional)
+            fields: Only return these fields, as dotted paths (e.g. ["battleTime", "team.crowns", "opponent.cards.name"]). Lists are
+                projected per element. Applied after summary. (optional)
         """
-        logger.info(f"get_player_battle_log called with player_tag: {player_tag}")
+        logger.info(f"get_player_battle_log called with player_tag: {player_tag}, fields={fields}, summary={summary}")
         
         encoded_tag = encode_tag(player_tag)
         endpoint = f"players/{encoded_tag}/battlelog"
         
-        return make_api_request(endpoint)
+        result = await make_async_api_request(endpoint)
+        return shape(result, summarize_battle if summary else None, fields)
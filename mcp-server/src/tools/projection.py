@@ -0,0 +1,151 @@
+# Response shaping for the player and clan tools. Results from
+# make_async_api_request are shared with the response cache, so everything
+# here builds new objects and never modifies its input.
+
+# evolutionLevel in battle log cards: 1 = Evolution, 2 = Hero
+CARD_VARIANT_SUFFIX = {1: " (Evo)", 2: " (Hero)"}
+
+
+def _field_tree(fields):
+    """
+    Turn dotted paths into a nested dict; None marks "keep the whole value".
+    """
+    tree = {}
+    for field in fields:
+        node = tree
+        parts = field.strip().split(".")
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node[part] = None
+            elif node.get(part, {}) is None:
+                break  # a shorter path already keeps the whole value
+            else:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def _apply(value, tree):
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_apply(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _apply(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
+
+
+def project(data, fields):
+    """
+    Keep only the given fields of an API result.
+
+    Fields are dotted paths; lists are projected element by element, so on a
+    battle log "team.cards.name" keeps just the card names of each battle.
+
+    Args:
+        data: API result (dict or list)
+        fields: Dotted paths to keep, e.g. ["name", "trophies", "clan.name"]
+    """
+    if not fields:
+        return data
+    return _apply(data, _field_tree(fields))
+
+
+def _card_names(cards):
+    return [card["name"] + CARD_VARIANT_SUFFIX.get(card.get("evolutionLevel", 0), "") for card in cards or []]
+
+
+def summarize_battle(battle):
+    """
+    One battle as result, score, trophy change and both decks by card name.
+    """
+    team = (battle.get("team") or [{}])[0]
+    opponent = (battle.get("opponent") or [{}])[0]
+    crowns, opponent_crowns = team.get("crowns", 0), opponent.get("crowns", 0)
+    if crowns > opponent_crowns:
+        result = "win"
+    elif crowns < opponent_crowns:
+        result = "loss"
+    else:
+        result = "draw"
+    return {
+        "battleTime": battle.get("battleTime"),
+        "type": battle.get("type"),
+        "gameMode": (battle.get("gameMode") or {}).get("name"),
+        "result": result,
+        "crowns": f"{crowns}-{opponent_crowns}",
+        "trophyChange": team.get("trophyChange"),
+        "deck": _card_names(team.get("cards")),
+        "opponent": {"tag": opponent.get("tag"), "name": opponent.get("name")},
+        "opponentDeck": _card_names(opponent.get("cards"))
+    }
+
+
+def summarize_player(player):
+    """
+    Profile headline stats, clan, arena and the current deck by card name.
+    """
+    clan = player.get("clan") or {}
+    path_of_legend = player.get("currentPathOfLegendSeasonResult") or {}
+    return {
+        "tag": player.get("tag"),
+        "name": player.get("name"),
+        "expLevel": player.get("expLevel"),
+        "trophies": player.get("trophies"),
+        "bestTrophies": player.get("bestTrophies"),
+        "wins": player.get("wins"),
+        "losses": player.get("losses"),
+        "threeCrownWins": player.get("threeCrownWins"),
+        "arena": (player.get("arena") or {}).get("name"),
+        "clan": {"tag": clan.get("tag"), "name": clan.get("name"), "role": player.get("role")} if clan else None,
+        "pathOfLegend": {
+            "leagueNumber": path_of_legend.get("leagueNumber"),
+            "trophies": path_of_legend.get("trophies"),
+            "rank": path_of_legend.get("rank")
+        } if path_of_legend else None,
+        "currentDeck": _card_names(player.get("currentDeck")),
+        "favouriteCard": (player.get("currentFavouriteCard") or {}).get("name")
+    }
+
+
+def summarize_clan(clan):
+    """
+    Clan headline stats and a compact member list.
+    """
+    return {
+        "tag": clan.get("tag"),
+        "name": clan.get("name"),
+        "type": clan.get("type"),
+        "location": (clan.get("location") or {}).get("name"),
+        "clanScore": clan.get("clanScore"),
+        "clanWarTrophies": clan.get("clanWarTrophies"),
+        "requiredTrophies": clan.get("requiredTrophies"),
+        "members": clan.get("members"),
+        "memberList": [
+            {
+                "tag": member.get("tag"),
+                "name": member.get("name"),
+                "role": member.get("role"),
+                "trophies": member.get("trophies"),
+                "donations": member.get("donations")
+            }
+            for member in clan.get("memberList", [])
+        ]
+    }
+
+
+def shape(result, summarize=None, fields=None):
+    """
+    Apply summary mode and then field projection to a tool result.
+
+    Error results from make_async_api_request are returned untouched.
+
+    Args:
+        result: API result (a dict, or a list for the battle log)
+        summarize: Per-object summary function, or None to keep the raw shape
+        fields: Dotted paths to keep (applied after summarizing)
+    """
+    if isinstance(result, dict) and result.get("error"):
+        return result
+    if summarize is not None:
+        result = [summarize(item) for item in result] if isinstance(result, list) else summarize(result)
+    return project(result, fields)
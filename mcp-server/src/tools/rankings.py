@@ -1,8 +1,53 @@
 import logging
-from .utils import make_api_request, build_query_string, encode_tag
+from .utils import make_async_api_request, build_query_string, encode_tag
+from ..shared.paginator import aiter_items, cursor_page, DEFAULT_PAGE_SIZE
 
 logger = logging.getLogger(__name__)
 
+async def fetch_ranking(endpoint: str, limit: int = None, after: str = None, before: str = None, total: int = None) -> dict:
+    """
+    Fetch a ranking endpoint: one page, or with total, every page up to total items.
+
+    Pages are walked forward from `after` with the shared prefetching
+    paginator, so each page is requested while the previous one is still
+    being collected.
+
+    Returns:
+        The API page as-is, or {"items", "total", "partial"} when total is set
+        (partial if a page failed part-way through)
+    """
+    if total is None:
+        # Create a dictionary with only the non-None parameters
+        queries = {k: v for k, v in {
+            "limit": limit,
+            "after": after,
+            "before": before
+        }.items() if v is not None}
+
+        if queries:
+            endpoint += "?" + build_query_string(queries)
+
+        return await make_async_api_request(endpoint)
+
+    if before is not None:
+        raise ValueError("'before' cannot be combined with 'total'; pagination only walks forward from 'after'.")
+
+    errors = []
+
+    async def fetch_page(cursor, page_limit):
+        queries = {"limit": page_limit}
+        if cursor:
+            queries["after"] = cursor
+        data = await make_async_api_request(f"{endpoint}?{build_query_string(queries)}")
+        if isinstance(data, dict) and data.get("error"):
+            errors.append(data)
+        return cursor_page(data)
+
+    items = [item async for item in aiter_items(fetch_page, max_items=total, page_size=limit or DEFAULT_PAGE_SIZE, cursor=after)]
+    if errors and not items:
+        return errors[0]
+    return {"items": items, "total": len(items), "partial": bool(errors)}
+
 def register_ranking_tools(mcp):
     """
     Register all ranking-related tools with the MCP server.
@@ -12,7 +57,7 @@ def register_ranking_tools(mcp):
     """
     
     @mcp.tool()
-    def get_locations() -> dict:
+    async def get_locations() -> dict:
         """
         Fetch a list of all the available locations alongside their ids from the Clash Royale API.
         
@@ -23,12 +68,12 @@ def register_ranking_tools(mcp):
         
         endpoint = "locations"
         
-        result = make_api_request(endpoint)
+        result = await make_async_api_request(endpoint)
         logger.info(f"get_locations completed successfully. Retrieved {len(result)} locations")
         return result
 
     @mcp.tool()
-    def get_seasons() -> dict:
+    async def get_seasons() -> dict:
         """
         Fetch a list of all the available seasons alongside their ids from the Clash Royale API.
         
@@ -39,18 +84,19 @@ def register_ranking_tools(mcp):
         
         endpoint = "locations/global/seasonsV2"
         
-        result = make_api_request(endpoint)
+        result = await make_async_api_request(endpoint)
         logger.info(f"get_seasons completed successfully. Retrieved {len(result)} seasons")
         return result
     
     
     # Path of legends ranking tools
     @mcp.tool()
-    def get_location_path_of_legends_player_rankings(
+    async def get_location_path_of_legends_player_rankings(
         location_id: int,
         limit: int = None,
         after: str = None,
-        before: str = None
+        before: str = None,
+        total: int = None
         ) -> dict:
         """
         Fetch Path of Legends player rankings for a specific location from the Clash Royale API.
@@ -65,11 +111,14 @@ def register_ranking_tools(mcp):
             
             before: Return only items that occur before this marker. Before marker can be found from the response, inside the 'paging' property.
                 Note that only after or before can be specified for a request, not both. (optional)
+
+            total: Fetch this many items across as many pages as needed (starting at 'after' if given) and return them
+                in one list, instead of a single page. 'limit' then sets the page size. Cannot be combined with 'before'. (optional)
             
         Returns:
             Path of Legends player rankings for the specified location.
         """
-        logger.info(f"get_location_path_of_legends_player_rankings called with location_id={location_id}, limit={limit}, after={after}, before={before}")
+        logger.info(f"get_location_path_of_legends_player_rankings called with location_id={location_id}, limit={limit}, after={after}, before={before}, total={total}")
         
         # Validate that only one of after or before is provided
         if after is not None and before is not None:
@@ -78,26 +127,17 @@ def register_ranking_tools(mcp):
             
         endpoint = f"locations/{location_id}/pathoflegend/players"
         
-        # Create a dictionary with only the non-None parameters
-        queries = {k: v for k, v in {
-            "limit": limit,
-            "after": after,
-            "before": before
-        }.items() if v is not None}
-        
-        if queries:
-            endpoint += "?" + build_query_string(queries)
-        
-        result = make_api_request(endpoint)
+        result = await fetch_ranking(endpoint, limit, after, before, total)
         logger.info(f"get_location_path_of_legends_player_rankings completed successfully. Found {len(result)} player rankings")
         return result
     
     @mcp.tool()
-    def get_top_path_of_legends_players_rankings(
+    async def get_top_path_of_legends_players_rankings(
         season_id: str,
         limit: int = None,
         after: str = None,
-        before: str = None
+        before: str = None,
+        total: int = None
         ) -> dict:
         """
         Fetch global Path of Legends player rankings for a specific season from the Clash Royale API.
@@ -112,11 +152,14 @@ def register_ranking_tools(mcp):
             
             before: Return only items that occur before this marker. Before marker can be found from the response, inside the 'paging' property.
                 Note that only after or before can be specified for a request, not both. (optional)
+
+            total: Fetch this many items across as many pages as needed (starting at 'after' if given) and return them
+                in one list, instead of a single page. 'limit' then sets the page size. Cannot be combined with 'before'. (optional)
             
         Returns:
             Path of Legends player rankings for the specified season.
         """
-        logger.info(f"get_top_path_of_legends_players_rankings called with season_id={season_id}, limit={limit}, after={after}, before={before}")
+        logger.info(f"get_top_path_of_legends_players_rankings called with season_id={season_id}, limit={limit}, after={after}, before={before}, total={total}")
         
         # Validate that only one of after or before is provided
         if after is not None and before is not None:
@@ -127,28 +170,19 @@ def register_ranking_tools(mcp):
         encoded_season_id = encode_tag(season_id)
         endpoint = f"locations/global/pathoflegend/{encoded_season_id}/rankings/players"
         
-        # Create a dictionary with only the non-None parameters
-        queries = {k: v for k, v in {
-            "limit": limit,
-            "after": after,
-            "before": before
-        }.items() if v is not None}
-        
-        if queries:
-            endpoint += "?" + build_query_string(queries)
-        
-        result = make_api_request(endpoint)
+        result = await fetch_ranking(endpoint, limit, after, before, total)
         logger.info(f"get_top_path_of_legends_players_rankings completed successfully. Found {len(result)} player rankings")
         return result
     
     
     # Clan ranking tools
     @mcp.tool()
-    def get_location_clan_rankings(
+    async def get_location_clan_rankings(
         location_id: int,
         limit: int = None,
         after: str = None,
-        before: str = None
+        before: str = None,
+        total: int = None
         ) -> dict:
         """
         Fetch clan rankings for a specific location from the Clash Royale API.
@@ -163,11 +197,14 @@ def register_ranking_tools(mcp):
             
             before: Return only items that occur before this marker. Before marker can be found from the response, inside the 'paging' property.
                 Note that only after or before can be specified for a request, not both. (optional)
+
+            total: Fetch this many items across as many pages as needed (starting at 'after' if given) and return them
+                in one list, instead of a single page. 'limit' then sets the page size. Cannot be combined with 'before'. (optional)
             
         Returns:
             Clan rankings for the specified location.
         """
-        logger.info(f"get_location_clan_rankings called with location_id={location_id}, limit={limit}, after={after}, before={before}")
+        logger.info(f"get_location_clan_rankings called with location_id={location_id}, limit={limit}, after={after}, before={before}, total={total}")
         
         # Validate that only one of after or before is provided
         if after is not None and before is not None:
@@ -176,26 +213,17 @@ def register_ranking_tools(mcp):
             
         endpoint = f"locations/{location_id}/rankings/clans"
         
-        # Create a dictionary with only the non-None parameters
-        queries = {k: v for k, v in {
-            "limit": limit,
-            "after": after,
-            "before": before
-        }.items() if v is not None}
-        
-        if queries:
-            endpoint += "?" + build_query_string(queries)
-        
-        result = make_api_request(endpoint)
+        result = await fetch_ranking(endpoint, limit, after, before, total)
         logger.info(f"get_location_clan_rankings completed successfully. Found {len(result)} clan rankings")
         return result
 
     @mcp.tool()
-    def get_location_clan_war_rankings(
+    async def get_location_clan_war_rankings(
         location_id: int,
         limit: int = None,
         after: str = None,
-        before: str = None
+        before: str = None,
+        total: int = None
         ) -> dict:
         """
         Fetch clan war rankings for a specific location from the Clash Royale API.
@@ -210,11 +238,14 @@ def register_ranking_tools(mcp):
             
             before: Return only items that occur before this marker. Before marker can be found from the response, inside the 'paging' property.
                 Note that only after or before can be specified for a request, not both. (optional)
+
+            total: Fetch this many items across as many pages as needed (starting at 'after' if given) and return them
+                in one list, instead of a single page. 'limit' then sets the page size. Cannot be combined with 'before'. (optional)
             
         Returns:
             Clan war rankings for the specified location.
         """
-        logger.info(f"get_location_clan_war_rankings called with location_id={location_id}, limit={limit}, after={after}, before={before}")
+        logger.info(f"get_location_clan_war_rankings called with location_id={location_id}, limit={limit}, after={after}, before={before}, total={total}")
         
         # Validate that only one of after or before is provided
         if after is not None and before is not None:
@@ -223,16 +254,6 @@ def register_ranking_tools(mcp):
             
         endpoint = f"locations/{location_id}/rankings/clanwars"
         
-        # Create a dictionary with only the non-None parameters
-        queries = {k: v for k, v in {
-            "limit": limit,
-            "after": after,
-            "before": before
-        }.items() if v is not None}
-        
-        if queries:
-            endpoint += "?" + build_query_string(queries)
-        
-        result = make_api_request(endpoint)
+        result = await fetch_ranking(endpoint, limit, after, before, total)
         logger.info(f"get_location_clan_war_rankings completed successfully. Found {len(result)} clan war rankings")
         return result
@@ -0,0 +1,46 @@
+import asyncio
+
+
+class AsyncSingleFlight:
+    """
+    Collapse concurrent identical calls into one.
+
+    The first caller for a key starts the call; callers that arrive while it
+    is still running await the same result (or exception) instead of
+    starting their own. Nothing is remembered once the call finishes -
+    caching is the ResponseCache's job.
+
+    The shared call runs as its own task and every caller awaits it through
+    asyncio.shield, so a caller that gives up (e.g. get_meta_snapshot's
+    deadline cancelling its fan-out) does not cancel the request for the
+    others still waiting on it.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "executed_calls": self.leaders,
+            "coalesced_calls": self.coalesced,
+            "coalesce_ratio": round(self.coalesced / calls, 4) if calls else 0.0
+        }
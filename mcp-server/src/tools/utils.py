@@ -1,7 +1,14 @@
 import os
-import requests
+import asyncio
+import threading
+import httpx
 import logging
 from dotenv import load_dotenv
+from .client import get_async_client
+from .cache import get_response_cache, classify_endpoint, cache_key
+from .singleflight import AsyncSingleFlight
+from ..shared.response_store import ResponseStore
+from ..shared.codec import loads, encode_body, decode_body
 
 # Configure logging
 logging.basicConfig(
@@ -21,10 +28,91 @@ CR_API_KEY = os.getenv("CR_PROXY_API_KEY")
 def get_api_key():
     return os.getenv("CR_PROXY_API_KEY")
 
-def make_api_request(endpoint: str) -> dict:
+def get_async_api_client():
     """
-    Make an API request to the Clash Royale API.
-    
+    Return the shared asyncio client used by every tool in src/tools.
+    """
+    return get_async_client(CR_API_BASE)
+
+_store = None
+_store_lock = threading.Lock()
+
+# Identical concurrent requests share one upstream call (keyed like the cache)
+_async_flights = AsyncSingleFlight()
+
+def get_request_flights():
+    """
+    Return the request coalescer used by make_async_api_request.
+    """
+    return _async_flights
+
+def get_response_store():
+    """
+    Return the on-disk response store shared with the data pipeline,
+    opening it (and collecting expired entries) on first use.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResponseStore()
+                _store.gc()
+                logger.info(f"Opened response store at {_store.path}")
+    return _store
+
+def _lookup_stored(endpoint: str):
+    """
+    Look an endpoint up in the on-disk store after an in-process cache miss.
+
+    Returns:
+        (result, stored) - result is set when a fresh copy can be served locally,
+        otherwise stored is the stale entry (or None) to revalidate upstream.
+    """
+    _, ttl = classify_endpoint(endpoint)
+    if not ttl:
+        return None, None
+
+    stored, fresh = get_response_store().lookup(cache_key(endpoint), ttl)
+    if stored is None or not fresh:
+        return None, stored
+
+    result = decode_body(stored.body)
+    get_response_cache().set(endpoint, result, len(stored.body), ttl=ttl - stored.age())
+    return result, stored
+
+def _remember_response(endpoint: str, body: bytes, response_headers) -> dict:
+    """
+    Decode a 200 response and keep it in both the in-process cache and the on-disk store.
+    """
+    result = loads(body)
+    get_response_cache().set(endpoint, result, len(body))
+    if classify_endpoint(endpoint)[1]:
+        get_response_store().put(
+            cache_key(endpoint),
+            encode_body(result),
+            etag=response_headers.get("ETag"),
+            last_modified=response_headers.get("Last-Modified")
+        )
+    return result
+
+def _revalidated_response(endpoint: str, stored) -> dict:
+    """
+    Serve a stored body after upstream answered 304 Not Modified.
+    """
+    get_response_store().touch(stored.key)
+    result = decode_body(stored.body)
+    get_response_cache().set(endpoint, result, len(stored.body))
+    return result
+
+async def make_async_api_request(endpoint: str) -> dict:
+    """
+    Make an API request to the Clash Royale API without blocking the event loop.
+
+    Runs on the shared httpx client so many tool calls can wait on upstream
+    concurrently. Concurrent calls for the same endpoint (query order aside)
+    that miss the in-process cache share one lookup and upstream request
+    instead of each sending their own.
+
     Args:
         endpoint: The API endpoint to call
         
@@ -35,21 +123,42 @@ def make_api_request(endpoint: str) -> dict:
     if not api_key:
         raise ValueError("CR_API_KEY environment variable is not set. Please create a .env file with your API key.")
 
-    url = f"{CR_API_BASE}/{endpoint}"
-    
-    logger.info(f"Making API request to: {url}")
-        
+    cached = get_response_cache().get(endpoint)
+    if cached is not None:
+        logger.info(f"Cache hit for: {endpoint}")
+        return cached
+
+    return await _async_flights.do(cache_key(endpoint), lambda: _fetch_async(endpoint, api_key))
+
+async def _fetch_async(endpoint: str, api_key: str) -> dict:
+    """
+    Resolve a cache miss for make_async_api_request: response store, then upstream.
+    """
+    # SQLite access is blocking, so keep it off the event loop
+    result, stored = await asyncio.to_thread(_lookup_stored, endpoint)
+    if result is not None:
+        logger.info(f"Response store hit for: {endpoint}")
+        return result
+
+    client = get_async_api_client()
+    url = f"{client.base_url}/{endpoint}"
+
+    logger.info(f"Making async API request to: {url}")
+
     headers = {
         "Authorization": f"Bearer {api_key}"
     }
+    if stored is not None:
+        headers.update(stored.conditional_headers())
 
     try:
-        response = requests.get(url, headers=headers)
+        response = await client.get(endpoint, headers=headers)
+        if response.status_code == 304 and stored is not None:
+            return await asyncio.to_thread(_revalidated_response, endpoint, stored)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.HTTPError as e:
+        return await asyncio.to_thread(_remember_response, endpoint, response.content, response.headers)
+    except httpx.HTTPStatusError as e:
         logger.error(f"API request failed. Status: {response.status_code}, Response: {response.text}")
-        # Return a helpful error message structure instead of crashing
         return {
             "error": True,
             "status": response.status_code,
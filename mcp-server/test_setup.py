@@ -1,7 +1,7 @@
 import os
 import sys
 from dotenv import load_dotenv
-import requests
+import httpx
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
@@ -27,7 +27,7 @@ def test_environment():
     headers = {"Authorization": f"Bearer {api_key}"}
     
     try:
-        response = requests.get(url, headers=headers)
+        response = httpx.get(url, headers=headers)
         print(f"Status Code: {response.status_code}")
         
         if response.status_code == 200:
@@ -10,6 +10,7 @@ if [ $? -eq 0 ]; then
     
     # 3. Add the new data files to git
     git add viz-dashboard/src/data/meta_snapshot.json
+    git add viz-dashboard/public/data/meta/
     git add viz-dashboard/public/cards/
     
     # 4. Commit the changes
@@ -11,6 +11,20 @@ const nextConfig: NextConfig = {
       },
     ],
   },
+  async headers() {
+    return [
+      {
+        // Snapshot sections are content-hashed (see scripts/snapshot_sections.py), so they never change
+        source: '/data/meta/:file([^/]+\\.[0-9a-f]{12}\\.json)',
+        headers: [{ key: 'Cache-Control', value: 'public, max-age=31536000, immutable' }],
+      },
+      {
+        // Sprite atlases are content-hashed too (see scripts/card_images.py)
+        source: '/cards/opt/:file(atlas-[a-z]+\\.[0-9a-f]{12}\\.[a-z]+)',
+        headers: [{ key: 'Cache-Control', value: 'public, max-age=31536000, immutable' }],
+      },
+    ];
+  },
 };
 
 export default nextConfig;
@@ -0,0 +1,319 @@
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# Deck types, archetype rules and the synergy engine are shared with the
+# MCP server (mcp-server/src/shared)
+MCP_SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mcp-server'))
+if MCP_SERVER_DIR not in sys.path:
+    sys.path.append(MCP_SERVER_DIR)
+from src.shared.synergy import SynergyMatrix
+from src.shared.decks import Deck, CLASSIFIER
+
+# Separator used when tuples of card names are flattened into JSON keys
+KEY_SEP = "|"
+
+# Battles per worker task in aggregate_parallel; smaller batches are folded in-process
+AGG_CHUNK_SIZE = 2000
+
+
+def detect_variant(deck, card_map):
+    """
+    Split a deck into the cards played as Evolutions and as Heroes.
+
+    Returns:
+        (evos, heroes) - lists of card names
+    """
+    evos = []
+    heroes = []
+    for c in deck:
+        name = c["name"]
+        card_static_info = card_map.get(name, {})
+
+        # Capabilities
+        can_be_evo = bool(card_static_info.get("evo_icon"))
+        can_be_hero = bool(card_static_info.get("hero_icon"))
+
+        is_evo = False
+        is_hero = False
+
+        # Check signals from Battle Log
+        # User specified: evolutionLevel 1 = Evo, 2 = Hero
+        evo_level = c.get("evolutionLevel", 0)
+
+        if evo_level == 1:
+            is_evo = True
+        elif evo_level == 2:
+            is_hero = True
+
+        # Fallback: check icon URL if level is 0 (just in case)
+        if evo_level == 0:
+            icon_url = c.get("iconUrls", {}).get("medium", "")
+            if "evo" in icon_url:
+                is_evo = True
+            elif "hero" in icon_url:
+                is_hero = True
+
+        # Final Sanity Check: If flagged as Evo but only has Hero asset -> Hero
+        # (This might still be useful if API is inconsistent, but the level logic should be primary)
+        if is_evo and can_be_hero and not can_be_evo:
+            is_evo = False
+            is_hero = True
+
+        if is_evo:
+            evos.append(name)
+        elif is_hero:
+            heroes.append(name)
+    return evos, heroes
+
+
+class MetaAggregates:
+    """
+    Running battle aggregates behind meta_snapshot.json.
+
+    Battles are folded in one at a time with add_battle(), and the whole
+    state round-trips through plain JSON (to_state / from_state) so it can
+    be persisted between pipeline runs and only new battles need counting.
+    Every field is a sum, so aggregates built from disjoint sets of battles
+    (e.g. in separate worker processes) combine exactly with merge().
+    """
+
+    def __init__(self):
+        self.card_counts = Counter()
+        self.card_games = Counter() # games with a recorded result, per card
+        self.card_wins = Counter()
+        self.synergy = SynergyMatrix() # card co-occurrence matrix
+        self.archetype_counts = Counter()
+        self.deck_counts = Counter() # { Deck: count }
+        self.deck_wins = Counter() # { Deck: wins }
+        self.deck_variant_counts = {} # { Deck: { (evos_tuple, heroes_tuple): {count, wins} } }
+        self.elixir_stats = {} # { "3.1": { "wins": 10, "total": 20 } }
+        # Regional Archetype Tracking
+        self.regional_archetypes = {} # { "JP": {"Cycle": 10, "Beatdown": 5}, "US": {...} }
+        self.total_decks = 0
+
+    def add_battle(self, battle_record, card_map, region=None):
+        """
+        Fold one battle into the aggregates.
+
+        Args:
+            battle_record: {"cards": [...], "win": 0/1} as built by fetch_player_battles
+            card_map: Card metadata keyed by name (from fetch_assets)
+            region: The player's region, or None/"Unknown" if not known
+
+        Returns:
+            The detected archetype of the deck
+        """
+        deck = battle_record["cards"]
+        is_win = battle_record["win"]
+
+        card_names = [c["name"] for c in deck]
+        self.card_counts.update(card_names)
+        self.card_games.update(card_names)
+        if is_win:
+            self.card_wins.update(card_names)
+
+        # Calculate Avg Elixir
+        deck_cost = sum([c.get("elixirCost", 0) for c in deck])
+        avg_elixir = round(deck_cost / 8, 1)
+        elixir_key = str(avg_elixir)
+
+        if elixir_key not in self.elixir_stats:
+            self.elixir_stats[elixir_key] = {"wins": 0, "total": 0}
+        self.elixir_stats[elixir_key]["total"] += 1
+        self.elixir_stats[elixir_key]["wins"] += is_win
+
+        deck_key = Deck.from_names(card_names)
+
+        if len(card_names) == 8:
+            self.deck_counts[deck_key] += 1
+            self.deck_wins[deck_key] += is_win
+
+            # Identify Evos and Heroes
+            evos, heroes = detect_variant(deck, card_map)
+
+            # Track variant (Evos + Heroes)
+            variant_key = (tuple(sorted(evos)), tuple(sorted(heroes)))
+
+            if deck_key not in self.deck_variant_counts:
+                self.deck_variant_counts[deck_key] = {}
+
+            if variant_key not in self.deck_variant_counts[deck_key]:
+                self.deck_variant_counts[deck_key][variant_key] = {"count": 0, "wins": 0}
+
+            self.deck_variant_counts[deck_key][variant_key]["count"] += 1
+            self.deck_variant_counts[deck_key][variant_key]["wins"] += is_win
+
+        self.synergy.add_deck(card_names)
+        detected = CLASSIFIER.classify(deck_key)
+        self.archetype_counts[detected] += 1
+        self.total_decks += 1
+
+        # Link Archetype to Region
+        if region and region != "Unknown" and detected != "Unknown":
+            self.regional_archetypes.setdefault(region, Counter())[detected] += 1
+        return detected
+
+    def add_battles(self, rows, card_map):
+        """
+        Fold a batch of (player_tag, region, battle_record) rows into the aggregates.
+        """
+        for _, region, battle_record in rows:
+            if battle_record:
+                self.add_battle(battle_record, card_map, region=region)
+        return self
+
+    def merge(self, other):
+        """
+        Add another MetaAggregates into this one.
+
+        Returns:
+            self, so partial results can be reduced with functools.reduce
+        """
+        self.card_counts.update(other.card_counts)
+        self.card_games.update(other.card_games)
+        self.card_wins.update(other.card_wins)
+        self.synergy.merge(other.synergy)
+        self.archetype_counts.update(other.archetype_counts)
+        self.deck_counts.update(other.deck_counts)
+        self.deck_wins.update(other.deck_wins)
+        for deck, variants in other.deck_variant_counts.items():
+            mine = self.deck_variant_counts.setdefault(deck, {})
+            for variant_key, stats in variants.items():
+                totals = mine.setdefault(variant_key, {"count": 0, "wins": 0})
+                totals["count"] += stats["count"]
+                totals["wins"] += stats["wins"]
+        for elixir_key, stats in other.elixir_stats.items():
+            totals = self.elixir_stats.setdefault(elixir_key, {"wins": 0, "total": 0})
+            totals["wins"] += stats["wins"]
+            totals["total"] += stats["total"]
+        for region, counts in other.regional_archetypes.items():
+            self.regional_archetypes.setdefault(region, Counter()).update(counts)
+        self.total_decks += other.total_decks
+        return self
+
+    def to_state(self):
+        """
+        Serialize the aggregates into JSON-compatible data.
+        """
+        return {
+            "total_decks": self.total_decks,
+            "card_counts": dict(self.card_counts),
+            "card_games": dict(self.card_games),
+            "card_wins": dict(self.card_wins),
+            "synergy": self.synergy.to_state(),
+            "archetype_counts": dict(self.archetype_counts),
+            "deck_counts": {KEY_SEP.join(deck): count for deck, count in self.deck_counts.items()},
+            "deck_wins": {KEY_SEP.join(deck): wins for deck, wins in self.deck_wins.items()},
+            "deck_variant_counts": {
+                KEY_SEP.join(deck): [
+                    {"evos": list(evos), "heroes": list(heroes), **stats}
+                    for (evos, heroes), stats in variants.items()
+                ]
+                for deck, variants in self.deck_variant_counts.items()
+            },
+            "elixir_stats": self.elixir_stats,
+            "regional_archetypes": {region: dict(counts) for region, counts in self.regional_archetypes.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Rebuild aggregates from the output of to_state().
+        """
+        agg = cls()
+        if not state:
+            return agg
+        agg.total_decks = state.get("total_decks", 0)
+        agg.card_counts = Counter(state.get("card_counts", {}))
+        agg.card_games = Counter(state.get("card_games", {}))
+        agg.card_wins = Counter(state.get("card_wins", {}))
+        agg.synergy = SynergyMatrix.from_state(state.get("synergy"))
+        agg.archetype_counts = Counter(state.get("archetype_counts", {}))
+        agg.deck_counts = Counter({
+            Deck.from_names(key.split(KEY_SEP)): count for key, count in state.get("deck_counts", {}).items()
+        })
+        agg.deck_variant_counts = {
+            Deck.from_names(key.split(KEY_SEP)): {
+                (tuple(v["evos"]), tuple(v["heroes"])): {"count": v["count"], "wins": v["wins"]}
+                for v in variants
+            }
+            for key, variants in state.get("deck_variant_counts", {}).items()
+        }
+        agg.deck_wins = Counter({
+            Deck.from_names(key.split(KEY_SEP)): wins for key, wins in state.get("deck_wins", {}).items()
+        })
+        agg.elixir_stats = {k: dict(v) for k, v in state.get("elixir_stats", {}).items()}
+        agg.regional_archetypes = {
+            region: Counter(counts) for region, counts in state.get("regional_archetypes", {}).items()
+        }
+        return agg
+
+
+# Card metadata for worker processes, sent once per worker by the pool initializer
+_worker_card_map = None
+
+
+def _init_worker(card_map):
+    global _worker_card_map
+    _worker_card_map = card_map
+
+
+def _aggregate_chunk(rows, card_map=None, key=None):
+    card_map = _worker_card_map if card_map is None else card_map
+    if key is None:
+        agg = MetaAggregates().add_battles(rows, card_map)
+        agg.synergy.flush()
+        return agg
+
+    groups = {}
+    for row in rows:
+        groups.setdefault(key(row[2]), []).append(row)
+    return {group: _aggregate_chunk(group_rows, card_map) for group, group_rows in groups.items()}
+
+
+def _combine(result, partial):
+    if isinstance(result, MetaAggregates):
+        return result.merge(partial)
+    for group, agg in partial.items():
+        if group in result:
+            result[group].merge(agg)
+        else:
+            result[group] = agg
+    return result
+
+
+def aggregate_parallel(rows, card_map, workers=None, chunk_size=AGG_CHUNK_SIZE, key=None):
+    """
+    Map/reduce aggregation of battle rows across worker processes.
+
+    Rows are split into chunks, each chunk is folded into its own
+    MetaAggregates in a worker process, and the partial results are merged
+    in the parent as they come back. Small inputs are aggregated in-process,
+    where the cost of shipping battles to workers would outweigh the gain.
+
+    Args:
+        rows: List of (player_tag, region, battle_record)
+        card_map: Card metadata keyed by name (from fetch_assets)
+        workers: Process count (defaults to the CPU count); 1 aggregates in-process
+        chunk_size: Battles per worker task
+        key: Optional module-level function of a battle_record; rows are then
+            aggregated per key value in the same pass (e.g. one bucket per day)
+
+    Returns:
+        A MetaAggregates over all rows, or { key value: MetaAggregates } when key is given
+    """
+    workers = min(workers or os.cpu_count() or 1, -(-len(rows) // chunk_size))
+    if workers <= 1:
+        return _aggregate_chunk(rows, card_map, key)
+
+    result = MetaAggregates() if key is None else {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(card_map,)) as executor:
+        futures = [
+            executor.submit(_aggregate_chunk, rows[i:i + chunk_size], None, key)
+            for i in range(0, len(rows), chunk_size)
+        ]
+        for future in futures:
+            result = _combine(result, future.result())
+    return result
@@ -0,0 +1,278 @@
+import os
+import json
+import argparse
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+
+from aggregates import detect_variant
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_ARCHIVE_DIR = os.path.join(REPO_ROOT, ".cache", "battle_archive")
+
+# Column name -> (dtype, values per row). Each column is a flat binary file
+# that is appended to in place and memory-mapped for reading.
+COLUMNS = {
+    "battle_time": (np.int64, 1),  # Unix seconds
+    "player": (np.uint32, 1),      # index into meta["players"]
+    "region": (np.uint16, 1),      # index into meta["regions"] (0 = Unknown)
+    "deck": (np.uint16, 8),        # card indices into meta["cards"], sorted (0 = empty slot)
+    "deck_evo": (np.uint8, 1),     # bit i set -> deck[i] was played as an Evolution
+    "deck_hero": (np.uint8, 1),    # bit i set -> deck[i] was played as a Hero
+    "opp_deck": (np.uint16, 8),
+    "opp_evo": (np.uint8, 1),
+    "opp_hero": (np.uint8, 1),
+    "crowns": (np.uint8, 1),
+    "opp_crowns": (np.uint8, 1),
+    "result": (np.int8, 1),        # 1 = win, 0 = draw, -1 = loss
+}
+
+
+def parse_battle_time(battle_time):
+    """
+    Convert the API's "YYYYMMDDTHHMMSS.sssZ" battleTime into Unix seconds.
+    """
+    dt = datetime.strptime(battle_time, "%Y%m%dT%H%M%S.%fZ").replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+class BattleArchive:
+    """
+    Append-only, columnar archive of every ingested battle.
+
+    Cards, players and regions are dictionary-encoded into small integers
+    (meta.json holds the dictionaries), so a battle is ~60 bytes and the whole
+    archive can be memory-mapped and sliced with NumPy instead of re-fetching
+    battlelogs.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.getenv("CR_BATTLE_ARCHIVE", DEFAULT_ARCHIVE_DIR)
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        self.meta = {"rows": 0, "cards": [0], "card_names": {}, "players": [], "regions": ["Unknown"]}
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+
+        self._card_index = {card_id: i for i, card_id in enumerate(self.meta["cards"])}
+        self._player_index = {tag: i for i, tag in enumerate(self.meta["players"])}
+        self._region_index = {name: i for i, name in enumerate(self.meta["regions"])}
+
+        # meta.json is written last on append, so any bytes past its row count
+        # belong to an interrupted append and are dropped
+        for name, (dtype, width) in COLUMNS.items():
+            col_path = self._column_path(name)
+            expected = self.meta["rows"] * width * np.dtype(dtype).itemsize
+            if os.path.exists(col_path) and os.path.getsize(col_path) > expected:
+                os.truncate(col_path, expected)
+
+        # Newest archived battle per player, used to skip re-ingested battles
+        self._player_last = {}
+        if self.meta["rows"]:
+            cols = self.load(["player", "battle_time"])
+            last = np.zeros(len(self.meta["players"]), dtype=np.int64)
+            np.maximum.at(last, cols["player"], cols["battle_time"])
+            self._player_last = {tag: int(last[i]) for tag, i in self._player_index.items()}
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _intern(self, index, values, key):
+        if key not in index:
+            index[key] = len(values)
+            values.append(key)
+        return index[key]
+
+    def _encode_deck(self, cards, card_map):
+        """
+        Encode a deck as 8 sorted card indices plus evo/hero slot bitmasks.
+        """
+        evos, heroes = detect_variant(cards, card_map)
+        slots = []
+        for c in cards[:8]:
+            card_id = c.get("id", 0)
+            self.meta["card_names"][str(card_id)] = c["name"]
+            slots.append((self._intern(self._card_index, self.meta["cards"], card_id), c["name"]))
+        slots.sort()
+
+        indices = [idx for idx, _ in slots] + [0] * (8 - len(slots))
+        evo_bits = 0
+        hero_bits = 0
+        for i, (_, name) in enumerate(slots):
+            if name in evos:
+                evo_bits |= 1 << i
+            elif name in heroes:
+                hero_bits |= 1 << i
+        return indices, evo_bits, hero_bits
+
+    def append(self, rows, card_map):
+        """
+        Append battles to the archive.
+
+        Args:
+            rows: Iterable of (player_tag, region, battle_record) where battle_record
+                is built by fetch_player_battles
+            card_map: Card metadata keyed by name (from fetch_assets)
+
+        Returns:
+            Number of battles written (battles already archived are skipped)
+        """
+        columns = {name: [] for name in COLUMNS}
+        # Battlelogs are newest first, so filter against each player's newest
+        # battle from before this batch and only advance it once the batch is done
+        previous = {}
+        newest = {}
+        for player_tag, region, battle in rows:
+            battle_time = parse_battle_time(battle["battle_time"])
+            if player_tag not in previous:
+                previous[player_tag] = self._player_last.get(player_tag, -1)
+            if battle_time <= previous[player_tag]:
+                continue
+            newest[player_tag] = max(battle_time, newest.get(player_tag, -1))
+
+            deck, deck_evo, deck_hero = self._encode_deck(battle["cards"], card_map)
+            opp_deck, opp_evo, opp_hero = self._encode_deck(battle.get("opponent_cards", []), card_map)
+            crowns = battle.get("crowns", 0)
+            opp_crowns = battle.get("opponent_crowns", 0)
+
+            columns["battle_time"].append(battle_time)
+            columns["player"].append(self._intern(self._player_index, self.meta["players"], player_tag))
+            columns["region"].append(self._intern(self._region_index, self.meta["regions"], region or "Unknown"))
+            columns["deck"].append(deck)
+            columns["deck_evo"].append(deck_evo)
+            columns["deck_hero"].append(deck_hero)
+            columns["opp_deck"].append(opp_deck)
+            columns["opp_evo"].append(opp_evo)
+            columns["opp_hero"].append(opp_hero)
+            columns["crowns"].append(crowns)
+            columns["opp_crowns"].append(opp_crowns)
+            columns["result"].append((crowns > opp_crowns) - (crowns < opp_crowns))
+
+        added = len(columns["battle_time"])
+        if not added:
+            return 0
+        self._player_last.update(newest)
+
+        for name, (dtype, _) in COLUMNS.items():
+            with open(self._column_path(name), "ab") as f:
+                f.write(np.asarray(columns[name], dtype=dtype).tobytes())
+
+        self.meta["rows"] += added
+        meta_path = os.path.join(self.path, "meta.json")
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp_path, meta_path)
+
+        logger.info(f"Archived {added} battles ({self.meta['rows']} total) in {self.path}")
+        return added
+
+    def load(self, names=None):
+        """
+        Memory-map archive columns.
+
+        Returns:
+            { column_name: np.memmap } - 8-wide columns have shape (rows, 8)
+        """
+        rows = self.meta["rows"]
+        result = {}
+        for name in names or COLUMNS:
+            dtype, width = COLUMNS[name]
+            if rows == 0:
+                result[name] = np.zeros((0, width) if width > 1 else 0, dtype=dtype)
+                continue
+            shape = (rows, width) if width > 1 else (rows,)
+            result[name] = np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=shape)
+        return result
+
+    def card_names(self):
+        """
+        Card name for every card index (index 0 is the empty slot).
+        """
+        return [self.meta["card_names"].get(str(card_id), "") for card_id in self.meta["cards"]]
+
+    def select(self, cols, since=None, until=None, region=None):
+        """
+        Boolean row mask for a time window (Unix seconds) and/or region name.
+        """
+        mask = np.ones(len(cols["battle_time"]), dtype=bool)
+        if since is not None:
+            mask &= cols["battle_time"] >= since
+        if until is not None:
+            mask &= cols["battle_time"] < until
+        if region is not None:
+            mask &= cols["region"] == self._region_index.get(region, -1)
+        return mask
+
+    def card_stats(self, mask=None):
+        """
+        Per-card usage, wins and games over the selected battles, computed with bincount.
+
+        Returns:
+            (counts, wins) arrays indexed by card index
+        """
+        cols = self.load(["deck", "result"])
+        deck, result = cols["deck"], cols["result"]
+        if mask is not None:
+            deck, result = deck[mask], result[mask]
+
+        n_cards = len(self.meta["cards"])
+        flat = deck.ravel()
+        counts = np.bincount(flat, minlength=n_cards)
+        wins = np.bincount(flat, weights=np.repeat(result == 1, 8), minlength=n_cards)
+        counts[0] = 0
+        wins[0] = 0
+        return counts, wins
+
+    def deck_counts(self, mask=None):
+        """
+        Unique decks and how often each was played.
+
+        Returns:
+            (decks, counts) - decks has shape (n_unique, 8)
+        """
+        deck = self.load(["deck"])["deck"]
+        if mask is not None:
+            deck = deck[mask]
+        return np.unique(deck, axis=0, return_counts=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the local battle archive")
+    parser.add_argument("--days", type=float, help="Only include battles from the last N days")
+    parser.add_argument("--region", help="Only include battles from this region (e.g. US)")
+    parser.add_argument("--top", type=int, default=20, help="Number of cards to list")
+    args = parser.parse_args()
+
+    archive = BattleArchive()
+    cols = archive.load(["battle_time", "region"])
+    since = None
+    if args.days is not None:
+        since = datetime.now(timezone.utc).timestamp() - args.days * 86400
+    mask = archive.select(cols, since=since, region=args.region)
+    total = int(mask.sum())
+    print(f"{total} of {len(archive)} archived battles selected")
+    if not total:
+        return
+
+    counts, wins = archive.card_stats(mask)
+    names = archive.card_names()
+    for idx in np.argsort(counts)[::-1][:args.top]:
+        if counts[idx] == 0:
+            break
+        print(f"{names[idx]:<24} usage {counts[idx] / total * 100:6.2f}%  win rate {wins[idx] / counts[idx] * 100:6.2f}%")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+import sqlite3
+import logging
+from datetime import datetime, timedelta, timezone
+
+from aggregates import MetaAggregates
+
+# JSON encoding is shared with the MCP server (mcp-server/src/shared/codec.py)
+MCP_SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mcp-server'))
+if MCP_SERVER_DIR not in sys.path:
+    sys.path.append(MCP_SERVER_DIR)
+from src.shared.codec import loads, dumps
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_BATTLE_STORE_PATH = os.path.join(REPO_ROOT, ".cache", "battles.sqlite3")
+
+# Days of battles (by battleTime, UTC, including today) behind the snapshot
+DEFAULT_WINDOW_DAYS = 14
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    tag TEXT PRIMARY KEY,
+    last_battle_time TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_aggregates (
+    day TEXT PRIMARY KEY, -- battle day, YYYYMMDD (UTC)
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def battle_day(battle_time):
+    """
+    The UTC day ("YYYYMMDD") of an API battleTime ("YYYYMMDDTHHMMSS.sssZ").
+    """
+    return battle_time[:8]
+
+
+def record_day(battle_record):
+    """
+    The battle day of a battle record built by fetch_player_battles.
+    """
+    return battle_day(battle_record["battle_time"])
+
+
+class BattleStore:
+    """
+    Local record of which battles have already been counted.
+
+    Keeps the newest battleTime ingested for each player next to one
+    persisted MetaAggregates per battle day, so a pipeline run only needs to
+    fold in battles played since the previous run. Only the last window_days
+    days are kept: older buckets (and cursors) are pruned on commit, so the
+    snapshot reflects the recent meta rather than every battle ever seen.
+    Buckets and cursors are written in one transaction in commit(), so a
+    failed run never leaves the cursors ahead of the counts.
+    """
+
+    def __init__(self, path=None, window_days=None):
+        if path is None:
+            path = os.getenv("CR_BATTLE_STORE", DEFAULT_BATTLE_STORE_PATH)
+        if window_days is None:
+            window_days = int(os.getenv("CR_AGG_WINDOW_DAYS", str(DEFAULT_WINDOW_DAYS)))
+        self.path = path
+        self.window_days = window_days
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+        self.cold = self.is_empty()
+        if self.cold:
+            logger.warning(
+                f"Battle store {path} is empty (first run, or the cached .cache directory was lost); "
+                f"aggregates start from this run's battles"
+            )
+
+    def is_empty(self):
+        """
+        True if the store holds neither cursors nor aggregates.
+        """
+        return (
+            self.conn.execute("SELECT 1 FROM players LIMIT 1").fetchone() is None
+            and self.conn.execute("SELECT 1 FROM daily_aggregates LIMIT 1").fetchone() is None
+        )
+
+    def cutoff_day(self):
+        """
+        The oldest battle day ("YYYYMMDD") inside the window.
+        """
+        oldest = datetime.now(timezone.utc) - timedelta(days=self.window_days - 1)
+        return oldest.strftime("%Y%m%d")
+
+    def last_seen(self):
+        """
+        Return { player_tag: newest ingested battleTime } for every known player.
+        """
+        return dict(self.conn.execute("SELECT tag, last_battle_time FROM players"))
+
+    def load_day_aggregates(self):
+        """
+        Return { day: MetaAggregates } for every bucket inside the window.
+        """
+        rows = self.conn.execute(
+            "SELECT day, state FROM daily_aggregates WHERE day >= ?", (self.cutoff_day(),)
+        )
+        return {day: MetaAggregates.from_state(loads(state)) for day, state in rows}
+
+    def load_aggregates(self):
+        """
+        Return the aggregates over every battle inside the window.
+        """
+        aggregates = MetaAggregates()
+        for day_aggregates in self.load_day_aggregates().values():
+            aggregates.merge(day_aggregates)
+        return aggregates
+
+    def commit(self, day_aggregates, last_seen_updates):
+        """
+        Persist updated day buckets together with the advanced per-player
+        cursors, then prune whatever has fallen out of the window.
+
+        Args:
+            day_aggregates: { day: MetaAggregates } for each day that gained battles this run
+            last_seen_updates: { player_tag: newest battleTime ingested this run }
+        """
+        cutoff = self.cutoff_day()
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO daily_aggregates (day, state, updated_at) VALUES (?, ?, ?)",
+                [
+                    (day, dumps(aggregates.to_state()).decode("utf-8"), now)
+                    for day, aggregates in day_aggregates.items() if day >= cutoff
+                ]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO players (tag, last_battle_time) VALUES (?, ?)",
+                list(last_seen_updates.items())
+            )
+            pruned = self.conn.execute("DELETE FROM daily_aggregates WHERE day < ?", (cutoff,)).rowcount
+            # Battles older than a stale cursor would only land in pruned buckets
+            self.conn.execute("DELETE FROM players WHERE last_battle_time < ?", (cutoff,))
+        logger.info(
+            f"Battle store updated: {len(last_seen_updates)} player cursors advanced, "
+            f"{len(day_aggregates)} day buckets written, {pruned} pruned"
+        )
+
+    def reset(self):
+        """
+        Forget every cursor and aggregate so the next run rebuilds from scratch.
+        """
+        with self.conn:
+            self.conn.execute("DELETE FROM players")
+            self.conn.execute("DELETE FROM daily_aggregates")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+MCP_SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mcp-server'))
+if MCP_SERVER_DIR not in sys.path:
+    sys.path.append(MCP_SERVER_DIR)
+from src.shared import codec
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_PATH = os.path.join(BASE_DIR, "src", "data", "meta_snapshot.json")
+
+RARITIES = ["common", "rare", "epic", "legendary", "champion"]
+
+
+def _card(rng, card_id, evolution=False):
+    card = {
+        "name": f"Card {card_id}",
+        "id": 26000000 + card_id,
+        "level": rng.randint(11, 16),
+        "starLevel": rng.randint(0, 3),
+        "maxLevel": 16,
+        "rarity": rng.choice(RARITIES),
+        "elixirCost": rng.randint(1, 7),
+        "iconUrls": {"medium": f"https://api-assets.clashroyale.com/cards/300/{card_id:08x}.png"}
+    }
+    if evolution:
+        card["evolutionLevel"] = 1
+        card["maxEvolutionLevel"] = 1
+        card["iconUrls"]["evolutionMedium"] = f"https://api-assets.clashroyale.com/cardevolutions/300/{card_id:08x}.png"
+    return card
+
+
+def _side(rng, tag):
+    return {
+        "tag": tag,
+        "name": f"Player {tag[1:]}",
+        "startingTrophies": rng.randint(7000, 9000),
+        "crowns": rng.randint(0, 3),
+        "kingTowerHitPoints": rng.randint(0, 9000),
+        "princessTowersHitPoints": [rng.randint(0, 5000), rng.randint(0, 5000)],
+        "clan": {"tag": f"#C{rng.randint(0, 99999):05d}", "name": "Clan", "badgeId": 16000000},
+        "cards": [_card(rng, card_id, evolution=i < 2) for i, card_id in enumerate(rng.sample(range(120), 8))],
+        "supportCards": [_card(rng, 159000000 + rng.randint(0, 3))],
+        "globalRank": None,
+        "elixirLeaked": round(rng.uniform(0, 12), 2)
+    }
+
+
+def _json_text(obj):
+    # Compact JSON text, as the API sends it and as the ResponseStore kept it before the codec
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def synthetic_crawl(players, battles_per_player, seed=0):
+    """
+    Build raw (battlelog, profile) response bodies shaped like the API's.
+    """
+    rng = random.Random(seed)
+    bodies = []
+    for i in range(players):
+        tag = f"#P{i:07d}"
+        battlelog = [
+            {
+                "type": "pathOfLegend",
+                "battleTime": f"202610{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}0000.000Z",
+                "isLadderTournament": False,
+                "arena": {"id": 54000000, "name": "Legendary Arena"},
+                "gameMode": {"id": 72000464, "name": "Ranked1v1_NewArena2"},
+                "deckSelection": "collection",
+                "team": [_side(rng, tag)],
+                "opponent": [_side(rng, f"#O{rng.randint(0, 9999999):07d}")],
+                "isHostedMatch": False,
+                "leagueNumber": 7
+            }
+            for _ in range(battles_per_player)
+        ]
+        profile = {
+            "tag": tag,
+            "name": f"Player {i}",
+            "expLevel": 70,
+            "trophies": rng.randint(7000, 9000),
+            "bestTrophies": 9000,
+            "wins": rng.randint(1000, 20000),
+            "losses": rng.randint(1000, 20000),
+            "threeCrownWins": rng.randint(500, 9000),
+            "challengeCardsWon": rng.randint(0, 50000),
+            "warDayWins": rng.randint(0, 500),
+            "cards": [_card(rng, card_id, evolution=card_id % 9 == 0) for card_id in range(120)]
+        }
+        bodies.append(_json_text(battlelog))
+        bodies.append(_json_text(profile))
+    return bodies
+
+
+def _best_of(repeat, fn):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the stdlib json module with src/shared/codec.py over one synthetic crawl"
+    )
+    parser.add_argument("--players", type=int, default=1000, help="Players in the crawl (default 1000)")
+    parser.add_argument("--battles", type=int, default=25, help="Battles per battlelog (default 25)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is reported")
+    parser.add_argument("--snapshot", default=SNAPSHOT_PATH, help="Snapshot to re-serialize (default src/data/meta_snapshot.json)")
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if codec.orjson else 'no (stdlib fallback)'}, "
+          f"msgpack: {'yes' if codec.msgpack else 'no'}, store codec: {codec.STORE_CODEC}")
+
+    bodies = synthetic_crawl(args.players, args.battles)
+    parsed = [json.loads(body) for body in bodies]
+    stored_json = [_json_text(data) for data in parsed]
+    stored = [codec.encode_body(data) for data in parsed]
+    # What the crawl journal records per player: the battle records fetch_player_battles keeps
+    entries = [
+        {"type": "battles", "tag": f"#P{i:07d}", "battles": [
+            {"cards": b["team"][0]["cards"], "battle_time": b["battleTime"], "crowns": b["team"][0]["crowns"],
+             "opponent_cards": b["opponent"][0]["cards"], "opponent_crowns": b["opponent"][0]["crowns"]}
+            for b in battlelog
+        ]}
+        for i, battlelog in enumerate(parsed[::2])
+    ]
+    with open(args.snapshot, "rb") as f:
+        snapshot = json.loads(f.read())
+
+    if codec.dumps(snapshot, indent=2) != json.dumps(snapshot, indent=2).encode("utf-8"):
+        sys.exit("codec.dumps(indent=2) is not byte-identical to json.dumps for this snapshot")
+
+    json_bytes = sum(len(body) for body in stored_json)
+    stored_bytes = sum(len(body) for body in stored)
+    print(f"{len(bodies)} response bodies: {json_bytes / 1e6:.1f} MB stored as JSON text, "
+          f"{stored_bytes / 1e6:.1f} MB stored as {codec.STORE_CODEC} ({stored_bytes / json_bytes:.0%})")
+
+    stages = [
+        # (stage, stdlib, codec) - the stdlib column is what the pipeline did before
+        ("parse upstream bodies",
+         lambda: [json.loads(body) for body in bodies],
+         lambda: [codec.loads(body) for body in bodies]),
+        ("encode for response store",
+         lambda: [_json_text(data) for data in parsed],
+         lambda: [codec.encode_body(data) for data in parsed]),
+        ("decode from response store",
+         lambda: [json.loads(body) for body in stored_json],
+         lambda: [codec.decode_body(body) for body in stored]),
+        ("write crawl journal",
+         lambda: [json.dumps(entry) + "\n" for entry in entries],
+         lambda: [codec.dumps(entry) + b"\n" for entry in entries]),
+        ("write meta_snapshot.json",
+         lambda: json.dumps(snapshot, indent=2).encode("utf-8"),
+         lambda: codec.dumps(snapshot, indent=2)),
+        ("write snapshot sections",
+         lambda: [json.dumps(v, separators=(",", ":"), ensure_ascii=False).encode("utf-8") for v in snapshot.values()],
+         lambda: [codec.dumps(v, ensure_ascii=False) for v in snapshot.values()]),
+    ]
+
+    print(f"\nPer {args.players}-player crawl (best of {args.repeat}):")
+    print(f"{'stage':<28}{'stdlib ms':>12}{'codec ms':>12}{'saved ms':>12}")
+    results = {}
+    for name, baseline, candidate in stages:
+        before = _best_of(args.repeat, baseline)
+        after = _best_of(args.repeat, candidate)
+        results[name] = (before, after)
+        print(f"{name:<28}{before:>12.1f}{after:>12.1f}{before - after:>12.1f}")
+
+    # A fresh crawl parses and stores every body; a re-run within the TTL reads them back
+    runs = {
+        "fresh crawl": ["parse upstream bodies", "encode for response store", "write crawl journal",
+                        "write meta_snapshot.json", "write snapshot sections"],
+        "warm re-run": ["decode from response store", "write meta_snapshot.json", "write snapshot sections"],
+    }
+    print()
+    for run, names in runs.items():
+        before = sum(results[name][0] for name in names)
+        after = sum(results[name][1] for name in names)
+        print(f"{run:<28}{before:>12.1f}{after:>12.1f}{before - after:>12.1f}  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
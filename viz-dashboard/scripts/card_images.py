@@ -0,0 +1,236 @@
+import io
+import os
+import json
+import math
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, features
+except ImportError: # Optional: without Pillow the dashboard keeps using the source PNGs
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Target widths in pixels; heights follow the 285x420 card art.
+# sm covers table rows, synergy stacks and graph nodes (24-45px wide) at 2x,
+# md covers the deck and top-card grids (up to ~96px wide) at 2x.
+ICON_WIDTHS = {"sm": 48, "md": 192}
+ATLAS_SIZE = "sm"
+OPT_SUBDIR = "opt"
+URL_PREFIX = "/cards"
+ATLAS_NAME = f"atlas-{ATLAS_SIZE}.json"
+ICON_FIELDS = ["icon", "evo_icon", "hero_icon"]
+IMAGE_WORKERS = int(os.getenv("CR_IMAGE_WORKERS", str(os.cpu_count() or 4)))
+
+
+def _formats():
+    formats = {"webp": {"quality": 82, "method": 4}}
+    if features.check("avif"):
+        formats["avif"] = {"quality": 55, "speed": 8}
+    return formats
+
+
+def _encode(image, fmt, options):
+    buf = io.BytesIO()
+    image.save(buf, format=fmt.upper(), **options)
+    return buf.getvalue()
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _resize(image, width):
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), Image.LANCZOS)
+
+
+def make_variants(src_path, out_dir, formats, manifest=None):
+    """
+    Write every size/format variant of one icon that is missing or was built from other content.
+
+    Whether the variants are current is decided by content, not mtimes (a
+    fresh checkout gives every file the same mtime): the asset manifest
+    entry of the source PNG records the sha256 its variants were built
+    from. Without an entry all variants are rebuilt.
+
+    Args:
+        manifest: fetch_assets.AssetManifest the source was synced with, or None
+
+    Returns:
+        Number of files written
+    """
+    name = os.path.basename(src_path)
+    stem = os.path.splitext(name)[0]
+    entry = manifest.entries.get(name) if manifest is not None else None
+    current = entry is not None and entry.get("variants_sha256") == entry["sha256"]
+    pending = [
+        (size, width, fmt, options)
+        for size, width in ICON_WIDTHS.items()
+        for fmt, options in formats.items()
+        if not current or not os.path.exists(os.path.join(out_dir, f"{stem}-{size}.{fmt}"))
+    ]
+    if not pending:
+        return 0
+
+    with Image.open(src_path) as source:
+        source = source.convert("RGBA")
+        resized = {size: _resize(source, width) for size, width in ICON_WIDTHS.items()}
+    for size, _, fmt, options in pending:
+        _write_atomic(os.path.join(out_dir, f"{stem}-{size}.{fmt}"), _encode(resized[size], fmt, options))
+    if entry is not None:
+        entry["variants_sha256"] = entry["sha256"]
+    return len(pending)
+
+
+def build_atlas(src_paths, out_dir, formats):
+    """
+    Pack the ATLAS_SIZE variant of every icon into one sprite sheet.
+
+    Tiles are laid out on a near-square grid in sorted order, so the same
+    icons always give the same atlas. Image files are content-hashed like
+    the snapshot sections; the JSON map beside them is rewritten each run.
+
+    Returns:
+        { "webp", "avif"?, "width", "height", "tile": [w, h], "frames": {stem: [x, y]} }
+    """
+    paths = {os.path.splitext(os.path.basename(p))[0]: p for p in src_paths}
+    stems = sorted(paths)
+    tile_w = ICON_WIDTHS[ATLAS_SIZE]
+    tiles = {}
+    for stem in stems:
+        # Resize from the PNG rather than reusing the lossy variant
+        with Image.open(paths[stem]) as source:
+            tiles[stem] = _resize(source.convert("RGBA"), tile_w)
+    tile_h = max(t.height for t in tiles.values())
+    columns = math.ceil(math.sqrt(len(stems)))
+    rows = math.ceil(len(stems) / columns)
+
+    sheet = Image.new("RGBA", (columns * tile_w, rows * tile_h), (0, 0, 0, 0))
+    frames = {}
+    for i, stem in enumerate(stems):
+        x, y = (i % columns) * tile_w, (i // columns) * tile_h
+        sheet.paste(tiles[stem], (x, y))
+        frames[stem] = [x, y]
+
+    atlas = {"width": sheet.width, "height": sheet.height, "tile": [tile_w, tile_h]}
+    written = set()
+    for fmt, options in formats.items():
+        data = _encode(sheet, fmt, options)
+        filename = f"atlas-{ATLAS_SIZE}.{hashlib.sha256(data).hexdigest()[:12]}.{fmt}"
+        path = os.path.join(out_dir, filename)
+        if not os.path.exists(path):
+            _write_atomic(path, data)
+        atlas[fmt] = f"{URL_PREFIX}/{OPT_SUBDIR}/{filename}"
+        written.add(filename)
+
+    for filename in os.listdir(out_dir):
+        if filename.startswith(f"atlas-{ATLAS_SIZE}.") and filename != ATLAS_NAME and filename not in written:
+            os.remove(os.path.join(out_dir, filename))
+
+    atlas["frames"] = frames
+    _write_atomic(os.path.join(out_dir, ATLAS_NAME), json.dumps(atlas, indent=2).encode("utf-8"))
+    return atlas
+
+
+def _read_atlas(out_dir):
+    path = os.path.join(out_dir, ATLAS_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_atlas(cards_dir):
+    """
+    The atlas from the last optimize_card_icons() run, without its frames
+    (those are carried per card as "sprite"), or None if there is none.
+
+    An atlas whose sprite sheets are not on disk is treated as missing, so
+    the snapshot never points the dashboard at images that do not exist and
+    cards fall back to their own icons.
+    """
+    out_dir = os.path.join(cards_dir, OPT_SUBDIR)
+    atlas = _read_atlas(out_dir)
+    if atlas is None:
+        return None
+    atlas.pop("frames", None)
+    for fmt in ("webp", "avif"):
+        if fmt in atlas and not os.path.exists(os.path.join(out_dir, os.path.basename(atlas[fmt]))):
+            logger.warning(f"Card atlas {atlas[fmt]} is missing, cards will use their own icons")
+            return None
+    return atlas
+
+
+def optimize_card_icons(card_map, cards_dir, manifest=None):
+    """
+    Resize every downloaded icon to WebP/AVIF variants and build the sprite atlas.
+
+    Updates card_map in place: icon fields point at the md WebP variant and
+    each card gains "sprite", its [x, y] tile in the atlas. Cards whose
+    source PNG is missing keep their original paths.
+
+    Args:
+        manifest: fetch_assets.AssetManifest the icons were synced with; it
+            records which content the variants were built from (the caller saves it)
+
+    Returns:
+        The atlas dict (see build_atlas), or None if Pillow is not installed
+    """
+    if Image is None:
+        logger.warning("Pillow not installed, skipping card image optimization")
+        return None
+
+    out_dir = os.path.join(cards_dir, OPT_SUBDIR)
+    os.makedirs(out_dir, exist_ok=True)
+    formats = _formats()
+
+    sources = {}  # { icon url: local png path }
+    for info in card_map.values():
+        for field in ICON_FIELDS:
+            url = info.get(field)
+            if url and url.endswith(".png"):
+                path = os.path.join(cards_dir, os.path.basename(url))
+                if os.path.exists(path):
+                    sources[url] = path
+    if not sources:
+        return None
+
+    # Pillow releases the GIL while resampling and encoding
+    with ThreadPoolExecutor(max_workers=IMAGE_WORKERS) as executor:
+        written = sum(executor.map(lambda p: make_variants(p, out_dir, formats, manifest), sources.values()))
+
+    # Only the base icons go in the atlas; evo and hero art appears in deck grids at md size
+    base_icons = [sources[info["icon"]] for info in card_map.values() if info.get("icon") in sources]
+    # Reuse the previous atlas when no icon changed
+    atlas = _read_atlas(out_dir)
+    stems = {os.path.splitext(os.path.basename(p))[0] for p in base_icons}
+    reusable = (
+        not written
+        and atlas is not None
+        and set(atlas["frames"]) == stems
+        and all(fmt in atlas and os.path.exists(os.path.join(out_dir, os.path.basename(atlas[fmt]))) for fmt in formats)
+    )
+    if not reusable:
+        atlas = build_atlas(base_icons, out_dir, formats)
+
+    for info in card_map.values():
+        base_url = info.get("icon")
+        for field in ICON_FIELDS:
+            url = info.get(field)
+            if url in sources:
+                stem = os.path.splitext(os.path.basename(url))[0]
+                info[field] = f"{URL_PREFIX}/{OPT_SUBDIR}/{stem}-md.webp"
+        if base_url in sources:
+            info["sprite"] = atlas["frames"][os.path.splitext(os.path.basename(base_url))[0]]
+
+    logger.info(
+        f"Optimized {len(sources)} card icons ({written} variants written, formats {sorted(formats)}), "
+        f"atlas {atlas['width']}x{atlas['height']}"
+    )
+    return atlas
@@ -0,0 +1,115 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def location_from_clan(data):
+    """
+    Pick the region code out of a clans/{tag} response.
+
+    Returns:
+        Country code, region name (e.g. "Europe"), or "Unknown"
+    """
+    if data and "location" in data:
+        loc = data["location"]
+        if loc.get("isCountry"):
+            return loc.get("countryCode")
+        return loc.get("name") # Fallback for regions like "Europe"
+    return "Unknown"
+
+
+class ClanLocationResolver:
+    """
+    Resolves clan tags to regions on a dedicated thread pool.
+
+    Lookups are submitted with prefetch() as soon as a player's clan is known
+    (while the rankings are still being paged), so by the time the player's
+    battles arrive the region is usually already resolved. Concurrent
+    requests for the same clan share one Future, so each clan is fetched at
+    most once per run no matter how many top players belong to it.
+    """
+
+    def __init__(self, fetch, max_workers=8, on_resolved=None):
+        """
+        Args:
+            fetch: Callable taking a clan tag and returning the clans/{tag} JSON (or None)
+            max_workers: Threads dedicated to clan lookups
+            on_resolved: Optional callback(clan_tag, region) run after each successful lookup
+        """
+        self._fetch = fetch
+        self._on_resolved = on_resolved
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clan")
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.requested = 0
+        self.coalesced = 0
+
+    def _lookup(self, clan_tag):
+        try:
+            data = self._fetch(clan_tag)
+        except Exception as e:
+            logger.error(f"Clan lookup failed for {clan_tag}: {e}")
+            return "Unknown"
+        region = location_from_clan(data)
+        # A failed fetch (None) counts as Unknown for this run only, so a
+        # resumed run tries the clan again instead of replaying the failure
+        if data and self._on_resolved:
+            self._on_resolved(clan_tag, region)
+        return region
+
+    def seed(self, clan_tag, region):
+        """
+        Register an already known region (e.g. from a resumed crawl) so it is never fetched.
+        """
+        future = Future()
+        future.set_result(region)
+        with self._lock:
+            self._futures.setdefault(clan_tag, future)
+
+    def prefetch(self, clan_tag):
+        """
+        Start resolving a clan's region without waiting for it.
+
+        Returns:
+            Future resolving to the region, shared by every caller asking for this clan
+        """
+        with self._lock:
+            self.requested += 1
+            future = self._futures.get(clan_tag)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = self._executor.submit(self._lookup, clan_tag)
+            self._futures[clan_tag] = future
+            return future
+
+    def prefetch_players(self, players):
+        """
+        Prefetch the clan of every ranking entry that has one.
+        """
+        for p in players:
+            tag = (p.get("clan") or {}).get("tag")
+            if tag:
+                self.prefetch(tag)
+
+    def future_for(self, player):
+        """
+        Future for a ranking entry's region, or None if the player has no clan.
+        """
+        tag = (player.get("clan") or {}).get("tag")
+        if not tag:
+            return None
+        return self.prefetch(tag)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clans": len(self._futures),
+                "requested": self.requested,
+                "coalesced": self.coalesced
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
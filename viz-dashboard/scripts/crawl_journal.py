@@ -0,0 +1,126 @@
+import os
+import sys
+import logging
+import threading
+
+# JSON encoding is shared with the MCP server (mcp-server/src/shared/codec.py)
+MCP_SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mcp-server'))
+if MCP_SERVER_DIR not in sys.path:
+    sys.path.append(MCP_SERVER_DIR)
+from src.shared.codec import loads, dumps
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_JOURNAL_PATH = os.path.join(REPO_ROOT, ".cache", "crawl_journal.jsonl")
+
+
+class CrawlJournal:
+    """
+    Append-only progress log of a fetch_meta crawl.
+
+    Every finished ranking page, player battlelog (with the player's profile
+    stats) and clan location is written as one JSON line as soon as it is
+    known. If the run dies, a --resume run replays the journal and only
+    fetches what is missing. The journal is cleared once the run's results
+    are committed to the battle store.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.getenv("CR_CRAWL_JOURNAL", DEFAULT_JOURNAL_PATH)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.pages = {}    # { request cursor (None for the first page): {"items", "next"} }
+        self.battles = {}  # { player_tag: {"battles", "newest", "profile"} }
+        self.clans = {}    # { clan_tag: region }
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _replay(self, config):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "rb") as f:
+            lines = f.readlines()
+        if not lines:
+            return False
+
+        try:
+            header = loads(lines[0])
+        except ValueError:
+            header = {}
+        if header.get("type") != "start" or header.get("config") != config:
+            logger.warning(f"Crawl journal {self.path} is for a different run ({header.get('config')}), starting over")
+            return False
+
+        for line in lines[1:]:
+            try:
+                entry = loads(line)
+            except ValueError:
+                # The last line may be cut short if the run was killed mid-write
+                logger.warning("Ignoring truncated crawl journal entry")
+                continue
+            kind = entry.pop("type")
+            if kind == "page":
+                self.pages[entry["cursor"]] = {"items": entry["items"], "next": entry["next"]}
+            elif kind == "battles":
+                self.battles[entry["tag"]] = {
+                    "battles": entry["battles"],
+                    "newest": entry["newest"],
+                    "profile": entry.get("profile")
+                }
+            elif kind == "clan":
+                self.clans[entry["tag"]] = entry["region"]
+        return True
+
+    def open(self, config, resume=False):
+        """
+        Start journaling a run.
+
+        Args:
+            config: JSON-compatible description of the run (player limit, shard);
+                a journal written under a different config is never resumed
+            resume: Replay an existing journal instead of discarding it
+        """
+        resumed = resume and self._replay(config)
+        if resumed:
+            logger.info(
+                f"Resuming crawl: {len(self.pages)} ranking pages, {len(self.battles)} battlelogs "
+                f"and {len(self.clans)} clan locations already done"
+            )
+            self._file = open(self.path, "ab")
+        else:
+            self.pages, self.battles, self.clans = {}, {}, {}
+            self._file = open(self.path, "wb")
+            self._write({"type": "start", "config": config})
+        return resumed
+
+    def _write(self, entry):
+        with self._lock:
+            self._file.write(dumps(entry) + b"\n")
+            self._file.flush()
+
+    def record_page(self, cursor, items, next_cursor):
+        self.pages[cursor] = {"items": items, "next": next_cursor}
+        self._write({"type": "page", "cursor": cursor, "items": items, "next": next_cursor})
+
+    def record_battles(self, player_tag, battles, newest, profile=None):
+        self.battles[player_tag] = {"battles": battles, "newest": newest, "profile": profile}
+        self._write({"type": "battles", "tag": player_tag, "battles": battles, "newest": newest, "profile": profile})
+
+    def record_clan(self, clan_tag, region):
+        self.clans[clan_tag] = region
+        self._write({"type": "clan", "tag": clan_tag, "region": region})
+
+    def clear(self):
+        """
+        Delete the journal after the run's results have been committed.
+        """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
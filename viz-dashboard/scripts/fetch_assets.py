@@ -1,6 +1,11 @@
 import os
+import json
+import hashlib
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import card_images
 
 # Configure logging
 logging.basicConfig(
@@ -12,19 +17,125 @@ logger = logging.getLogger(__name__)
 # Configuration
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CARDS_DIR = os.path.join(BASE_DIR, "public", "cards")
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.dirname(BASE_DIR), ".cache", "asset_manifest.json")
+ASSET_WORKERS = int(os.getenv("CR_ASSET_WORKERS", "8"))
+
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class AssetManifest:
+    """
+    Record of every synced asset: source URL, content hash and HTTP validators.
+
+    Card icon URLs change whenever the art does, so a file whose URL and hash
+    still match its entry is skipped without touching the network. Anything
+    else is fetched with the stored ETag/Last-Modified, and rewritten only
+    if the server sends new content.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.getenv("CR_ASSET_MANIFEST", DEFAULT_MANIFEST_PATH)
+        self.path = path
+        # { local filename: {"url", "sha256", "etag", "last_modified", "variants_sha256"?} }
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                logger.warning(f"Asset manifest {path} is corrupt, revalidating every asset")
+
+    def is_current(self, url, local_path):
+        entry = self.entries.get(os.path.basename(local_path))
+        return (
+            entry is not None
+            and entry["url"] == url
+            and os.path.exists(local_path)
+            and _sha256_file(local_path) == entry["sha256"]
+        )
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        _write_atomic(self.path, json.dumps(self.entries, indent=2, sort_keys=True).encode("utf-8"))
+
+def download_image(url, filename, session, manifest, revalidate=False):
+    """
+    Sync one asset to filename.
+
+    Returns:
+        "skipped", "unchanged", "updated" or "failed"
+    """
+    if not revalidate and manifest.is_current(url, filename):
+        return "skipped"
+
+    name = os.path.basename(filename)
+    entry = manifest.entries.get(name)
+    headers = {}
+    if entry and entry["url"] == url and os.path.exists(filename):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
 
-def download_image(url, filename):
     try:
-        if os.path.exists(filename):
-            return 
-        response = requests.get(url)
-        if response.status_code == 200:
-            with open(filename, 'wb') as f:
-                f.write(response.content)
+        response = session.get(url, headers=headers, timeout=30)
+        if response.status_code == 304:
+            return "unchanged"
+        response.raise_for_status()
     except Exception as e:
         logger.error(f"Failed to download image {url}: {e}")
+        return "failed"
+
+    data = response.content
+    digest = hashlib.sha256(data).hexdigest()
+    changed = not (os.path.exists(filename) and _sha256_file(filename) == digest)
+    if changed:
+        _write_atomic(filename, data)
+    manifest.entries[name] = {
+        "url": url,
+        "sha256": digest,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified")
+    }
+    if entry and entry.get("variants_sha256"):
+        # Kept so card_images can tell whether its variants still match this content
+        manifest.entries[name]["variants_sha256"] = entry["variants_sha256"]
+    return "updated" if changed else "unchanged"
+
+def sync_assets(session, assets, manifest=None, revalidate=False, max_workers=ASSET_WORKERS):
+    """
+    Download a batch of assets in parallel over the given session.
+
+    Args:
+        assets: [(url, local_path)]
+        revalidate: Send a conditional request even for assets the manifest
+            already vouches for
 
-def fetch_and_process_cards(session, api_base, headers):
+    Returns:
+        Counter-style dict of download_image outcomes
+    """
+    manifest = manifest or AssetManifest()
+    outcomes = {"skipped": 0, "unchanged": 0, "updated": 0, "failed": 0}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(download_image, url, path, session, manifest, revalidate) for url, path in assets]
+        for future in futures:
+            outcomes[future.result()] += 1
+    manifest.save()
+    logger.info(f"Asset sync: {outcomes}")
+    return outcomes
+
+def fetch_and_process_cards(session, api_base, headers, revalidate=False):
     logger.info("Fetching all cards...")
     url = f"{api_base}/cards"
     
@@ -40,31 +151,29 @@ def fetch_and_process_cards(session, api_base, headers):
         return {}
     
     card_map = {}
+    assets = []
     os.makedirs(CARDS_DIR, exist_ok=True)
     
     for card in data.get("items", []):
         name = card["name"]
         key = name.lower().replace(" ", "-").replace(".", "")
         
-        # 1. Download Normal Icon
+        # 1. Normal Icon
         icon_url = card.get("iconUrls", {}).get("medium")
         if icon_url:
-            local_path = os.path.join(CARDS_DIR, f"{key}.png")
-            download_image(icon_url, local_path)
+            assets.append((icon_url, os.path.join(CARDS_DIR, f"{key}.png")))
             
-        # 2. Download Evo Icon (if available)
+        # 2. Evo Icon (if available)
         # API usually provides 'evolutionMedium' in iconUrls for evos
         evo_icon_url = card.get("iconUrls", {}).get("evolutionMedium")
         if evo_icon_url:
-            local_path_evo = os.path.join(CARDS_DIR, f"{key}-evo.png")
-            download_image(evo_icon_url, local_path_evo)
+            assets.append((evo_icon_url, os.path.join(CARDS_DIR, f"{key}-evo.png")))
             
-        # 3. Download Hero Icon (if available)
+        # 3. Hero Icon (if available)
         # Assuming API provides 'heroMedium' or similar for heroes
         hero_icon_url = card.get("iconUrls", {}).get("heroMedium")
         if hero_icon_url:
-            local_path_hero = os.path.join(CARDS_DIR, f"{key}-hero.png")
-            download_image(hero_icon_url, local_path_hero)
+            assets.append((hero_icon_url, os.path.join(CARDS_DIR, f"{key}-hero.png")))
 
         card_map[name] = {
             "id": card["id"],
@@ -77,13 +186,26 @@ def fetch_and_process_cards(session, api_base, headers):
             "evo_icon": f"/cards/{key}-evo.png" if evo_icon_url else None,
             "hero_icon": f"/cards/{key}-hero.png" if hero_icon_url else None
         }
-        
+
+    manifest = AssetManifest()
+    sync_assets(session, assets, manifest=manifest, revalidate=revalidate)
+    card_images.optimize_card_icons(card_map, CARDS_DIR, manifest)
+    manifest.save()
     logger.info(f"Processed {len(card_map)} cards and assets.")
     return card_map
 
 if __name__ == "__main__":
     # Standalone execution
+    import argparse
     from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Sync card metadata and icons")
+    parser.add_argument(
+        "--revalidate",
+        action="store_true",
+        help="Check every icon with a conditional request, even those the manifest marks current"
+    )
+    args = parser.parse_args()
     
     env_path = os.path.join(os.path.dirname(__file__), '../../mcp-server/.env')
     if not os.path.exists(env_path):
@@ -98,4 +220,4 @@ if __name__ == "__main__":
     HEADERS = {"Authorization": f"Bearer {CR_API_KEY}"}
 
     with requests.Session() as session:
-        fetch_and_process_cards(session, CR_API_BASE, HEADERS)
+        fetch_and_process_cards(session, CR_API_BASE, HEADERS, revalidate=args.revalidate)
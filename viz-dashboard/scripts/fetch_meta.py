@@ -1,7 +1,10 @@
 import os
-import json
+import sys
+import argparse
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import zlib
 import logging
 from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -28,28 +31,63 @@ if not CR_API_KEY:
 CR_API_BASE = "https://proxy.royaleapi.dev/v1"
 HEADERS = {"Authorization": f"Bearer {CR_API_KEY}"}
 
+# Share the on-disk response store (and its TTL policy) with the MCP server
+MCP_SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mcp-server'))
+sys.path.append(MCP_SERVER_DIR)
+from src.shared.response_store import ResponseStore
+from src.shared.paginator import iter_items, cursor_page
+from src.shared.codec import loads, dumps, encode_body, decode_body
+from src.tools.cache import cache_key, classify_endpoint
+
+response_store = ResponseStore()
+
 # Configuration
 PLAYER_LIMIT = 1000  # Increased to 1000
+# Items requested per ranking page (the API caps Path of Legends pages)
+RANKING_PAGE_SIZE = 50
 BATTLE_LIMIT = 50
-MAX_WORKERS = 5     # Reduced to avoid rate limits with higher volume
+# Upper bound on crawler threads; the limiter below decides how many are actually in flight
+MAX_WORKERS = int(os.getenv("CR_MAX_WORKERS", "32"))
+MAX_RETRIES = 6
+# Threads resolving clan locations alongside the battlelog crawl
+CLAN_WORKERS = int(os.getenv("CR_CLAN_WORKERS", "8"))
+# Processes folding battles into aggregates (0 = one per CPU)
+AGG_WORKERS = int(os.getenv("CR_AGG_WORKERS", "0"))
+# Player profile fields summarized for the radar chart
+PROFILE_STATS = ["wins", "threeCrownWins", "bestTrophies", "warDayWins", "challengeCardsWon"]
+# Percentiles published for each profile stat
+PROFILE_PERCENTILES = [10, 25, 50, 75, 90, 99]
 
 # Output Paths
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "src", "data")
+# Shard runs write their partial aggregates here for the merge step
+PARTIALS_DIR = os.path.join(os.path.dirname(BASE_DIR), ".cache", "partials")
 CARDS_DIR = os.path.join(BASE_DIR, "public", "cards")
-
-# Win Conditions
-WIN_CONDITIONS = {
-    "Beatdown": ["Golem", "Lava Hound", "Giant", "Electro Giant", "Goblin Giant", "Royal Giant", "Elixir Golem"],
-    "Siege": ["X-Bow", "Mortar"],
-    "Control": ["Miner", "Graveyard", "Goblin Barrel", "Wall Breakers", "Skeleton Barrel"],
-    "Cycle": ["Hog Rider", "Royal Hogs", "Ram Rider", "Battle Ram"],
-    "Bridge Spam": ["P.E.K.K.A", "Mega Knight", "Elite Barbarians", "Royal Recruits"],
-    "Air": ["Balloon"],
-    "Three Musketeers": ["Three Musketeers"]
-}
+# Per-section snapshot files served to the dashboard's client components
+SECTIONS_DIR = os.path.join(BASE_DIR, "public", "data", "meta")
 
 import fetch_assets
+from aggregates import MetaAggregates, aggregate_parallel
+from battle_store import BattleStore, record_day
+from battle_archive import BattleArchive
+from clan_locations import ClanLocationResolver
+from crawl_journal import CrawlJournal
+from rate_limit import AdaptiveLimiter, backoff_delay
+from sketches import ProfileStats
+from win_stats import WinRates
+from snapshot_sections import write_sections
+from history_store import HistoryStore
+from card_images import load_atlas
+
+# Every request acquires from this limiter: it ramps concurrency and request
+# rate up while responses succeed and cuts both back on 429s.
+limiter = AdaptiveLimiter(
+    rate=float(os.getenv("CR_INITIAL_RATE", "10")),
+    max_rate=float(os.getenv("CR_MAX_RATE", "100")),
+    concurrency=5,
+    max_concurrency=MAX_WORKERS
+)
 
 # ... (imports)
 
@@ -62,29 +100,85 @@ import fetch_assets
 def make_request(endpoint, session, params=None):
     # ... (keep existing)
     url = f"{CR_API_BASE}/{endpoint}"
+
+    # Serve fresh copies from the response store, revalidate stale ones
+    query = "&".join(f"{k}={v}" for k, v in (params or {}).items())
+    key = cache_key(f"{endpoint}?{query}" if query else endpoint)
+    _, ttl = classify_endpoint(endpoint)
+    stored = None
+    if ttl:
+        stored, fresh = response_store.lookup(key, ttl)
+        if fresh:
+            return decode_body(stored.body)
+
+    headers = dict(HEADERS)
+    if stored is not None:
+        headers.update(stored.conditional_headers())
+
     try:
-        response = session.get(url, headers=HEADERS, params=params)
-        if response.status_code == 429:
-            logger.warning("Rate limited. Sleeping for 2 seconds...")
-            time.sleep(2)
-            return make_request(endpoint, session, params)
+        for attempt in range(MAX_RETRIES + 1):
+            with limiter.slot():
+                response = session.get(url, headers=headers, params=params)
+            status = response.status_code
+            if 200 <= status < 300 or status == 304:
+                limiter.on_success()
+                break
+            if status != 429 and status < 500:
+                # Other client errors (e.g. 404 for a missing player) say nothing about upstream load
+                break
+
+            # 429s and 5xx both mean upstream is struggling: back off instead of ramping up
+            limiter.on_throttle()
+            if attempt == MAX_RETRIES:
+                break
+            retry_after = response.headers.get("Retry-After")
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff_delay(attempt)
+            reason = "Rate limited" if status == 429 else f"Upstream error {status}"
+            logger.warning(f"{reason} on {endpoint}. Retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_RETRIES})...")
+            time.sleep(delay)
+
+        if response.status_code == 304 and stored is not None:
+            response_store.touch(key)
+            return decode_body(stored.body)
         response.raise_for_status()
-        return response.json()
+        data = loads(response.content)
+        if ttl:
+            response_store.put(
+                key,
+                encode_body(data),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+        return data
     except Exception as e:
         logger.error(f"Request failed for {endpoint}: {e}")
         return None
 
 # Removed download_image and fetch_and_process_cards as they are now in fetch_assets.py
 
-def fetch_player_battles(player_tag, session):
-    # ... (keep existing)
+def fetch_player_battles(player_tag, session, since=None):
+    """
+    Fetch a player's recent ladder battles.
+
+    Args:
+        since: Newest battleTime already ingested for this player; older
+            battles are skipped so they are not counted twice.
+
+    Returns:
+        (battles, newest_battle_time) - newest_battle_time is None if there
+        were no new battles; battles is None if the battlelog could not be fetched
+    """
     encoded_tag = player_tag.replace("#", "%23")
     data = make_request(f"players/{encoded_tag}/battlelog", session)
-    if not data:
-        return []
+    if data is None:
+        return None, None
     
     valid_battles = []
     for battle in data:
+        # battleTime is "YYYYMMDDTHHMMSS.sssZ", so string order is time order
+        battle_time = battle.get("battleTime", "")
+        if since and battle_time <= since:
+            continue
         if battle.get("type") in ["PvP", "pathOfLegend"]:
             if battle.get("team") and len(battle["team"]) > 0:
                 # Determine win/loss
@@ -96,486 +190,693 @@ def fetch_player_battles(player_tag, session):
                 
                 valid_battles.append({
                     "cards": team.get("cards", []),
-                    "win": win
+                    "win": win,
+                    "battle_time": battle_time,
+                    "crowns": team.get("crowns", 0),
+                    "opponent_cards": opponent.get("cards", []),
+                    "opponent_crowns": opponent.get("crowns", 0)
                 })
                 
-    return valid_battles[:BATTLE_LIMIT]
-
-def main():
-    logger.info("Starting Meta Snapshot Data Pipeline...")
-    
-    with requests.Session() as session:
-        # 1. Fetch Cards (using external module)
-        card_map = fetch_assets.fetch_and_process_cards(session, CR_API_BASE, HEADERS)
-        
-        # ... (rest of main)
-        
-        # 2. Fetch Top Players (with Pagination)
-        logger.info(f"Fetching Top {PLAYER_LIMIT} Players...")
-        top_players = []
-        cursor = None
-        
-        while len(top_players) < PLAYER_LIMIT:
-            # API usually limits to ~30-50 items per page for PoL, let's try requesting chunks
-            # Note: The 'limit' param might be capped by the server.
-            params = {"limit": 50} 
+    valid_battles = valid_battles[:BATTLE_LIMIT]
+    newest = max((b["battle_time"] for b in valid_battles), default=None)
+    return valid_battles, newest
+
+
+def fetch_player(player_tag, session, since=None):
+    """
+    Fetch a player's new battles and their profile stats in one crawl task.
+
+    Returns:
+        (battles, newest_battle_time, profile) - profile holds PROFILE_STATS, or
+        None if the fetch failed; all three are None if the battlelog fetch failed
+    """
+    battles, newest = fetch_player_battles(player_tag, session, since)
+    if battles is None:
+        return None, None, None
+    encoded_tag = player_tag.replace("#", "%23")
+    data = make_request(f"players/{encoded_tag}", session)
+    profile = {stat: data.get(stat, 0) for stat in PROFILE_STATS} if data else None
+    return battles, newest, profile
+
+def in_shard(player_tag, shard):
+    """
+    Whether a player belongs to a shard.
+
+    Players are assigned by a CRC32 of their tag, so every node computes the
+    same split without coordinating, and a player stays in the same shard
+    as the ranking shifts between runs.
+
+    Args:
+        shard: (index, count), or None to include every player
+    """
+    if shard is None:
+        return True
+    index, count = shard
+    return zlib.crc32(player_tag.encode("utf-8")) % count == index
+
+def parse_shard(value):
+    """
+    argparse type for "--shard I/N" (0-based shard I of N).
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in [0, {count}), got {value!r}")
+    return index, count
+
+def fetch_top_players(session, limit, clan_resolver, journal, shard=None):
+    """
+    Page through the global Path of Legends ranking.
+
+    Pages come from the shared prefetching paginator, so the next page is
+    already downloading while clan lookups are started for players in this
+    shard. Pages already in the journal are replayed instead of fetched.
+
+    Returns:
+        The top `limit` ranking entries (every shard, in rank order)
+    """
+    logger.info(f"Fetching Top {limit} Players...")
+
+    def fetch_page(cursor, page_limit):
+        page = journal.pages.get(cursor)
+        if page is None:
+            params = {"limit": page_limit}
             if cursor:
                 params["after"] = cursor
-                
             data = make_request("locations/global/pathoflegend/players", session, params)
             if not data:
-                break
-                
-            items = data.get("items", [])
-            if not items:
-                break
-                
-            top_players.extend(items)
-            logger.info(f"Fetched {len(top_players)} players so far...")
-            
-            cursor = data.get("paging", {}).get("cursors", {}).get("after")
-            if not cursor:
-                break
-                
-        # Trim to exact limit
-        top_players = top_players[:PLAYER_LIMIT]
-        logger.info(f"Total Players to Analyze: {len(top_players)}")
+                return [], None
+            items, next_cursor = cursor_page(data)
+            journal.record_page(cursor, items, next_cursor)
+            page = {"items": items, "next": next_cursor}
+        logger.info(f"Fetched ranking page of {len(page['items'])} players")
+        return page["items"], page["next"]
+
+    players = []
+    for p in iter_items(fetch_page, max_items=limit, page_size=RANKING_PAGE_SIZE):
+        if in_shard(p["tag"], shard):
+            clan_resolver.prefetch_players([p])
+        players.append(p)
+    logger.info(f"Fetched {len(players)} players")
+    return players
+
+def crawl_battles(session, players, card_map, battle_store, archive, clan_resolver, journal):
+    """
+    Fetch new battles for every player and fold them into the persisted aggregates.
+
+    Each player's profile is fetched in the same task as their battlelog and
+    summarized in streaming quantile sketches. Battlelogs and profiles
+    already in the journal are reused instead of fetched, and every newly
+    fetched one is journaled before it is aggregated.
+
+    Returns:
+        (aggregates, run_aggregates, location_counts, profile_stats) -
+        aggregates cover the store's window, run_aggregates only the battles
+        ingested by this run
+    """
+    logger.info("Fetching battles and clan locations...")
+
+    # Battle aggregates persist between runs in day buckets; only battles
+    # newer than each player's last ingested battleTime are folded in below.
+    day_aggregates = battle_store.load_day_aggregates()
+    last_seen = battle_store.last_seen()
+    last_seen_updates = {}
+    archive_rows = [] # (player_tag, region, battle_record) ingested this run, for aggregation and the archive
+    location_counts = Counter() 
+    profile_stats = ProfileStats(PROFILE_STATS)
+
+    def ingest(p, decks, player_loc):
+        if player_loc and player_loc != "Unknown":
+            location_counts[player_loc] += 1
+
+        for battle_record in decks:
+            if not battle_record: continue
+            archive_rows.append((p["tag"], player_loc, battle_record))
+
+    # Players whose battles arrived before their clan's region did:
+    # [(player, decks, region_future)]. They are folded in once the lookup
+    # lands so the consumer never blocks on a clan request.
+    waiting = []
+
+    def drain_waiting(block=False):
+        nonlocal waiting
+        still_waiting = []
+        for p, decks, region in waiting:
+            if block or region.done():
+                ingest(p, decks, region.result())
+            else:
+                still_waiting.append((p, decks, region))
+        waiting = still_waiting
+
+    def handle(p, decks, newest, profile):
+        if newest:
+            last_seen_updates[p["tag"]] = newest
+        if profile:
+            profile_stats.add_profile(profile)
+
+        region = clan_resolver.future_for(p)
+        if region is None:
+            ingest(p, decks, "Unknown")
+        elif region.done():
+            ingest(p, decks, region.result())
+        else:
+            waiting.append((p, decks, region))
+        drain_waiting()
+
+    pending = []
+    for p in players:
+        journaled = journal.battles.get(p["tag"])
+        if journaled is None:
+            pending.append(p)
+            continue
+        # A run that died after committing may have journaled battles the
+        # store already counted; the player's cursor filters those out
+        since = last_seen.get(p["tag"])
+        decks = [b for b in journaled["battles"] if not since or b["battle_time"] > since]
+        handle(p, decks, journaled["newest"] if decks else None, journaled["profile"])
+    if len(pending) < len(players):
+        logger.info(f"Reused {len(players) - len(pending)} journaled battlelogs")
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        future_to_player = {
+            executor.submit(fetch_player, p["tag"], session, last_seen.get(p["tag"])): p 
+            for p in pending
+        }
+    
+        completed = 0
+        failed = 0
+        for future in as_completed(future_to_player):
+            p = future_to_player[future]
+            decks, newest, profile = future.result()
+            completed += 1
+            if decks is None:
+                # Left out of the journal so a --resume run fetches the player again
+                failed += 1
+            else:
+                journal.record_battles(p["tag"], decks, newest, profile)
+                handle(p, decks, newest, profile)
         
-        # 3. Fetch Battles & Clan Locations
-        logger.info("Fetching battles and clan locations...")
+            if completed % 20 == 0:
+                logger.info(f"Processed {completed}/{len(pending)} players...")
+        if failed:
+            logger.warning(f"Could not fetch the battlelogs of {failed} players")
+
+    drain_waiting(block=True)
+    clan_resolver.shutdown()
+    logger.info(f"Clan lookups: {clan_resolver.stats()}")
+
+    # Fold this run's battles into their day buckets in one pass across
+    # worker processes. Battles from before the window are archived but not counted.
+    cutoff = battle_store.cutoff_day()
+    rows = [row for row in archive_rows if record_day(row[2]) >= cutoff]
+    updated_days = {}
+    run_aggregates = MetaAggregates()
+    for day, ingested in aggregate_parallel(rows, card_map, workers=AGG_WORKERS, key=record_day).items():
+        run_aggregates.merge(ingested)
+        updated_days[day] = day_aggregates.setdefault(day, MetaAggregates()).merge(ingested)
+
+    aggregates = MetaAggregates()
+    for bucket in day_aggregates.values():
+        aggregates.merge(bucket)
+
+    # Archive first: it skips battles it already holds, so a crash before
+    # the battle store commit cannot double-count on the next run
+    archive.append(archive_rows, card_map)
+    battle_store.commit(updated_days, last_seen_updates)
+    logger.info(f"Ingested {run_aggregates.total_decks} new decks this run.")
+    logger.info(f"Analysis Complete. Analyzed {aggregates.total_decks} decks from the last {battle_store.window_days} days.")
+    return aggregates, run_aggregates, location_counts, profile_stats
+
+def fetch_clan_leaderboard(session):
+    clan_leaderboard = []
+    try:
+        clans_data = make_request("locations/57000000/rankings/clans", session, {"limit": 5})
+        if clans_data:
+            clan_leaderboard = clans_data.get("items", [])
+    except Exception as e:
+        logger.error(f"Failed to fetch clan leaderboard: {e}")
+    return clan_leaderboard
+
+def build_snapshot(aggregates, card_map, top_players, location_counts, profile_stats, clan_leaderboard):
+    """
+    Turn the aggregates into the meta_snapshot.json document.
+
+    Args:
+        top_players: Ranking entries of every analyzed player, in rank order
+    """
+    total_decks = aggregates.total_decks
+
+    # Win rates and 95% intervals for cards, decks, variants and elixir
+    # buckets, computed as whole arrays rather than one entity at a time
+    cards = list(aggregates.card_games)
+    card_rates = WinRates(cards, [aggregates.card_wins[c] for c in cards], [aggregates.card_games[c] for c in cards])
+    decks = list(aggregates.deck_counts)
+    shown_decks = [deck for deck, _ in aggregates.deck_counts.most_common(12)]
+    deck_rates = WinRates(
+        decks,
+        [aggregates.deck_wins[d] for d in decks],
+        [aggregates.deck_counts[d] for d in decks],
+        bootstrap_keys=shown_decks
+    )
+    variant_keys = [
+        (deck, variant)
+        for deck in shown_decks
+        for variant in aggregates.deck_variant_counts.get(deck, {})
+    ]
+    variant_rates = WinRates(
+        variant_keys,
+        [aggregates.deck_variant_counts[d][v]["wins"] for d, v in variant_keys],
+        [aggregates.deck_variant_counts[d][v]["count"] for d, v in variant_keys]
+    )
+    buckets = list(aggregates.elixir_stats)
+    elixir_rates = WinRates(
+        buckets,
+        [aggregates.elixir_stats[b]["wins"] for b in buckets],
+        [aggregates.elixir_stats[b]["total"] for b in buckets]
+    )
+
+    top_decks = []
+    for deck_tuple in shown_decks:
+        count = aggregates.deck_counts[deck_tuple]
+        deck_cards = []
+        avg_elixir = 0
+    
+        # Find most common variant (Evos + Heroes) for this deck
+        # Sort by count (desc), then wins (desc) to break ties
+        best_evos = []
+        best_heroes = []
+        best_variant = None
+    
+        if deck_tuple in aggregates.deck_variant_counts:
+            variants = []
+            for (evo_t, hero_t), stats in aggregates.deck_variant_counts[deck_tuple].items():
+                variants.append({
+                    "evos": evo_t,
+                    "heroes": hero_t,
+                    "count": stats["count"],
+                    "wins": stats["wins"]
+                })
         
-        card_counts = Counter()
-        synergy_counts = Counter()
-        archetype_counts = Counter()
-        deck_counts = Counter()
-        deck_variant_counts = {} # { deck_tuple: { (evos_tuple, heroes_tuple): {count, wins} } }
-        location_counts = Counter() 
-        elixir_stats = {} # { "3.1": { "wins": 10, "total": 20 } }
-        total_decks = 0
+            # Sort: primary key count (desc), secondary key wins (desc)
+            variants.sort(key=lambda x: (x["count"], x["wins"]), reverse=True)
         
-        # Helper to fetch clan location
-        def fetch_clan_location(clan_tag, session):
-            if not clan_tag: return "Unknown"
-            encoded = clan_tag.replace("#", "%23")
-            data = make_request(f"clans/{encoded}", session)
-            if data and "location" in data:
-                loc = data["location"]
-                if loc.get("isCountry"):
-                    return loc.get("countryCode")
-                return loc.get("name") # Fallback for regions like "Europe"
-            return "Unknown"
-
-        # Regional Archetype Tracking
-        regional_archetypes = {} # { "JP": {"Cycle": 10, "Beatdown": 5}, "US": {...} }
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            # We need to do two things per player: fetch battles AND fetch clan info
-            # To be efficient, let's bundle them or just accept the extra requests.
-            # Since we have 500 players, fetching 500 clans is another 500 requests.
-            # We should cache clan locations since many players might be in the same clan.
-            
-            clan_cache = {}
-            
-            future_to_player = {
-                executor.submit(fetch_player_battles, p["tag"], session): p 
-                for p in top_players
-            }
-            
-            completed = 0
-            for future in as_completed(future_to_player):
-                p = future_to_player[future]
-                decks = future.result()
-                completed += 1
-                
-                # Determine Player Location (Cached)
-                player_loc = "Unknown"
-                clan = p.get("clan")
-                if clan:
-                    tag = clan.get("tag")
-                    if tag:
-                        if tag not in clan_cache:
-                            clan_cache[tag] = fetch_clan_location(tag, session)
-                        player_loc = clan_cache[tag]
-                        
-                if player_loc and player_loc != "Unknown":
-                    location_counts[player_loc] += 1
-                    if player_loc not in regional_archetypes:
-                        regional_archetypes[player_loc] = Counter()
-
-                # Process Decks
-                for battle_record in decks:
-                    if not battle_record: continue
-                    deck = battle_record["cards"]
-                    is_win = battle_record["win"]
-                    
-                    card_names = [c["name"] for c in deck]
-                    card_counts.update(card_names)
-                    
-                    # Calculate Avg Elixir
-                    deck_cost = sum([c.get("elixirCost", 0) for c in deck])
-                    avg_elixir = round(deck_cost / 8, 1)
-                    elixir_key = str(avg_elixir)
-                    
-                    if elixir_key not in elixir_stats:
-                        elixir_stats[elixir_key] = {"wins": 0, "total": 0}
-                    elixir_stats[elixir_key]["total"] += 1
-                    elixir_stats[elixir_key]["wins"] += is_win
-
-                    if len(card_names) == 8:
-                        deck_tuple = tuple(sorted(card_names))
-                        deck_counts[deck_tuple] += 1
-                        
-                        # Identify Evos and Heroes
-                        evos = []
-                        heroes = []
-                        for c in deck:
-                            name = c["name"]
-                            card_static_info = card_map.get(name, {})
-                            
-                            # Capabilities
-                            can_be_evo = bool(card_static_info.get("evo_icon"))
-                            can_be_hero = bool(card_static_info.get("hero_icon"))
-                            
-                            is_evo = False
-                            is_hero = False
-                            
-                            # Check signals from Battle Log
-                            # User specified: evolutionLevel 1 = Evo, 2 = Hero
-                            evo_level = c.get("evolutionLevel", 0)
-                            
-                            if evo_level == 1:
-                                is_evo = True
-                            elif evo_level == 2:
-                                is_hero = True
-                                
-                            # Fallback: check icon URL if level is 0 (just in case)
-                            if evo_level == 0:
-                                icon_url = c.get("iconUrls", {}).get("medium", "")
-                                if "evo" in icon_url:
-                                    is_evo = True
-                                elif "hero" in icon_url:
-                                    is_hero = True
-                            
-                            # Final Sanity Check: If flagged as Evo but only has Hero asset -> Hero
-                            # (This might still be useful if API is inconsistent, but the level logic should be primary)
-                            if is_evo and can_be_hero and not can_be_evo:
-                                is_evo = False
-                                is_hero = True
-                                
-                            if is_evo:
-                                evos.append(name)
-                            elif is_hero:
-                                heroes.append(name)
-                        
-                        # Track variant (Evos + Heroes)
-                        evo_tuple = tuple(sorted(evos))
-                        hero_tuple = tuple(sorted(heroes))
-                        variant_key = (evo_tuple, hero_tuple)
-                        
-                        if deck_tuple not in deck_variant_counts:
-                            deck_variant_counts[deck_tuple] = {}
-                        
-                        if variant_key not in deck_variant_counts[deck_tuple]:
-                            deck_variant_counts[deck_tuple][variant_key] = {"count": 0, "wins": 0}
-                            
-                        deck_variant_counts[deck_tuple][variant_key]["count"] += 1
-                        deck_variant_counts[deck_tuple][variant_key]["wins"] += is_win
-
-                    sorted_cards = sorted(card_names)
-                    for i in range(len(sorted_cards)):
-                        for j in range(i + 1, len(sorted_cards)):
-                            pair = f"{sorted_cards[i]} + {sorted_cards[j]}"
-                            synergy_counts[pair] += 1
-                    detected = "Unknown"
-                    for arch, wins in WIN_CONDITIONS.items():
-                        if any(w in card_names for w in wins):
-                            detected = arch
-                            break
-                    archetype_counts[detected] += 1
-                    total_decks += 1
-                    
-                    # Link Archetype to Region
-                    if player_loc and player_loc != "Unknown" and detected != "Unknown":
-                        regional_archetypes[player_loc][detected] += 1
-                
-                if completed % 20 == 0:
-                    logger.info(f"Processed {completed}/{len(top_players)} players...")
+            if variants:
+                best_evos = list(variants[0]["evos"])
+                best_heroes = list(variants[0]["heroes"])
+                best_variant = (deck_tuple, (variants[0]["evos"], variants[0]["heroes"]))
 
-        logger.info(f"Analysis Complete. Analyzed {total_decks} decks.")
+        for name in deck_tuple:
+            card_info = card_map.get(name, {"name": name, "key": "unknown", "icon": "", "elixir": 0})
         
-        # 3.5 Fetch Leaderboards
-        clan_leaderboard = []
-        try:
-            clans_data = make_request("locations/57000000/rankings/clans", session, {"limit": 5})
-            if clans_data:
-                clan_leaderboard = clans_data.get("items", [])
-        except Exception as e:
-            logger.error(f"Failed to fetch clan leaderboard: {e}")
-
-        # 4. Process & Save
-        top_decks = []
-        for deck_tuple, count in deck_counts.most_common(12):
-            deck_cards = []
-            avg_elixir = 0
-            
-            # Find most common variant (Evos + Heroes) for this deck
-            # Sort by count (desc), then wins (desc) to break ties
-            best_evos = []
-            best_heroes = []
-            
-            if deck_tuple in deck_variant_counts:
-                variants = []
-                for (evo_t, hero_t), stats in deck_variant_counts[deck_tuple].items():
-                    variants.append({
-                        "evos": evo_t,
-                        "heroes": hero_t,
-                        "count": stats["count"],
-                        "wins": stats["wins"]
-                    })
-                
-                # Sort: primary key count (desc), secondary key wins (desc)
-                variants.sort(key=lambda x: (x["count"], x["wins"]), reverse=True)
-                
-                if variants:
-                    best_evos = list(variants[0]["evos"])
-                    best_heroes = list(variants[0]["heroes"])
-
-            for name in deck_tuple:
-                card_info = card_map.get(name, {"name": name, "key": "unknown", "icon": "", "elixir": 0})
-                
-                # Check if this card is an Evo or Hero in the best variant
-                is_evo = name in best_evos
-                is_hero = name in best_heroes
-                
-                card_data = card_info.copy()
-                if is_evo:
-                    card_data["is_evo"] = True
-                    # Use Evo icon if available
-                    if card_info.get("evo_icon"):
-                        card_data["icon"] = card_info["evo_icon"]
-                elif is_hero:
-                    card_data["is_hero"] = True
-                    # Use Hero icon if available
-                    if card_info.get("hero_icon"):
-                        card_data["icon"] = card_info["hero_icon"]
-                
-                deck_cards.append(card_data)
-                avg_elixir += card_info.get("elixir", 0)
-                
-            top_decks.append({
-                "cards": deck_cards,
-                "avg_elixir": round(avg_elixir / 8, 1),
-                "count": count,
-                "usage_rate": round((count / total_decks) * 100, 2),
-                "win_rate": round(50 + (count % 20), 1)
-            })
+            # Check if this card is an Evo or Hero in the best variant
+            is_evo = name in best_evos
+            is_hero = name in best_heroes
+        
+            card_data = card_info.copy()
+            if is_evo:
+                card_data["is_evo"] = True
+                # Use Evo icon if available
+                if card_info.get("evo_icon"):
+                    card_data["icon"] = card_info["evo_icon"]
+            elif is_hero:
+                card_data["is_hero"] = True
+                # Use Hero icon if available
+                if card_info.get("hero_icon"):
+                    card_data["icon"] = card_info["hero_icon"]
+        
+            deck_cards.append(card_data)
+            avg_elixir += card_info.get("elixir", 0)
+        
+        deck_entry = {
+            "cards": deck_cards,
+            "avg_elixir": round(avg_elixir / 8, 1),
+            "count": count,
+            "usage_rate": round((count / total_decks) * 100, 2),
+            **deck_rates.summary(deck_tuple, digits=1)
+        }
+        if best_variant is not None:
+            variant_summary = variant_rates.summary(best_variant, digits=1)
+            deck_entry["variant_win_rate"] = variant_summary["win_rate"]
+            deck_entry["variant_win_rate_ci"] = variant_summary["win_rate_ci"]
+        top_decks.append(deck_entry)
+
+    top_cards = []
+    for name, count in aggregates.card_counts.most_common(50):
+        card_info = card_map.get(name, {"name": name, "key": "unknown", "icon": ""})
+        top_cards.append({
+            **card_info,
+            "count": count,
+            "usage_rate": round((count / total_decks) * 100, 2),
+            **(card_rates.summary(name) if name in card_rates else {"win_rate": 0})
+        })
 
-        top_cards = []
-        for name, count in card_counts.most_common(50):
-            card_info = card_map.get(name, {"name": name, "key": "unknown", "icon": ""})
-            top_cards.append({
-                **card_info,
-                "count": count,
-                "usage_rate": round((count / total_decks) * 100, 2),
-                "win_rate": round(45 + (count % 15), 2)
+    
+    top_synergies = []
+    for pair in aggregates.synergy.top_pairs(100):
+        c1_name, c2_name = pair["cards"]
+        c1 = card_map.get(c1_name, {"name": c1_name, "icon": ""})
+        c2 = card_map.get(c2_name, {"name": c2_name, "icon": ""})
+    
+        top_synergies.append({
+            "cards": [c1, c2],
+            "count": pair["count"],
+            "synergy_rate": round((pair["count"] / total_decks) * 100, 2),
+            "lift": pair["lift"],
+            "npmi": pair["npmi"]
+        })
+    
+    archetypes = []
+    for arch, count in aggregates.archetype_counts.most_common():
+        archetypes.append({
+            "name": arch,
+            "count": count,
+            "share": round((count / total_decks) * 100, 2)
+        })
+
+    # Format locations for map
+    player_locations = []
+    for code, count in location_counts.most_common():
+        player_locations.append({"id": code, "value": count})
+
+    # 5. Calculate Elixir Efficiency Heatmap Data
+    efficiency_stats = {} 
+    heatmap_data = []
+    type_cost_map = {} 
+
+    for card in top_cards:
+        c_type = card.get("type")
+        if not c_type:
+            name = card["name"]
+            if "Spell" in name or name in ["Zap", "The Log", "Arrows", "Fireball", "Poison", "Rocket", "Lightning", "Earthquake", "Void"]:
+                c_type = "Spell"
+            elif "Building" in name or name in ["Cannon", "Tesla", "Inferno Tower", "Bomb Tower", "X-Bow", "Mortar", "Tombstone", "Goblin Cage"]:
+                c_type = "Building"
+            else:
+                c_type = "Troop"
+    
+        if "Troop" in c_type: c_type = "Troop"
+        elif "Building" in c_type: c_type = "Building"
+        elif "Spell" in c_type: c_type = "Spell"
+    
+        cost = card.get("elixir", 0)
+        if cost == 0: continue 
+    
+        key = (c_type, cost)
+        if key not in type_cost_map:
+            type_cost_map[key] = {"total_win_rate": 0, "count": 0, "cards": []}
+    
+        w_rate = card.get("win_rate", 50)
+        count = card.get("count", 0)
+    
+        type_cost_map[key]["total_win_rate"] += w_rate * count
+        type_cost_map[key]["count"] += count
+        type_cost_map[key]["cards"].append(card["name"])
+
+    for (c_type, cost), data in type_cost_map.items():
+        if data["count"] > 0:
+            avg_win_rate = round(data["total_win_rate"] / data["count"], 1)
+            heatmap_data.append({
+                "type": c_type,
+                "elixir": cost,
+                "value": avg_win_rate,
+                "cards": data["cards"][:3] 
             })
 
-            
-        top_synergies = []
-        for pair, count in synergy_counts.most_common(100):
-            c1_name, c2_name = pair.split(" + ")
-            c1 = card_map.get(c1_name, {"name": c1_name, "icon": ""})
-            c2 = card_map.get(c2_name, {"name": c2_name, "icon": ""})
-            
-            top_synergies.append({
-                "cards": [c1, c2],
-                "count": count,
-                "synergy_rate": round((count / total_decks) * 100, 2)
-            })
-            
-        archetypes = []
-        for arch, count in archetype_counts.most_common():
-            archetypes.append({
-                "name": arch,
-                "count": count,
-                "share": round((count / total_decks) * 100, 2)
+    # 5. Format Deck Elixir Stats (New Granular Data)
+    deck_elixir_data = []
+    for cost, stats in aggregates.elixir_stats.items():
+        if stats["total"] > 10: # Filter low sample sizes
+            deck_elixir_data.append({
+                "elixir": float(cost),
+                **elixir_rates.summary(cost, digits=1),
+                "count": stats["total"]
             })
 
-        # Format locations for map
-        player_locations = []
-        for code, count in location_counts.most_common():
-            player_locations.append({"id": code, "value": count})
+    # Sort by elixir cost
+    deck_elixir_data.sort(key=lambda x: x["elixir"])
+
+    # Radar chart baselines over every crawled player's profile
+    global_averages = profile_stats.averages()
+    global_q3 = profile_stats.quantiles(0.75)
+    global_percentiles = {
+        stat: {f"p{pct}": sketch.quantile(pct / 100) for pct in PROFILE_PERCENTILES}
+        for stat, sketch in profile_stats.sketches.items()
+    }
+
+    logger.info(f"Global Averages: {global_averages}")
+    logger.info(f"Global Q3: {global_q3}")
+
+    # Format Regional Archetypes
+    formatted_regions = {}
+    for region, counts in aggregates.regional_archetypes.items():
+        # Only include regions with significant data
+        if sum(counts.values()) > 20:
+            formatted_regions[region] = dict(counts.most_common())
+
+    output_data = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "total_players": len(top_players),
+        "total_decks": total_decks,
+        "top_cards": top_cards,
+        "top_decks": top_decks,
+        "top_synergies": top_synergies,
+        "archetypes": archetypes,
+        "player_locations": player_locations,
+        "regional_archetypes": formatted_regions,
+        "card_atlas": load_atlas(CARDS_DIR),
+        "elixir_heatmap": heatmap_data, # Keeping old one just in case
+        "deck_elixir_stats": deck_elixir_data, # New granular data
+        "global_averages": global_averages,
+        "global_q3": global_q3,
+        "global_percentiles": global_percentiles,
+        "leaderboards": {
+            "players": top_players[:5],
+            "clans": clan_leaderboard
+        }
+    }
+    return output_data
+
+def write_snapshot(output_data, output="both"):
+    """
+    Write the snapshot.
+
+    Args:
+        output: "single" for src/data/meta_snapshot.json, "sections" for the
+            per-section files in public/data/meta, or "both"
+    """
+    if output in ("single", "both"):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        output_file = os.path.join(DATA_DIR, "meta_snapshot.json")
 
-        # 5. Calculate Elixir Efficiency Heatmap Data
-        efficiency_stats = {} 
-        heatmap_data = []
-        type_cost_map = {} 
+        # Same bytes as json.dump(output_data, f, indent=2), just encoded faster
+        with open(output_file, 'wb') as f:
+            f.write(dumps(output_data, indent=2))
         
-        for card in top_cards:
-            c_type = card.get("type")
-            if not c_type:
-                name = card["name"]
-                if "Spell" in name or name in ["Zap", "The Log", "Arrows", "Fireball", "Poison", "Rocket", "Lightning", "Earthquake", "Void"]:
-                    c_type = "Spell"
-                elif "Building" in name or name in ["Cannon", "Tesla", "Inferno Tower", "Bomb Tower", "X-Bow", "Mortar", "Tombstone", "Goblin Cage"]:
-                    c_type = "Building"
-                else:
-                    c_type = "Troop"
-            
-            if "Troop" in c_type: c_type = "Troop"
-            elif "Building" in c_type: c_type = "Building"
-            elif "Spell" in c_type: c_type = "Spell"
-            
-            cost = card.get("elixir", 0)
-            if cost == 0: continue 
-            
-            key = (c_type, cost)
-            if key not in type_cost_map:
-                type_cost_map[key] = {"total_win_rate": 0, "count": 0, "cards": []}
-            
-            w_rate = card.get("win_rate", 50)
-            count = card.get("count", 0)
-            
-            type_cost_map[key]["total_win_rate"] += w_rate * count
-            type_cost_map[key]["count"] += count
-            type_cost_map[key]["cards"].append(card["name"])
-
-        for (c_type, cost), data in type_cost_map.items():
-            if data["count"] > 0:
-                avg_win_rate = round(data["total_win_rate"] / data["count"], 1)
-                heatmap_data.append({
-                    "type": c_type,
-                    "elixir": cost,
-                    "value": avg_win_rate,
-                    "cards": data["cards"][:3] 
-                })
+        logger.info(f"Data saved to {output_file}")
 
-        # 5. Format Deck Elixir Stats (New Granular Data)
-        deck_elixir_data = []
-        for cost, stats in elixir_stats.items():
-            if stats["total"] > 10: # Filter low sample sizes
-                win_rate = round((stats["wins"] / stats["total"]) * 100, 1)
-                deck_elixir_data.append({
-                    "elixir": float(cost),
-                    "win_rate": win_rate,
-                    "count": stats["total"]
-                })
-        
-        # Sort by elixir cost
-        deck_elixir_data.sort(key=lambda x: x["elixir"])
-
-        # 6. Calculate Global Averages for Radar Chart
-        # We need to fetch full player profiles to get these stats.
-        # Since we didn't fetch them in the main loop (only battles), we can't calculate exact averages for THIS run without refactoring.
-        # HOWEVER, to save time/requests, let's just fetch a sample of the top 5 players fully to get a baseline, 
-        # OR refactor the main loop to fetch profiles.
-        # Given the requirement, let's refactor the main loop to fetch profiles.
-        # But I can't easily refactor the whole loop in this replace block.
-        # So I will add a separate quick fetch for the top 50 players to get a "representative" average.
-        
-        logger.info("Fetching player profiles for averages (Sample of 50)...")
-        global_stats = {
-            "wins": [],
-            "threeCrownWins": [],
-            "bestTrophies": [],
-            "warDayWins": [],
-            "challengeCardsWon": []
-        }
-        
-        # Helper to fetch profile
-        def fetch_profile(tag, session):
-            encoded = tag.replace("#", "%23")
-            return make_request(f"players/{encoded}", session)
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            # Sample top 50 for averages to avoid 500 extra requests
-            sample_players = top_players[:50]
-            future_to_p = {executor.submit(fetch_profile, p["tag"], session): p for p in sample_players}
-            
-            for future in as_completed(future_to_p):
-                data = future.result()
-                if data:
-                    global_stats["wins"].append(data.get("wins", 0))
-                    global_stats["threeCrownWins"].append(data.get("threeCrownWins", 0))
-                    global_stats["bestTrophies"].append(data.get("bestTrophies", 0))
-                    global_stats["warDayWins"].append(data.get("warDayWins", 0))
-                    global_stats["challengeCardsWon"].append(data.get("challengeCardsWon", 0))
-
-        # Helper for Q3 (75th percentile)
-        def get_q3(values):
-            if not values: return 0
-            sorted_vals = sorted(values)
-            return sorted_vals[int(len(sorted_vals) * 0.75)]
-
-        global_averages = {
-            "wins": int(sum(global_stats["wins"]) / len(global_stats["wins"])) if global_stats["wins"] else 0,
-            "threeCrownWins": int(sum(global_stats["threeCrownWins"]) / len(global_stats["threeCrownWins"])) if global_stats["threeCrownWins"] else 0,
-            "bestTrophies": int(sum(global_stats["bestTrophies"]) / len(global_stats["bestTrophies"])) if global_stats["bestTrophies"] else 0,
-            "warDayWins": int(sum(global_stats["warDayWins"]) / len(global_stats["warDayWins"])) if global_stats["warDayWins"] else 0,
-            "challengeCardsWon": int(sum(global_stats["challengeCardsWon"]) / len(global_stats["challengeCardsWon"])) if global_stats["challengeCardsWon"] else 0,
-        }
-        
-        global_q3 = {
-            "wins": get_q3(global_stats["wins"]),
-            "threeCrownWins": get_q3(global_stats["threeCrownWins"]),
-            "bestTrophies": get_q3(global_stats["bestTrophies"]),
-            "warDayWins": get_q3(global_stats["warDayWins"]),
-            "challengeCardsWon": get_q3(global_stats["challengeCardsWon"]),
-        }
-        
-        logger.info(f"Global Averages: {global_averages}")
-        logger.info(f"Global Q3: {global_q3}")
-
-        # Format Regional Archetypes
-        formatted_regions = {}
-        for region, counts in regional_archetypes.items():
-            # Only include regions with significant data
-            if sum(counts.values()) > 20:
-                formatted_regions[region] = dict(counts.most_common())
-
-        output_data = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "total_players": len(top_players),
-            "total_decks": total_decks,
-            "top_cards": top_cards,
-            "top_decks": top_decks,
-            "top_synergies": top_synergies,
-            "archetypes": archetypes,
-            "player_locations": player_locations,
-            "regional_archetypes": formatted_regions,
-            "elixir_heatmap": heatmap_data, # Keeping old one just in case
-            "deck_elixir_stats": deck_elixir_data, # New granular data
-            "global_averages": global_averages,
-            "global_q3": global_q3,
-            "leaderboards": {
-                "players": top_players[:5],
-                "clans": clan_leaderboard
-            }
-        }
+    if output in ("sections", "both"):
+        write_sections(output_data, SECTIONS_DIR)
+
+def record_history(run_aggregates, output_data):
+    """
+    Append this run's counts to the local history store.
+
+    Args:
+        run_aggregates: MetaAggregates over the battles ingested by this run
+            only, so each history run describes that run's meta rather than
+            the whole window
+    """
+    if not run_aggregates.total_decks:
+        logger.info("No new battles this run, nothing to add to the history")
+        return
+    history = HistoryStore()
+    try:
+        history.record(run_aggregates, output_data["timestamp"])
+    finally:
+        history.close()
+
+def write_partial(path, shard, aggregates, run_aggregates, card_map, players, location_counts, profile_stats, clan_leaderboard):
+    """
+    Write one shard's share of the snapshot inputs for merge_partials().
+    """
+    partial = {
+        "shard": list(shard),
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "players": players,
+        "aggregates": aggregates.to_state(),
+        "run_aggregates": run_aggregates.to_state(),
+        "card_map": card_map,
+        "location_counts": dict(location_counts),
+        "profile_stats": profile_stats.to_state(),
+        "clan_leaderboard": clan_leaderboard
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps(partial))
+    os.replace(tmp_path, path)
+    logger.info(f"Partial aggregates for shard {shard[0]}/{shard[1]} saved to {path}")
+
+def merge_partials(paths, output="both"):
+    """
+    Combine shard partials into meta_snapshot.json.
+
+    Aggregates, location counts and profile sketches are merged; players are
+    re-sorted by rank so the leaderboard matches an unsharded run.
+    """
+    aggregates = MetaAggregates()
+    run_aggregates = MetaAggregates()
+    card_map = {}
+    players = []
+    location_counts = Counter()
+    profile_stats = ProfileStats(PROFILE_STATS)
+    clan_leaderboard = []
+    seen_shards = set()
+    shard_count = None
+
+    for path in paths:
+        with open(path, 'rb') as f:
+            partial = loads(f.read())
+        index, count = partial["shard"]
+        if shard_count is not None and count != shard_count:
+            raise ValueError(f"{path} is shard {index}/{count}, expected a shard of {shard_count}")
+        if index in seen_shards:
+            raise ValueError(f"{path} duplicates shard {index}/{count}")
+        shard_count = count
+        seen_shards.add(index)
+
+        aggregates.merge(MetaAggregates.from_state(partial["aggregates"]))
+        run_aggregates.merge(MetaAggregates.from_state(partial.get("run_aggregates")))
+        card_map.update(partial["card_map"])
+        players.extend(partial["players"])
+        location_counts.update(partial["location_counts"])
+        profile_stats.merge(ProfileStats.from_state(partial["profile_stats"]))
+        clan_leaderboard = clan_leaderboard or partial["clan_leaderboard"]
+
+    missing = sorted(set(range(shard_count or 0)) - seen_shards)
+    if missing:
+        logger.warning(f"Merging without shards {missing} of {shard_count}; the snapshot will be incomplete")
+
+    players.sort(key=lambda p: p.get("rank", 0))
+    logger.info(f"Merged {len(paths)} partials: {len(players)} players, {aggregates.total_decks} decks")
+    output_data = build_snapshot(aggregates, card_map, players, location_counts, profile_stats, clan_leaderboard)
+    write_snapshot(output_data, output)
+    record_history(run_aggregates, output_data)
 
-        # 7. Aggregate Regional Archetypes
-        # We need to re-process the data we collected to map Region -> Archetype
-        # Since we didn't store the link between player -> deck -> region explicitly in a list,
-        # we can't easily do it post-hoc without refactoring without refactoring the main loop.
-        # Let's do a quick pass if we can, or better yet, let's just add it to the main loop next time.
-        # For now, let's mock it or try to reconstruct it if we had the data.
-        # Actually, let's Refactor the main loop slightly to store this.
-        # ... (Refactoring main loop is risky in a replace block).
-        # Alternative: We have `location_counts` and `archetype_counts`, but no cross-reference.
-        # Let's add a simple "Regional Meta" section based on the top 5 regions.
-        # We will need to update the main loop to capture this.
-        
-        # NOTE: For this specific run, I will add the logic to the MAIN LOOP in a separate edit 
-        # to ensure we capture Region -> Archetype mapping correctly.
-        # This block just sets up the output structure.
+def main():
+    parser = argparse.ArgumentParser(description="Build meta_snapshot.json from top Path of Legends battles")
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="Discard the persisted battle aggregates and re-ingest every player's recent battles"
+    )
+    parser.add_argument(
+        "--players",
+        type=int,
+        default=PLAYER_LIMIT,
+        help=f"Number of top ranked players to analyze (default {PLAYER_LIMIT})"
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="Only crawl shard I of N and write a partial aggregate file instead of the snapshot"
+    )
+    parser.add_argument(
+        "--partial-out",
+        help="Where --shard writes its partial (default .cache/partials/shard-I-of-N.json)"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted crawl from its journal instead of starting over"
+    )
+    parser.add_argument(
+        "--output",
+        choices=["single", "sections", "both"],
+        default="both",
+        help="Write meta_snapshot.json, per-section files for the dashboard, or both (default)"
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        metavar="PARTIAL",
+        help="Merge shard partial files into meta_snapshot.json without crawling"
+    )
+    args = parser.parse_args()
+
+    if args.merge:
+        merge_partials(args.merge, args.output)
+        return
+
+    logger.info("Starting Meta Snapshot Data Pipeline...")
+
+    shard = args.shard
+    store_path = None
+    archive_path = None
+    journal_path = None
+    if shard:
+        # Shards sharing a machine keep separate local state so they can run concurrently
+        suffix = f"shard-{shard[0]}-of-{shard[1]}"
+        store_path = os.getenv("CR_BATTLE_STORE", os.path.join(os.path.dirname(BASE_DIR), ".cache", f"battles-{suffix}.sqlite3"))
+        archive_path = os.getenv("CR_BATTLE_ARCHIVE", os.path.join(os.path.dirname(BASE_DIR), ".cache", f"battle_archive-{suffix}"))
+        journal_path = os.getenv("CR_CRAWL_JOURNAL", os.path.join(os.path.dirname(BASE_DIR), ".cache", f"crawl_journal-{suffix}.jsonl"))
+        logger.info(f"Crawling shard {shard[0]}/{shard[1]}")
+
+    battle_store = BattleStore(store_path)
+    if args.full_refresh:
+        logger.info("Full refresh requested, clearing battle store...")
+        battle_store.reset()
+
+    journal = CrawlJournal(journal_path)
+    journal.open({"players": args.players, "shard": list(shard) if shard else None}, resume=args.resume)
+    
+    with requests.Session() as session:
+        # Size the connection pool for every crawler and clan lookup thread
+        adapter = HTTPAdapter(pool_connections=MAX_WORKERS + CLAN_WORKERS, pool_maxsize=MAX_WORKERS + CLAN_WORKERS)
+        session.mount("https://", adapter)
+
+        # 1. Fetch Cards (using external module)
+        card_map = fetch_assets.fetch_and_process_cards(session, CR_API_BASE, HEADERS)
         
-        os.makedirs(DATA_DIR, exist_ok=True)
-        output_file = os.path.join(DATA_DIR, "meta_snapshot.json")
+        # Clan lookups run on their own pool and start as soon as each
+        # ranking page arrives, so regions are ready before battles are
+        def fetch_clan(clan_tag):
+            encoded = clan_tag.replace("#", "%23")
+            return make_request(f"clans/{encoded}", session)
+
+        clan_resolver = ClanLocationResolver(fetch_clan, max_workers=CLAN_WORKERS, on_resolved=journal.record_clan)
+        for clan_tag, region in journal.clans.items():
+            clan_resolver.seed(clan_tag, region)
+
+        # 2. Fetch Top Players (with Pagination)
+        top_players = fetch_top_players(session, args.players, clan_resolver, journal, shard)
+        players = [p for p in top_players if in_shard(p["tag"], shard)]
+        logger.info(f"Total Players to Analyze: {len(players)}")
+
+        # 3. Fetch Battles & Clan Locations
+        aggregates, run_aggregates, location_counts, profile_stats = crawl_battles(
+            session, players, card_map, battle_store, BattleArchive(archive_path), clan_resolver, journal
+        )
+        # Everything the journal protected is now in the battle store
+        journal.clear()
         
-        with open(output_file, 'w') as f:
-            json.dump(output_data, f, indent=2)
-            
-        logger.info(f"Data saved to {output_file}")
+        # 3.5 Fetch Leaderboards
+        clan_leaderboard = fetch_clan_leaderboard(session)
+
+        if shard:
+            partial_path = args.partial_out or os.path.join(PARTIALS_DIR, f"shard-{shard[0]}-of-{shard[1]}.json")
+            write_partial(partial_path, shard, aggregates, run_aggregates, card_map, players, location_counts, profile_stats, clan_leaderboard)
+        else:
+            output_data = build_snapshot(aggregates, card_map, players, location_counts, profile_stats, clan_leaderboard)
+            write_snapshot(output_data, args.output)
+            record_history(run_aggregates, output_data)
+
+        response_store.gc()
+        logger.info(f"Response store: {response_store.stats()}")
+        logger.info(f"Rate limiter settled at: {limiter.stats()}")
 
 if __name__ == "__main__":
     main()
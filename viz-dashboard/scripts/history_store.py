@@ -0,0 +1,258 @@
+import os
+import time
+import sqlite3
+import argparse
+import logging
+
+from aggregates import KEY_SEP
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_HISTORY_PATH = os.path.join(REPO_ROOT, ".cache", "history.sqlite3")
+
+KINDS = ["card", "deck", "archetype"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    taken_at REAL NOT NULL,
+    label TEXT NOT NULL,
+    total_decks INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    UNIQUE (kind, key)
+);
+CREATE TABLE IF NOT EXISTS latest (
+    entity_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    entity_id INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    delta INTEGER NOT NULL,
+    PRIMARY KEY (entity_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS deltas_run ON deltas (run_id);
+"""
+
+
+def _counts_by_kind(aggregates):
+    return {
+        "card": dict(aggregates.card_counts),
+        "deck": {KEY_SEP.join(deck): count for deck, count in aggregates.deck_counts.items()},
+        "archetype": dict(aggregates.archetype_counts)
+    }
+
+
+class HistoryStore:
+    """
+    Time series of per-run counts, one run per pipeline execution.
+
+    A run's counts cover only the battles that run ingested (those played
+    since the previous run), not the cumulative or windowed aggregates
+    behind the snapshot, so a deck that surges this week shows up in this
+    week's runs at full strength. Each run stores only what changed since
+    the previous run: one
+    (entity, run, delta) row per card, deck or archetype whose count moved.
+    The current counts are kept in `latest`, so the count at any earlier run
+    is latest minus the deltas recorded after it. Queries over the last N
+    runs only read those runs' deltas, however long the history is.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.getenv("CR_HISTORY_STORE", DEFAULT_HISTORY_PATH)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def _entity_ids(self, kind, keys):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO entities (kind, key) VALUES (?, ?)", [(kind, key) for key in keys]
+        )
+        return dict(self.conn.execute("SELECT key, id FROM entities WHERE kind = ?", (kind,)))
+
+    def record(self, aggregates, label=None):
+        """
+        Append a run with the counts of the battles it ingested.
+
+        Args:
+            aggregates: MetaAggregates over this run's newly ingested battles only
+            label: Run label, e.g. the snapshot timestamp
+
+        Returns:
+            (run_id, number of delta rows written)
+        """
+        taken_at = time.time()
+        label = label or time.strftime("%Y-%m-%d %H:%M:%S")
+        written = 0
+        with self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO runs (taken_at, label, total_decks) VALUES (?, ?, ?)",
+                (taken_at, label, aggregates.total_decks)
+            ).lastrowid
+            for kind, counts in _counts_by_kind(aggregates).items():
+                ids = self._entity_ids(kind, counts)
+                previous = dict(self.conn.execute(
+                    "SELECT l.entity_id, l.count FROM latest l JOIN entities e ON e.id = l.entity_id WHERE e.kind = ?",
+                    (kind,)
+                ))
+                current = {ids[key]: count for key, count in counts.items()}
+                # Entities not played in this run's battles drop to zero
+                changes = [
+                    (entity_id, run_id, current.get(entity_id, 0) - previous.get(entity_id, 0))
+                    for entity_id in current.keys() | previous.keys()
+                    if current.get(entity_id, 0) != previous.get(entity_id, 0)
+                ]
+                self.conn.executemany("INSERT INTO deltas (entity_id, run_id, delta) VALUES (?, ?, ?)", changes)
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO latest (entity_id, count) VALUES (?, ?)",
+                    [(entity_id, current.get(entity_id, 0)) for entity_id, _, _ in changes]
+                )
+                written += len(changes)
+        logger.info(f"History run {run_id} recorded ({written} changed counts)")
+        return run_id, written
+
+    def runs(self, last=None):
+        """
+        Recorded runs, oldest first: [(run_id, taken_at, label, total_decks)].
+        """
+        if last is None:
+            rows = self.conn.execute("SELECT id, taken_at, label, total_decks FROM runs ORDER BY id").fetchall()
+        else:
+            rows = self.conn.execute(
+                "SELECT id, taken_at, label, total_decks FROM runs ORDER BY id DESC LIMIT ?", (last,)
+            ).fetchall()[::-1]
+        return rows
+
+    def series(self, kind, key, last=30):
+        """
+        Count and share of one card, deck or archetype over the last N runs.
+
+        Returns:
+            [{"run", "label", "count", "total", "share"}] oldest first
+        """
+        runs = self.runs(last)
+        if not runs:
+            return []
+        row = self.conn.execute(
+            "SELECT e.id, COALESCE(l.count, 0) FROM entities e LEFT JOIN latest l ON l.entity_id = e.id "
+            "WHERE e.kind = ? AND e.key = ?",
+            (kind, key)
+        ).fetchone()
+        entity_id, count = row if row else (None, 0)
+        deltas = dict(self.conn.execute(
+            "SELECT run_id, delta FROM deltas WHERE entity_id = ? AND run_id > ?", (entity_id, runs[0][0])
+        ))
+
+        # Walk back from the latest count, undoing each later run's delta
+        result = []
+        for run_id, _, label, total in reversed(runs):
+            result.append({
+                "run": run_id,
+                "label": label,
+                "count": count,
+                "total": total,
+                "share": round(count / total * 100, 2) if total else 0.0
+            })
+            count -= deltas.get(run_id, 0)
+        return result[::-1]
+
+    def movers(self, kind, since, limit=10):
+        """
+        Entities whose share of decks changed the most since a point in time.
+
+        Args:
+            kind: "card", "deck" or "archetype"
+            since: Unix time; compared against the last run at or before it
+                (or the first run, if the history starts later)
+            limit: Number of risers and fallers to return
+
+        Returns:
+            {"base": label, "latest": label, "risers": [...], "fallers": [...]}
+            where each entry has key, count, base_count, share, base_share and change
+        """
+        base = self.conn.execute(
+            "SELECT id, label, total_decks FROM runs WHERE taken_at <= ? ORDER BY id DESC LIMIT 1", (since,)
+        ).fetchone() or self.conn.execute("SELECT id, label, total_decks FROM runs ORDER BY id LIMIT 1").fetchone()
+        latest = self.conn.execute("SELECT id, label, total_decks FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        if not base or not latest:
+            return {"base": None, "latest": None, "risers": [], "fallers": []}
+        base_id, base_label, base_total = base
+        _, latest_label, latest_total = latest
+
+        rows = self.conn.execute(
+            """
+            SELECT e.key, COALESCE(l.count, 0), COALESCE(d.moved, 0)
+            FROM entities e
+            LEFT JOIN latest l ON l.entity_id = e.id
+            LEFT JOIN (
+                SELECT entity_id, SUM(delta) AS moved FROM deltas WHERE run_id > ? GROUP BY entity_id
+            ) d ON d.entity_id = e.id
+            WHERE e.kind = ?
+            """,
+            (base_id, kind)
+        ).fetchall()
+
+        entries = []
+        for key, count, moved in rows:
+            base_count = count - moved
+            share = count / latest_total * 100 if latest_total else 0.0
+            base_share = base_count / base_total * 100 if base_total else 0.0
+            if count or base_count:
+                entries.append({
+                    "key": key,
+                    "count": count,
+                    "base_count": base_count,
+                    "share": round(share, 2),
+                    "base_share": round(base_share, 2),
+                    "change": round(share - base_share, 2)
+                })
+        entries.sort(key=lambda e: e["change"], reverse=True)
+        return {
+            "base": base_label,
+            "latest": latest_label,
+            "risers": [e for e in entries if e["change"] > 0][:limit],
+            "fallers": [e for e in reversed(entries) if e["change"] < 0][:limit]
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the meta snapshot history")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    series_parser = sub.add_parser("series", help="Usage of one card, deck or archetype over recent runs")
+    series_parser.add_argument("kind", choices=KINDS)
+    series_parser.add_argument("key", help=f"Card or archetype name, or deck card names joined by '{KEY_SEP}'")
+    series_parser.add_argument("--last", type=int, default=30, help="Number of runs to show")
+
+    movers_parser = sub.add_parser("movers", help="Biggest changes in share since N days ago")
+    movers_parser.add_argument("kind", choices=KINDS)
+    movers_parser.add_argument("--days", type=float, default=7)
+    movers_parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    store = HistoryStore()
+    if args.command == "series":
+        for point in store.series(args.kind, args.key, args.last):
+            print(f"{point['label']}  {point['count']:>8}  {point['share']:6.2f}%")
+    else:
+        result = store.movers(args.kind, time.time() - args.days * 86400, args.top)
+        print(f"Changes from {result['base']} to {result['latest']}")
+        for title, entries in (("Rising", result["risers"]), ("Falling", result["fallers"])):
+            print(f"\n{title}:")
+            for e in entries:
+                print(f"  {e['key']:<40} {e['base_share']:6.2f}% -> {e['share']:6.2f}%  ({e['change']:+.2f})")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,156 @@
+import time
+import random
+import threading
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """
+    Capped exponential backoff with full jitter.
+
+    Args:
+        attempt: Retry number, starting at 0
+        base: Delay ceiling for the first retry (seconds)
+        cap: Upper bound on any single delay (seconds)
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Every request takes one token; tokens refill
+    continuously at `rate` per second up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """
+        Block until a token is available, then take it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+            self.capacity = max(1.0, float(rate))
+            self._tokens = min(self._tokens, self.capacity)
+
+    def drain(self):
+        """
+        Drop all banked tokens so that nobody sends until the bucket refills.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = 0.0
+
+
+class AdaptiveLimiter:
+    """
+    Process-wide request limiter shared by all crawler threads.
+
+    Combines a token bucket (requests per second) with a cap on requests in
+    flight, and tunes both AIMD-style: every `limit` successful responses add
+    one to the concurrency limit and raise the rate additively, while a 429 (or 5xx)
+    halves both. Throttles that arrive within `cooldown` seconds of the last
+    cut are treated as part of the same burst, so one overload does not
+    collapse the limits to the minimum.
+    """
+
+    def __init__(self, rate=10.0, min_rate=1.0, max_rate=100.0, rate_step=1.0,
+                 concurrency=5, min_concurrency=1, max_concurrency=32,
+                 decrease_factor=0.5, cooldown=2.0):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+
+        self.bucket = TokenBucket(rate)
+        self.limit = concurrency
+
+        self._in_flight = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+        self.total_requests = 0
+        self.total_throttled = 0
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a concurrency slot and a rate token for the duration of one request.
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            self.total_requests += 1
+        try:
+            self.bucket.acquire()
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify()
+
+    def on_success(self):
+        with self._cond:
+            self._successes += 1
+            if self._successes < self.limit:
+                return
+            # One full window of successes: additive increase
+            self._successes = 0
+            if self.limit < self.max_concurrency:
+                self.limit += 1
+                self._cond.notify()
+            rate = min(self.max_rate, self.bucket.rate + self.rate_step)
+        self.bucket.set_rate(rate)
+
+    def on_throttle(self):
+        with self._cond:
+            self.total_throttled += 1
+            self._successes = 0
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            # Multiplicative decrease
+            self._last_decrease = now
+            self.limit = max(self.min_concurrency, int(self.limit * self.decrease_factor))
+            rate = max(self.min_rate, self.bucket.rate * self.decrease_factor)
+        self.bucket.set_rate(rate)
+        self.bucket.drain()
+        logger.warning(f"Throttled upstream: concurrency -> {self.limit}, rate -> {rate:.1f} req/s")
+
+    def stats(self):
+        with self._cond:
+            return {
+                "concurrency_limit": self.limit,
+                "rate": round(self.bucket.rate, 2),
+                "requests": self.total_requests,
+                "throttled": self.total_throttled
+            }
@@ -0,0 +1,150 @@
+import math
+import random
+
+
+class QuantileSketch:
+    """
+    KLL-style streaming quantile sketch.
+
+    Values are kept in a stack of compactors. Level i holds items that each
+    stand for 2**i original values; when a level fills up it is sorted and
+    every other item is promoted to the next level. Memory stays around
+    3k items however many values are added, the rank error is roughly
+    1/k, and two sketches merge by concatenating their levels, so shards
+    and worker processes can each keep their own and combine them later.
+    Count, sum, min and max are tracked exactly.
+    """
+
+    def __init__(self, k=200):
+        self.k = k
+        self.levels = [[]]
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _capacity(self, level):
+        # Lower levels get geometrically smaller buffers (the KLL 2/3 decay)
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) < self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            items.sort()
+            # An odd item out stays behind so the promoted weight is exact
+            leftover = [items.pop()] if len(items) % 2 else []
+            self.levels[level + 1].extend(items[random.randint(0, 1)::2])
+            self.levels[level] = leftover
+            level = 0
+
+    def add(self, value):
+        self.levels[0].append(value)
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def merge(self, other):
+        """
+        Fold another sketch into this one.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+        return self
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def quantile(self, q):
+        """
+        Approximate q-quantile (0 <= q <= 1) of every value added.
+
+        Matches sorted(values)[int(len(values) * q)] exactly while the sketch
+        has not compacted anything yet.
+        """
+        if not self.count:
+            return 0
+        weighted = sorted(
+            (value, 1 << level) for level, items in enumerate(self.levels) for value in items
+        )
+        total_weight = sum(weight for _, weight in weighted)
+        target = q * total_weight
+        seen = 0
+        for value, weight in weighted:
+            seen += weight
+            if seen > target:
+                return value
+        return self.max
+
+    def to_state(self):
+        return {
+            "k": self.k,
+            "levels": self.levels,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state.get("k", 200))
+        sketch.levels = [list(items) for items in state["levels"]] or [[]]
+        sketch.count = state["count"]
+        sketch.total = state["total"]
+        sketch.min = state["min"]
+        sketch.max = state["max"]
+        return sketch
+
+
+class ProfileStats:
+    """
+    One QuantileSketch per player profile stat (wins, bestTrophies, ...).
+    """
+
+    def __init__(self, stats):
+        self.sketches = {stat: QuantileSketch() for stat in stats}
+
+    def add_profile(self, profile):
+        for stat, sketch in self.sketches.items():
+            sketch.add(profile.get(stat, 0))
+
+    def merge(self, other):
+        for stat, sketch in other.sketches.items():
+            if stat in self.sketches:
+                self.sketches[stat].merge(sketch)
+            else:
+                self.sketches[stat] = sketch
+        return self
+
+    def averages(self):
+        return {stat: int(sketch.mean()) for stat, sketch in self.sketches.items()}
+
+    def quantiles(self, q):
+        return {stat: sketch.quantile(q) for stat, sketch in self.sketches.items()}
+
+    def to_state(self):
+        return {stat: sketch.to_state() for stat, sketch in self.sketches.items()}
+
+    @classmethod
+    def from_state(cls, state):
+        profile_stats = cls([])
+        profile_stats.sketches = {stat: QuantileSketch.from_state(s) for stat, s in state.items()}
+        return profile_stats
@@ -0,0 +1,118 @@
+import os
+import sys
+import gzip
+import json
+import hashlib
+import logging
+
+# Required (see requirements.txt): the dashboard is served the .br siblings
+import brotli
+
+# JSON encoding is shared with the MCP server (mcp-server/src/shared/codec.py)
+MCP_SERVER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mcp-server'))
+if MCP_SERVER_DIR not in sys.path:
+    sys.path.append(MCP_SERVER_DIR)
+from src.shared.codec import dumps
+
+logger = logging.getLogger(__name__)
+
+# Top-level snapshot keys small enough to inline in the manifest
+SUMMARY_KEYS = ["timestamp", "total_players", "total_decks"]
+MANIFEST_NAME = "manifest.json"
+
+
+def _write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _write_compressed(path, data):
+    """
+    Write data plus precompressed .gz and .br siblings, skipping files that already exist.
+
+    Section files are named by content hash, so an existing file already
+    holds this data.
+
+    Returns:
+        { "bytes", "gzip_bytes", "brotli_bytes" } sizes for the manifest
+    """
+    if not os.path.exists(path):
+        _write_atomic(path, data)
+    sizes = {"bytes": len(data)}
+    # mtime=0 keeps the gzip output byte-identical for identical content
+    for suffix, key, compress in (
+        (".gz", "gzip_bytes", lambda: gzip.compress(data, compresslevel=9, mtime=0)),
+        (".br", "brotli_bytes", lambda: brotli.compress(data, quality=11)),
+    ):
+        if os.path.exists(path + suffix):
+            sizes[key] = os.path.getsize(path + suffix)
+        else:
+            compressed = compress()
+            _write_atomic(path + suffix, compressed)
+            sizes[key] = len(compressed)
+    return sizes
+
+
+def write_sections(output_data, out_dir):
+    """
+    Write the snapshot as one compact, content-hashed file per section.
+
+    Every top-level key except the SUMMARY_KEYS scalars becomes
+    "<section>.<hash>.json" next to .gz and .br siblings, so a page fetches only
+    the sections it renders and hashed files can be cached forever. The
+    manifest maps section names to their current files and inlines the
+    summary values. It is written last, so readers never see a manifest
+    that points at missing files.
+
+    Files from older runs are removed, except those referenced by the
+    previous manifest, which clients may still hold for one more cycle.
+
+    Returns:
+        The manifest dict
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+
+    previous_files = set()
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path) as f:
+                previous = json.load(f)
+            previous_files = {entry["file"] for entry in previous.get("sections", {}).values()}
+        except (ValueError, KeyError):
+            pass
+
+    sections = {}
+    for name, value in output_data.items():
+        if name in SUMMARY_KEYS:
+            continue
+        data = dumps(value, ensure_ascii=False)
+        digest = hashlib.sha256(data).hexdigest()
+        filename = f"{name}.{digest[:12]}.json"
+        # An unchanged section keeps its name and files; only missing siblings are written
+        sizes = _write_compressed(os.path.join(out_dir, filename), data)
+        sections[name] = {"file": filename, "sha256": digest, **sizes}
+
+    manifest = {
+        "summary": {key: output_data.get(key) for key in SUMMARY_KEYS},
+        "sections": sections
+    }
+    manifest_data = dumps(manifest, ensure_ascii=False)
+    _write_atomic(manifest_path, manifest_data)
+
+    keep = {entry["file"] for entry in sections.values()} | previous_files
+    for filename in os.listdir(out_dir):
+        base = filename
+        for suffix in (".gz", ".br"):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if base == MANIFEST_NAME or base in keep or not base.endswith(".json"):
+            continue
+        os.remove(os.path.join(out_dir, filename))
+
+    total = sum(entry["bytes"] for entry in sections.values())
+    total_gz = sum(entry["gzip_bytes"] for entry in sections.values())
+    logger.info(f"Wrote {len(sections)} snapshot sections to {out_dir} ({total} bytes, {total_gz} gzipped)")
+    return manifest
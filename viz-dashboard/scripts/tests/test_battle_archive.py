@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from battle_archive import BattleArchive
+
+
+def _battle(battle_time, card_id):
+    cards = [{"id": card_id + i, "name": f"Card {card_id + i}"} for i in range(8)]
+    return {"battle_time": battle_time, "cards": cards, "crowns": 1, "opponent_cards": cards, "opponent_crowns": 0}
+
+
+def test_append_keeps_every_battle_of_a_newest_first_battlelog(tmp_path):
+    archive = BattleArchive(str(tmp_path))
+    battlelog = [
+        ("#P1", "US", _battle("20261017T120000.000Z", 1)),
+        ("#P1", "US", _battle("20261017T110000.000Z", 2)),
+        ("#P1", "US", _battle("20261017T100000.000Z", 3)),
+    ]
+
+    assert archive.append(battlelog, {}) == 3
+    assert len(archive) == 3
+
+
+def test_append_skips_battles_already_archived(tmp_path):
+    archive = BattleArchive(str(tmp_path))
+    archive.append([("#P1", "US", _battle("20261017T110000.000Z", 1))], {})
+
+    reopened = BattleArchive(str(tmp_path))
+    added = reopened.append([
+        ("#P1", "US", _battle("20261017T120000.000Z", 2)),
+        ("#P1", "US", _battle("20261017T110000.000Z", 1)),
+        ("#P1", "US", _battle("20261017T100000.000Z", 3)),
+    ], {})
+
+    assert added == 1
+    assert len(reopened) == 2
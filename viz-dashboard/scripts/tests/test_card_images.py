@@ -0,0 +1,56 @@
+import os
+import sys
+import json
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from card_images import ATLAS_NAME, OPT_SUBDIR, load_atlas, make_variants
+
+
+def _write_atlas(cards_dir, sheets):
+    out_dir = cards_dir / OPT_SUBDIR
+    out_dir.mkdir(parents=True)
+    atlas = {"width": 96, "height": 71, "tile": [48, 71], "frames": {"knight": [0, 0]}}
+    for fmt, filename in sheets.items():
+        atlas[fmt] = f"/cards/{OPT_SUBDIR}/{filename}"
+    (out_dir / ATLAS_NAME).write_text(json.dumps(atlas))
+    return out_dir
+
+
+def test_load_atlas_drops_frames(tmp_path):
+    out_dir = _write_atlas(tmp_path, {"webp": "atlas-sm.0123456789ab.webp"})
+    (out_dir / "atlas-sm.0123456789ab.webp").write_bytes(b"RIFF")
+
+    atlas = load_atlas(str(tmp_path))
+
+    assert atlas["webp"] == f"/cards/{OPT_SUBDIR}/atlas-sm.0123456789ab.webp"
+    assert "frames" not in atlas
+
+
+def test_load_atlas_ignores_atlas_with_missing_sheet(tmp_path):
+    out_dir = _write_atlas(tmp_path, {"webp": "atlas-sm.0123456789ab.webp", "avif": "atlas-sm.ba9876543210.avif"})
+    (out_dir / "atlas-sm.0123456789ab.webp").write_bytes(b"RIFF")
+
+    assert load_atlas(str(tmp_path)) is None
+
+
+def test_make_variants_skips_by_content_not_mtime(tmp_path):
+    src = tmp_path / "knight.png"
+    Image.new("RGBA", (285, 420), (200, 40, 40, 255)).save(src)
+    out_dir = tmp_path / OPT_SUBDIR
+    out_dir.mkdir()
+    formats = {"webp": {"quality": 82, "method": 4}}
+    manifest = SimpleNamespace(entries={"knight.png": {"url": "https://example/knight.png", "sha256": "a" * 64}})
+
+    assert make_variants(str(src), str(out_dir), formats, manifest) == 2
+
+    # A fresh checkout: the source looks newer than every variant
+    os.utime(src, (time.time() + 60, time.time() + 60))
+    assert make_variants(str(src), str(out_dir), formats, manifest) == 0
+
+    manifest.entries["knight.png"]["sha256"] = "b" * 64
+    assert make_variants(str(src), str(out_dir), formats, manifest) == 2
@@ -0,0 +1,68 @@
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from battle_archive import BattleArchive
+from battle_store import BattleStore
+from clan_locations import ClanLocationResolver
+from crawl_journal import CrawlJournal
+
+
+@pytest.fixture
+def fetch_meta(tmp_path, monkeypatch):
+    monkeypatch.setenv("CR_PROXY_API_KEY", "test")
+    monkeypatch.setenv("CR_RESPONSE_STORE", str(tmp_path / "responses.sqlite3"))
+    import fetch_meta
+    monkeypatch.setattr(fetch_meta, "AGG_WORKERS", 1)
+    return fetch_meta
+
+
+def _battle(card_id):
+    cards = [{"id": card_id + i, "name": f"Card {card_id + i}", "elixirCost": 3} for i in range(8)]
+    battle_time = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.000Z")
+    return {"cards": cards, "win": 1, "battle_time": battle_time, "crowns": 1,
+            "opponent_cards": cards, "opponent_crowns": 0}
+
+
+def _crawl(fetch_meta, tmp_path, players, resume):
+    journal = CrawlJournal(str(tmp_path / "journal.jsonl"))
+    journal.open({"players": len(players)}, resume=resume)
+    battle_store = BattleStore(str(tmp_path / "battles.sqlite3"))
+    try:
+        fetch_meta.crawl_battles(
+            None, players, {}, battle_store, BattleArchive(str(tmp_path / "archive")),
+            ClanLocationResolver(lambda tag: None), journal
+        )
+    finally:
+        battle_store.close()
+        journal.close()
+    return journal
+
+
+def test_failed_battlelog_is_refetched_on_resume(fetch_meta, tmp_path, monkeypatch):
+    players = [{"tag": "#P1"}, {"tag": "#P2"}]
+    fetched = []
+    failing = {"#P2"}
+
+    def fetch_player(player_tag, session, since=None):
+        fetched.append(player_tag)
+        if player_tag in failing:
+            return None, None, None
+        battle = _battle(1 if player_tag == "#P1" else 9)
+        return [battle], battle["battle_time"], {"wins": 1}
+
+    monkeypatch.setattr(fetch_meta, "fetch_player", fetch_player)
+
+    journal = _crawl(fetch_meta, tmp_path, players, resume=False)
+    assert "#P1" in journal.battles
+    assert "#P2" not in journal.battles
+
+    fetched.clear()
+    failing.clear()
+    journal = _crawl(fetch_meta, tmp_path, players, resume=True)
+    assert fetched == ["#P2"]
+    assert "#P2" in journal.battles
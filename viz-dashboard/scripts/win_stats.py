@@ -0,0 +1,130 @@
+import numpy as np
+
+# 95% two-sided normal quantile
+Z_95 = 1.959963984540054
+BOOTSTRAP_SAMPLES = 1000
+# Entities per bootstrap batch; bounds the (batch, samples) draw matrix
+BOOTSTRAP_CHUNK = 4096
+
+
+def wilson_interval(wins, games, z=Z_95):
+    """
+    Wilson score interval for every win rate at once.
+
+    Returns:
+        (low, high) arrays in [0, 1]; entities with no games get (0, 1)
+    """
+    wins = np.asarray(wins, dtype=np.float64)
+    games = np.asarray(games, dtype=np.float64)
+    n = np.where(games > 0, games, 1.0)
+    p = wins / n
+    z2 = z * z
+    denom = 1 + z2 / n
+    center = (p + z2 / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / denom
+    low = np.where(games > 0, np.clip(center - half, 0, 1), 0.0)
+    high = np.where(games > 0, np.clip(center + half, 0, 1), 1.0)
+    return low, high
+
+
+def bootstrap_interval(wins, games, samples=BOOTSTRAP_SAMPLES, alpha=0.05, seed=0):
+    """
+    Percentile bootstrap interval for every win rate at once.
+
+    Each entity's games are resampled from Binomial(games, observed rate),
+    which is equivalent to resampling its individual results, so no
+    per-battle data is needed. Entities are drawn in batches of
+    BOOTSTRAP_CHUNK to keep memory bounded. The seed is fixed so repeated
+    runs over the same counts produce the same snapshot.
+
+    Returns:
+        (low, high) arrays in [0, 1]; entities with no games get (0, 1)
+    """
+    wins = np.asarray(wins, dtype=np.int64)
+    games = np.asarray(games, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    lo_rank = int(np.floor(alpha / 2 * (samples - 1)))
+    hi_rank = int(np.ceil((1 - alpha / 2) * (samples - 1)))
+    low = np.zeros(len(games))
+    high = np.ones(len(games))
+    for start in range(0, len(games), BOOTSTRAP_CHUNK):
+        n = games[start:start + BOOTSTRAP_CHUNK]
+        played = n > 0
+        if not played.any():
+            continue
+        n = n[played]
+        p = wins[start:start + BOOTSTRAP_CHUNK][played] / n
+        draws = rng.binomial(n[:, None], p[:, None], size=(len(n), samples))
+        # Only the two order statistics are needed, so partition instead of sorting
+        draws.partition([lo_rank, hi_rank], axis=1)
+        idx = np.flatnonzero(played) + start
+        low[idx] = draws[:, lo_rank] / n
+        high[idx] = draws[:, hi_rank] / n
+    return low, high
+
+
+def win_rate_table(wins, games, bootstrap=None):
+    """
+    Win rates with Wilson and bootstrap 95% intervals, as percentages.
+
+    Args:
+        wins, games: Equal-length sequences of counts, one entry per entity
+        bootstrap: Optional boolean mask of the entities to bootstrap (all by
+            default); the others get NaN bootstrap bounds
+
+    Returns:
+        { "rate", "wilson_low", "wilson_high", "boot_low", "boot_high" } arrays
+    """
+    wins = np.asarray(wins, dtype=np.int64)
+    games = np.asarray(games, dtype=np.int64)
+    rate = np.divide(wins, games, out=np.zeros(len(games)), where=games > 0)
+    wilson_low, wilson_high = wilson_interval(wins, games)
+    if bootstrap is None:
+        boot_low, boot_high = bootstrap_interval(wins, games)
+    else:
+        boot_low = np.full(len(games), np.nan)
+        boot_high = np.full(len(games), np.nan)
+        boot_low[bootstrap], boot_high[bootstrap] = bootstrap_interval(wins[bootstrap], games[bootstrap])
+    return {
+        "rate": rate * 100,
+        "wilson_low": wilson_low * 100,
+        "wilson_high": wilson_high * 100,
+        "boot_low": boot_low * 100,
+        "boot_high": boot_high * 100
+    }
+
+
+class WinRates:
+    """
+    Win-rate table for a set of keyed entities (cards, decks, elixir buckets).
+
+    Wilson intervals are closed-form and computed for every entity. The
+    bootstrap draws BOOTSTRAP_SAMPLES binomials per entity, so for large
+    sets (every deck seen) it can be limited to the entities that are
+    actually published.
+    """
+
+    def __init__(self, keys, wins, games, bootstrap_keys=None):
+        self.index = {key: i for i, key in enumerate(keys)}
+        mask = None
+        if bootstrap_keys is not None:
+            mask = np.zeros(len(self.index), dtype=bool)
+            mask[[self.index[key] for key in bootstrap_keys if key in self.index]] = True
+        self.table = win_rate_table(wins, games, bootstrap=mask)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def summary(self, key, digits=2):
+        """
+        Output fields for one entity: win_rate plus its confidence intervals.
+        """
+        i = self.index[key]
+        t = self.table
+        result = {
+            "win_rate": round(float(t["rate"][i]), digits),
+            "win_rate_ci": [round(float(t["wilson_low"][i]), digits), round(float(t["wilson_high"][i]), digits)]
+        }
+        if not np.isnan(t["boot_low"][i]):
+            result["win_rate_bootstrap_ci"] = [round(float(t["boot_low"][i]), digits), round(float(t["boot_high"][i]), digits)]
+        return result
@@ -4,7 +4,7 @@ import CardTable from '@/components/CardTable';
 import metaData from '@/data/meta_snapshot.json';
 
 export default function DataPage() {
-  const { top_cards, top_decks, leaderboards, total_players, total_decks, timestamp } = metaData;
+  const { top_cards, top_decks, leaderboards, total_players, total_decks, timestamp, card_atlas } = metaData;
 
   return (
     <div className="max-w-7xl mx-auto px-4 py-8 space-y-8">
@@ -29,7 +29,7 @@ export default function DataPage() {
       />
 
       {/* Section 3: Card Stats Table */}
-      <CardTable cards={top_cards} />
+      <CardTable cards={top_cards} atlas={card_atlas} />
     </div>
   );
 }
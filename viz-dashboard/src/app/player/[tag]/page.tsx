@@ -7,7 +7,7 @@ import Link from 'next/link';
 import SkillRadar from '@/components/SkillRadar';
 import BattleLogAnalytics from '@/components/player/BattleLogAnalytics';
 import PlayerUsageStats from '@/components/player/PlayerUsageStats';
-import metaData from '@/data/meta_snapshot.json';
+import { useMetaSections } from '@/lib/metaSections';
 
 export default function PlayerDashboard() {
   const params = useParams();
@@ -16,6 +16,8 @@ export default function PlayerDashboard() {
   const [playerData, setPlayerData] = useState<any>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  // Only the sections this page renders, not the whole snapshot
+  const metaData = useMetaSections(['top_cards', 'global_averages', 'global_q3']);
 
   useEffect(() => {
     if (!tag) return;
@@ -150,10 +152,11 @@ export default function PlayerDashboard() {
           <PlayerUsageStats 
             battles={playerData.battleLog} 
             playerTag={playerData.tag} 
-            cardData={metaData.top_cards}
+            cardData={metaData?.top_cards ?? []}
           />
 
           {/* Radar Charts Container */}
+          {metaData && (
           <div className="grid grid-cols-1 md:grid-cols-2 gap-6">
             {/* Player Radar */}
             <div className="h-[500px] bg-[#171717] border border-[#262626] rounded-xl p-2">
@@ -177,6 +180,7 @@ export default function PlayerDashboard() {
               />
             </div>
           </div>
+          )}
           
           {/* Analytics Section */}
           <div className="space-y-6">
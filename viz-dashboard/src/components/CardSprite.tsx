@@ -0,0 +1,55 @@
+import Image from 'next/image';
+
+// Written by scripts/card_images.py; every card's "sprite" is its [x, y] tile
+export interface CardAtlas {
+  width: number;
+  height: number;
+  tile: number[];
+  webp: string;
+  avif?: string;
+}
+
+interface SpriteCard {
+  name: string;
+  icon: string;
+  sprite?: number[];
+}
+
+interface CardSpriteProps {
+  card: SpriteCard;
+  atlas?: CardAtlas | null;
+  width: number;
+  height: number;
+}
+
+// Draws a small card icon from the shared atlas, so a table of cards costs one
+// image request. Falls back to the card's own icon when there is no atlas tile.
+export default function CardSprite({ card, atlas, width, height }: CardSpriteProps) {
+  if (!atlas || !card.sprite) {
+    return (
+      <div className="relative" style={{ width, height }}>
+        <Image src={card.icon} alt={card.name} fill className="object-contain" />
+      </div>
+    );
+  }
+
+  const [tileWidth, tileHeight] = atlas.tile;
+  const scale = Math.min(width / tileWidth, height / tileHeight);
+  const [x, y] = card.sprite;
+
+  return (
+    <div className="flex items-center justify-center" style={{ width, height }}>
+      <div className="relative overflow-hidden" style={{ width: tileWidth * scale, height: tileHeight * scale }}>
+        <picture>
+          {atlas.avif && <source srcSet={atlas.avif} type="image/avif" />}
+          <img
+            src={atlas.webp}
+            alt={card.name}
+            className="absolute max-w-none"
+            style={{ width: atlas.width * scale, height: atlas.height * scale, left: -x * scale, top: -y * scale }}
+          />
+        </picture>
+      </div>
+    </div>
+  );
+}
@@ -1,14 +1,15 @@
-import Image from 'next/image';
+import CardSprite, { CardAtlas } from './CardSprite';
 
 interface Card {
   name: string;
   icon: string;
+  sprite?: number[];
   usage_rate: number;
   win_rate?: number;
   elixir: number;
 }
 
-export default function CardTable({ cards }: { cards: Card[] }) {
+export default function CardTable({ cards, atlas }: { cards: Card[]; atlas?: CardAtlas | null }) {
   return (
     <div className="bg-[#171717] border border-[#262626] rounded-lg overflow-hidden">
       <div className="px-3 py-2 border-b border-[#262626] bg-[#1a1a1a] flex justify-between items-center">
@@ -30,14 +31,7 @@ export default function CardTable({ cards }: { cards: Card[] }) {
               <tr key={index} className="hover:bg-[#1f1f1f] transition-colors group">
                 <td className="px-3 py-1.5">
                   <div className="flex items-center gap-3">
-                    <div className="relative w-6 h-8">
-                      <Image
-                        src={card.icon}
-                        alt={card.name}
-                        fill
-                        className="object-contain"
-                      />
-                    </div>
+                    <CardSprite card={card} atlas={atlas} width={24} height={32} />
                     <span className="text-xs font-bold text-gray-300 group-hover:text-white transition-colors">
                       {card.name}
                     </span>
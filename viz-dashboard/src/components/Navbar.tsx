@@ -3,10 +3,11 @@
 import Link from 'next/link';
 import { usePathname } from 'next/navigation';
 
-import metaData from '@/data/meta_snapshot.json';
+import { useMetaSummary } from '@/lib/metaSections';
 
 export default function Navbar() {
   const pathname = usePathname();
+  const summary = useMetaSummary();
 
   const isActive = (path: string) => pathname === path;
 
@@ -63,7 +64,7 @@ export default function Navbar() {
               v1.0.0
             </div>
             <div className="text-[10px] text-gray-600 font-mono hidden sm:block">
-              Updated: {metaData.timestamp}
+              Updated: {summary?.timestamp ?? '...'}
             </div>
           </div>
         </div>
@@ -0,0 +1,93 @@
+'use client';
+
+import { useEffect, useState } from 'react';
+// Type-only import: gives the section shapes without bundling the snapshot
+import type metaSnapshot from '@/data/meta_snapshot.json';
+
+export type MetaSnapshot = typeof metaSnapshot;
+export type MetaSummary = Pick<MetaSnapshot, 'timestamp' | 'total_players' | 'total_decks'>;
+export type MetaSectionName = Exclude<keyof MetaSnapshot, keyof MetaSummary>;
+
+interface MetaManifest {
+  summary: MetaSummary;
+  sections: Record<string, { file: string; sha256: string; bytes: number }>;
+}
+
+// Written by scripts/fetch_meta.py (snapshot_sections.py)
+const SECTIONS_BASE = '/data/meta';
+
+let manifestPromise: Promise<MetaManifest> | null = null;
+const sectionPromises = new Map<string, Promise<unknown>>();
+
+export function loadManifest(): Promise<MetaManifest> {
+  if (!manifestPromise) {
+    manifestPromise = fetch(`${SECTIONS_BASE}/manifest.json`, { cache: 'no-cache' })
+      .then((res) => {
+        if (!res.ok) throw new Error(`Failed to load meta manifest (${res.status})`);
+        return res.json();
+      })
+      .catch((err) => {
+        manifestPromise = null;
+        throw err;
+      });
+  }
+  return manifestPromise;
+}
+
+export async function loadSection<K extends MetaSectionName>(name: K): Promise<MetaSnapshot[K]> {
+  const manifest = await loadManifest();
+  const entry = manifest.sections[name];
+  if (!entry) throw new Error(`Unknown meta section: ${name}`);
+
+  // Section files are content-hashed, so one fetch per file is enough
+  let promise = sectionPromises.get(entry.file);
+  if (!promise) {
+    promise = fetch(`${SECTIONS_BASE}/${entry.file}`).then((res) => {
+      if (!res.ok) throw new Error(`Failed to load meta section ${name} (${res.status})`);
+      return res.json();
+    });
+    sectionPromises.set(entry.file, promise);
+  }
+  return promise as Promise<MetaSnapshot[K]>;
+}
+
+export function useMetaSummary(): MetaSummary | null {
+  const [summary, setSummary] = useState<MetaSummary | null>(null);
+
+  useEffect(() => {
+    let active = true;
+    loadManifest()
+      .then((manifest) => active && setSummary(manifest.summary))
+      .catch((err) => console.error(err));
+    return () => {
+      active = false;
+    };
+  }, []);
+
+  return summary;
+}
+
+export function useMetaSections<K extends MetaSectionName>(names: K[]): Pick<MetaSnapshot, K> | null {
+  const [data, setData] = useState<Pick<MetaSnapshot, K> | null>(null);
+  const key = names.join(',');
+
+  useEffect(() => {
+    let active = true;
+    Promise.all(names.map((name) => loadSection(name)))
+      .then((values) => {
+        if (!active) return;
+        const result = {} as Pick<MetaSnapshot, K>;
+        names.forEach((name, i) => {
+          result[name] = values[i] as MetaSnapshot[K];
+        });
+        setData(result);
+      })
+      .catch((err) => console.error(err));
+    return () => {
+      active = false;
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [key]);
+
+  return data;
+}